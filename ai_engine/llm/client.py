@@ -1,5 +1,6 @@
 import openai
 from typing import List, Dict
+from app.core import tracing
 from app.core.config import settings
 
 class LLMClient:
@@ -20,14 +21,16 @@ class LLMClient:
         Return ONLY valid JSON.
         """
         
-        response = await self.client.chat.completions.create(
-            model="gpt-3.5-turbo",
-            messages=[
-                {"role": "system", "content": "You are a professional video script writer."},
-                {"role": "user", "content": prompt}
-            ],
-            temperature=0.7
-        )
+        with tracing.span("openai.chat.completions", tracing.CLIENT, model="gpt-3.5-turbo"):
+            response = await self.client.chat.completions.create(
+                model="gpt-3.5-turbo",
+                messages=[
+                    {"role": "system", "content": "You are a professional video script writer."},
+                    {"role": "user", "content": prompt}
+                ],
+                temperature=0.7,
+                extra_headers=tracing.inject({})
+            )
         return response.choices[0].message.content
 
 llm_client = LLMClient()
@@ -2,6 +2,8 @@ from typing import Optional, Dict, Any
 import httpx
 import asyncio
 
+from app.core import tracing
+
 class SeedanceClient:
     def __init__(self, api_key: str, base_url: str = "https://api.seedance.com/v1"):
         self.api_key = api_key
@@ -15,28 +17,34 @@ class SeedanceClient:
         """
         Trigger video generation task
         """
-        async with httpx.AsyncClient() as client:
-            payload = {
-                "image_url": image_url,
-                "prompt": prompt,
-                "motion_bucket_id": motion_bucket_id
-            }
-            response = await client.post(
-                f"{self.base_url}/generation/image-to-video",
-                headers=self.headers,
-                json=payload
-            )
-            response.raise_for_status()
-            return response.json()
+        with tracing.span("seedance.generate_video", tracing.CLIENT) as span:
+            async with httpx.AsyncClient() as client:
+                payload = {
+                    "image_url": image_url,
+                    "prompt": prompt,
+                    "motion_bucket_id": motion_bucket_id
+                }
+                response = await client.post(
+                    f"{self.base_url}/generation/image-to-video",
+                    headers=tracing.inject(dict(self.headers)),
+                    json=payload
+                )
+                if span:
+                    span.set(**{"http.status_code": response.status_code})
+                response.raise_for_status()
+                return response.json()
 
     async def get_task_status(self, task_id: str) -> Dict[str, Any]:
         """
         Check generation status
         """
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                f"{self.base_url}/tasks/{task_id}",
-                headers=self.headers
-            )
-            response.raise_for_status()
-            return response.json()
+        with tracing.span("seedance.get_task_status", tracing.CLIENT, **{"seedance.task_id": task_id}) as span:
+            async with httpx.AsyncClient() as client:
+                response = await client.get(
+                    f"{self.base_url}/tasks/{task_id}",
+                    headers=tracing.inject(dict(self.headers))
+                )
+                if span:
+                    span.set(**{"http.status_code": response.status_code})
+                response.raise_for_status()
+                return response.json()
@@ -2,6 +2,8 @@ from typing import Optional, Dict, Any
 import httpx
 import base64
 
+from app.core import tracing
+
 class StableDiffusionClient:
     def __init__(self, api_key: str, api_host: str = "https://api.stability.ai"):
         self.api_key = api_key
@@ -18,20 +20,23 @@ class StableDiffusionClient:
         engine_id = "stable-diffusion-v1-6"
         url = f"{self.api_host}/v1/generation/{engine_id}/text-to-image"
         
-        async with httpx.AsyncClient() as client:
-            payload = {
-                "text_prompts": [{"text": prompt}],
-                "cfg_scale": 7,
-                "steps": steps,
-                "samples": 1
-            }
-            
-            response = await client.post(url, headers=self.headers, json=payload)
-            
-            if response.status_code != 200:
-                raise Exception(f"Non-200 response: {response.text}")
-            
-            data = response.json()
-            # Decode the first image
-            image_base64 = data["artifacts"][0]["base64"]
-            return base64.b64decode(image_base64)
+        with tracing.span("stability.generate_image", tracing.CLIENT, engine=engine_id, steps=steps) as span:
+            async with httpx.AsyncClient() as client:
+                payload = {
+                    "text_prompts": [{"text": prompt}],
+                    "cfg_scale": 7,
+                    "steps": steps,
+                    "samples": 1
+                }
+
+                response = await client.post(url, headers=tracing.inject(dict(self.headers)), json=payload)
+                if span:
+                    span.set(**{"http.status_code": response.status_code})
+
+                if response.status_code != 200:
+                    raise Exception(f"Non-200 response: {response.text}")
+
+                data = response.json()
+                # Decode the first image
+                image_base64 = data["artifacts"][0]["base64"]
+                return base64.b64decode(image_base64)
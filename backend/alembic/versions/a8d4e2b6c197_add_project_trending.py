@@ -0,0 +1,35 @@
+"""add materialized project trending ranking
+
+Revision ID: a8d4e2b6c197
+Revises: f3c9a6d1e258
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "a8d4e2b6c197"
+down_revision: Union[str, None] = "f3c9a6d1e258"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "project_trending",
+        sa.Column("project_id", sa.Integer(), sa.ForeignKey("projects.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("rank", sa.Integer(), nullable=False),
+        sa.Column("score", sa.Float(), nullable=False),
+        sa.Column("computed_at", sa.DateTime(timezone=True), nullable=False),
+        sa.PrimaryKeyConstraint("project_id"),
+    )
+    op.create_index(op.f("ix_project_trending_rank"), "project_trending", ["rank"], unique=True)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f("ix_project_trending_rank"), table_name="project_trending")
+    op.drop_table("project_trending")
@@ -0,0 +1,40 @@
+"""add composite indexes for keyset pagination
+
+Revision ID: b3f7d9e1a456
+Revises: a8d4e2b6c197
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+
+revision: str = "b3f7d9e1a456"
+down_revision: Union[str, None] = "a8d4e2b6c197"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+INDEXES = [
+    ("ix_projects_public_created_at_id", "projects", ["is_public", "created_at", "id"]),
+    ("ix_projects_owner_public_created_at_id", "projects", ["owner_id", "is_public", "created_at", "id"]),
+    ("ix_branches_creator_id_project_id", "branches", ["creator_id", "project_id"]),
+    ("ix_clip_segments_owner_id_id", "clip_segments", ["owner_id", "id"]),
+    ("ix_clip_segments_project_id_id", "clip_segments", ["project_id", "id"]),
+    ("ix_merge_requests_project_id_id", "merge_requests", ["project_id", "id"]),
+    ("ix_merge_requests_project_id_creator_id_id", "merge_requests", ["project_id", "creator_id", "id"]),
+    ("ix_vn_assets_owner_id_id", "vn_assets", ["owner_id", "id"]),
+    ("ix_vn_assets_owner_id_project_id_id", "vn_assets", ["owner_id", "project_id", "id"]),
+]
+
+
+def upgrade() -> None:
+    for name, table, columns in INDEXES:
+        op.create_index(name, table, columns, unique=False)
+
+
+def downgrade() -> None:
+    for name, table, _columns in reversed(INDEXES):
+        op.drop_index(name, table_name=table)
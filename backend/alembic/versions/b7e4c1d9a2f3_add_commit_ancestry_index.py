@@ -0,0 +1,75 @@
+"""add commit ancestry index (generation + jump pointer)
+
+Revision ID: b7e4c1d9a2f3
+Revises: 6d9a0c3f7e21
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "b7e4c1d9a2f3"
+down_revision: Union[str, None] = "6d9a0c3f7e21"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _backfill() -> None:
+    bind = op.get_bind()
+    rows = bind.execute(sa.text("SELECT id, parent_hash FROM commits")).fetchall()
+    parent = {r[0]: r[1] for r in rows}
+    generation: dict[str, int] = {}
+    jump: dict[str, str] = {}
+
+    for start in parent:
+        if start in generation:
+            continue
+        path = []
+        cursor = start
+        while cursor is not None and cursor in parent and cursor not in generation:
+            path.append(cursor)
+            cursor = parent[cursor]
+        for cid in reversed(path):
+            p = parent[cid]
+            if p is None or p not in generation:
+                generation[cid], jump[cid] = 1, cid
+                continue
+            generation[cid] = generation[p] + 1
+            pj = jump[p]
+            pjj = jump[pj]
+            if generation[p] - generation[pj] == generation[pj] - generation[pjj]:
+                jump[cid] = pjj
+            else:
+                jump[cid] = p
+
+    stmt = sa.text("UPDATE commits SET generation = :g, jump_hash = :j WHERE id = :id")
+    params = [{"g": generation[cid], "j": jump[cid], "id": cid} for cid in generation]
+    for i in range(0, len(params), 1000):
+        bind.execute(stmt, params[i : i + 1000])
+
+
+def upgrade() -> None:
+    if op.get_bind().dialect.name == "sqlite":
+        with op.batch_alter_table("commits") as batch_op:
+            batch_op.add_column(sa.Column("generation", sa.Integer(), nullable=True))
+            batch_op.add_column(sa.Column("jump_hash", sa.String(), nullable=True))
+    else:
+        op.add_column("commits", sa.Column("generation", sa.Integer(), nullable=True))
+        op.add_column("commits", sa.Column("jump_hash", sa.String(), nullable=True))
+    op.create_index("ix_commits_project_id_generation", "commits", ["project_id", "generation"], unique=False)
+    _backfill()
+
+
+def downgrade() -> None:
+    op.drop_index("ix_commits_project_id_generation", table_name="commits")
+    if op.get_bind().dialect.name == "sqlite":
+        with op.batch_alter_table("commits") as batch_op:
+            batch_op.drop_column("jump_hash")
+            batch_op.drop_column("generation")
+        return
+    op.drop_column("commits", "jump_hash")
+    op.drop_column("commits", "generation")
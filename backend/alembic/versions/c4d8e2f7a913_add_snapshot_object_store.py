@@ -0,0 +1,216 @@
+"""add content-addressed snapshot object store for commits
+
+Revision ID: c4d8e2f7a913
+Revises: b7e4c1d9a2f3
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+
+import hashlib
+import json
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "c4d8e2f7a913"
+down_revision: Union[str, None] = "b7e4c1d9a2f3"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+BATCH = 500
+
+# Frozen copy of the splitter in app/services/snapshot_service.py at the time of
+# this revision, so the stored objects do not depend on later changes to it.
+INLINE_MAX_BYTES = 128
+LIST_CHUNK = 32
+_REF_BYTES = 48
+
+
+def _dumps(value: Any) -> str:
+    return json.dumps(value, separators=(",", ":"), ensure_ascii=False)
+
+
+class _Splitter:
+    def __init__(self) -> None:
+        self.objects: Dict[str, Tuple[str, Any, int]] = {}
+
+    def _store(self, kind: str, data: Any, entries: int) -> str:
+        digest = hashlib.sha1(_dumps([kind, data]).encode("utf-8")).hexdigest()
+        self.objects.setdefault(digest, (kind, data, entries))
+        return digest
+
+    def _encode_items(self, items: Iterable[Any]) -> Tuple[List[list], int, bool]:
+        encoded: List[list] = []
+        size = 2
+        has_refs = False
+        for item in items:
+            ref, inline, item_size = self.encode(item)
+            if ref is None:
+                encoded.append([0, inline])
+                size += item_size + 5
+            else:
+                encoded.append([1, ref])
+                size += _REF_BYTES
+                has_refs = True
+        return encoded, size, has_refs
+
+    def encode(self, value: Any, root: bool = False) -> Tuple[Optional[str], Any, int]:
+        if isinstance(value, dict):
+            keys = list(value.keys())
+            encoded, size, has_refs = self._encode_items(value[k] for k in keys)
+            size += sum(len(str(k)) + 4 for k in keys)
+            if not root and not has_refs and size < INLINE_MAX_BYTES:
+                return None, value, size
+            data = [[k, *e] for k, e in zip(keys, encoded)]
+            return self._store("dict", data, len(keys)), None, 0
+        if isinstance(value, list):
+            if len(value) > LIST_CHUNK:
+                chunks = [
+                    self._store("list", self._encode_items(value[i : i + LIST_CHUNK])[0], len(value[i : i + LIST_CHUNK]))
+                    for i in range(0, len(value), LIST_CHUNK)
+                ]
+                return self._store("chunks", chunks, len(value)), None, 0
+            encoded, size, has_refs = self._encode_items(value)
+            if not root and not has_refs and size < INLINE_MAX_BYTES:
+                return None, value, size
+            return self._store("list", encoded, len(value)), None, 0
+        if root:
+            return self._store("value", value, 0), None, 0
+        return None, value, len(_dumps(value))
+
+
+def _build(root: str, objects: Dict[str, Tuple[str, Any]]) -> Any:
+    kind, data = objects[root]
+    if kind == "value":
+        return data
+    if kind == "chunks":
+        out: List[Any] = []
+        for chunk in data:
+            out.extend(_build(chunk, objects))
+        return out
+
+    def item(flag: int, payload: Any) -> Any:
+        return _build(payload, objects) if flag else payload
+
+    if kind == "dict":
+        return {k: item(flag, payload) for k, flag, payload in data}
+    return [item(flag, payload) for flag, payload in data]
+
+
+def _child_refs(kind: str, data: Any) -> List[str]:
+    if kind == "chunks":
+        return list(data)
+    if kind == "dict":
+        return [payload for _k, flag, payload in data if flag]
+    if kind == "list":
+        return [payload for flag, payload in data if flag]
+    return []
+
+
+def _json(value: Any) -> Any:
+    return json.loads(value) if isinstance(value, str) else value
+
+
+def _commit_batches(bind, column: str) -> Iterator[List[Tuple[str, Any]]]:
+    """(id, column) of commits where the column is set, BATCH rows at a time in id order."""
+    after = ""
+    while True:
+        rows = bind.execute(
+            sa.text(
+                f"SELECT id, {column} FROM commits WHERE {column} IS NOT NULL AND id > :after ORDER BY id LIMIT :n"
+            ),
+            {"after": after, "n": BATCH},
+        ).fetchall()
+        if not rows:
+            return
+        yield rows
+        after = rows[-1][0]
+
+
+def _fetch_trees(bind, roots: Iterable[str]) -> Dict[str, Tuple[str, Any]]:
+    """Every object reachable from roots, one IN query per tree level and BATCH hashes."""
+    objects: Dict[str, Tuple[str, Any]] = {}
+    frontier = list(set(roots))
+    while frontier:
+        fetched: Dict[str, Tuple[str, Any]] = {}
+        for i in range(0, len(frontier), BATCH):
+            stmt = sa.text("SELECT hash, kind, data FROM snapshot_objects WHERE hash IN :hashes").bindparams(
+                sa.bindparam("hashes", expanding=True)
+            )
+            for h, kind, data in bind.execute(stmt, {"hashes": frontier[i : i + BATCH]}).fetchall():
+                fetched[h] = (kind, _json(data))
+        objects.update(fetched)
+        frontier = list({ref for kind, data in fetched.values() for ref in _child_refs(kind, data) if ref not in objects})
+    return objects
+
+
+def _backfill() -> None:
+    # Move inline snapshots into the object store; identical subtrees collapse to one row.
+    bind = op.get_bind()
+    objects_table = sa.table(
+        "snapshot_objects",
+        sa.column("hash", sa.String),
+        sa.column("kind", sa.String),
+        sa.column("data", sa.JSON),
+        sa.column("entries", sa.Integer),
+    )
+    exists = sa.text("SELECT hash FROM snapshot_objects WHERE hash IN :hashes").bindparams(
+        sa.bindparam("hashes", expanding=True)
+    )
+    for rows in _commit_batches(bind, "video_assets"):
+        splitter = _Splitter()
+        roots = [(commit_id, splitter.encode(_json(raw), root=True)[0]) for commit_id, raw in rows]
+        hashes = list(splitter.objects)
+        stored = set()
+        for i in range(0, len(hashes), BATCH):
+            stored.update(r[0] for r in bind.execute(exists, {"hashes": hashes[i : i + BATCH]}).fetchall())
+        new_rows = [
+            {"hash": h, "kind": kind, "data": data, "entries": entries}
+            for h, (kind, data, entries) in splitter.objects.items()
+            if h not in stored
+        ]
+        if new_rows:
+            op.bulk_insert(objects_table, new_rows)
+        bind.execute(
+            sa.text("UPDATE commits SET tree_hash = :t, video_assets = NULL WHERE id = :id"),
+            [{"t": root, "id": commit_id} for commit_id, root in roots],
+        )
+
+
+def upgrade() -> None:
+    op.create_table(
+        "snapshot_objects",
+        sa.Column("hash", sa.String(), nullable=False),
+        sa.Column("kind", sa.String(), nullable=False),
+        sa.Column("data", sa.JSON(), nullable=False),
+        sa.Column("entries", sa.Integer(), nullable=False, server_default="0"),
+        sa.PrimaryKeyConstraint("hash"),
+    )
+    if op.get_bind().dialect.name == "sqlite":
+        with op.batch_alter_table("commits") as batch_op:
+            batch_op.add_column(sa.Column("tree_hash", sa.String(), nullable=True))
+            batch_op.create_foreign_key("fk_commits_tree_hash", "snapshot_objects", ["tree_hash"], ["hash"])
+    else:
+        op.add_column("commits", sa.Column("tree_hash", sa.String(), nullable=True))
+        op.create_foreign_key("fk_commits_tree_hash", "commits", "snapshot_objects", ["tree_hash"], ["hash"])
+    _backfill()
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    stmt = sa.text("UPDATE commits SET video_assets = :v WHERE id = :id").bindparams(sa.bindparam("v", type_=sa.JSON))
+    for rows in _commit_batches(bind, "tree_hash"):
+        objects = _fetch_trees(bind, [root for _id, root in rows])
+        bind.execute(stmt, [{"v": _build(root, objects), "id": commit_id} for commit_id, root in rows])
+
+    if bind.dialect.name == "sqlite":
+        with op.batch_alter_table("commits") as batch_op:
+            batch_op.drop_constraint("fk_commits_tree_hash", type_="foreignkey")
+            batch_op.drop_column("tree_hash")
+    else:
+        op.drop_constraint("fk_commits_tree_hash", "commits", type_="foreignkey")
+        op.drop_column("commits", "tree_hash")
+    op.drop_table("snapshot_objects")
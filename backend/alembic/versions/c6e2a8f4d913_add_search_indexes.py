@@ -0,0 +1,51 @@
+"""add full-text and trigram search indexes (PostgreSQL only)
+
+Revision ID: c6e2a8f4d913
+Revises: b3f7d9e1a456
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+
+revision: str = "c6e2a8f4d913"
+down_revision: Union[str, None] = "b3f7d9e1a456"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Must match app.services.search_service.project_search_vector() exactly.
+PROJECT_SEARCH_VECTOR = (
+    "(setweight(to_tsvector('simple'::regconfig, coalesce(name, '')), 'A') || "
+    "setweight(to_tsvector('simple'::regconfig, coalesce(description, '')), 'B')) || "
+    "setweight(to_tsvector('simple'::regconfig, coalesce(CAST(tags AS TEXT), '')), 'C')"
+)
+
+TRIGRAM_INDEXES = [
+    ("ix_projects_name_trgm", "projects", "name"),
+    ("ix_projects_public_id_trgm", "projects", "public_id"),
+    ("ix_users_email_trgm", "users", "email"),
+    ("ix_users_full_name_trgm", "users", "full_name"),
+    ("ix_users_public_id_trgm", "users", "public_id"),
+]
+
+
+def upgrade() -> None:
+    # SQLite (tests/local) searches with ILIKE and needs no indexes.
+    if op.get_bind().dialect.name != "postgresql":
+        return
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.execute(f"CREATE INDEX ix_projects_search_vector ON projects USING gin (({PROJECT_SEARCH_VECTOR}))")
+    for name, table, column in TRIGRAM_INDEXES:
+        op.execute(f"CREATE INDEX {name} ON {table} USING gin ({column} gin_trgm_ops)")
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name != "postgresql":
+        return
+    for name, _table, _column in reversed(TRIGRAM_INDEXES):
+        op.execute(f"DROP INDEX IF EXISTS {name}")
+    op.execute("DROP INDEX IF EXISTS ix_projects_search_vector")
@@ -0,0 +1,172 @@
+"""add precomputed commit summary columns
+
+Revision ID: d2b6f9e4c871
+Revises: c4d8e2f7a913
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+
+import json
+from typing import Any, Dict, Iterable, List, Sequence, Tuple, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "d2b6f9e4c871"
+down_revision: Union[str, None] = "c4d8e2f7a913"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+BATCH = 500
+
+
+# Frozen copies of CommitService.summarize_snapshot, PublishService.collect_video_urls
+# and the snapshot tree builder at the time of this revision.
+def _collect_video_urls(value: Any) -> List[str]:
+    urls: List[str] = []
+
+    def _is_video_url(s: str) -> bool:
+        v = s.strip().lower()
+        if not (v.startswith("http://") or v.startswith("https://") or v.startswith("file://")):
+            return False
+        return any(ext in v for ext in [".mp4", ".mov", ".m4v"])
+
+    def _walk(v: Any) -> None:
+        if isinstance(v, str):
+            if _is_video_url(v):
+                urls.append(v.strip())
+        elif isinstance(v, dict):
+            for vv in v.values():
+                _walk(vv)
+        elif isinstance(v, list):
+            for item in v:
+                _walk(item)
+
+    _walk(value)
+    return list(dict.fromkeys(urls))
+
+
+def _summarize(video_assets: Any) -> Dict[str, Any]:
+    video_urls = _collect_video_urls(video_assets)
+    asset_count = len(video_assets) if isinstance(video_assets, (dict, list)) else 0
+    clips: Any = video_assets.get("clips") if isinstance(video_assets, dict) else None
+    if isinstance(clips, list):
+        clip_count = len(clips)
+        total_duration = sum(
+            float(c["duration"])
+            for c in clips
+            if isinstance(c, dict) and isinstance(c.get("duration"), (int, float)) and not isinstance(c.get("duration"), bool)
+        )
+    else:
+        clip_count = len(video_urls)
+        total_duration = 0.0
+    return {
+        "asset_count": asset_count,
+        "clip_count": clip_count,
+        "total_duration": total_duration,
+        "video_urls": video_urls,
+    }
+
+
+def _build(root: str, objects: Dict[str, Tuple[str, Any]]) -> Any:
+    kind, data = objects[root]
+    if kind == "value":
+        return data
+    if kind == "chunks":
+        out: List[Any] = []
+        for chunk in data:
+            out.extend(_build(chunk, objects))
+        return out
+
+    def item(flag: int, payload: Any) -> Any:
+        return _build(payload, objects) if flag else payload
+
+    if kind == "dict":
+        return {k: item(flag, payload) for k, flag, payload in data}
+    return [item(flag, payload) for flag, payload in data]
+
+
+def _child_refs(kind: str, data: Any) -> List[str]:
+    if kind == "chunks":
+        return list(data)
+    if kind == "dict":
+        return [payload for _k, flag, payload in data if flag]
+    if kind == "list":
+        return [payload for flag, payload in data if flag]
+    return []
+
+
+def _json(value: Any) -> Any:
+    return json.loads(value) if isinstance(value, str) else value
+
+
+def _fetch_trees(bind, roots: Iterable[str]) -> Dict[str, Tuple[str, Any]]:
+    """Every object reachable from roots, one IN query per tree level and BATCH hashes."""
+    stmt = sa.text("SELECT hash, kind, data FROM snapshot_objects WHERE hash IN :hashes").bindparams(
+        sa.bindparam("hashes", expanding=True)
+    )
+    objects: Dict[str, Tuple[str, Any]] = {}
+    frontier = list(set(roots))
+    while frontier:
+        fetched: Dict[str, Tuple[str, Any]] = {}
+        for i in range(0, len(frontier), BATCH):
+            for h, kind, data in bind.execute(stmt, {"hashes": frontier[i : i + BATCH]}).fetchall():
+                fetched[h] = (kind, _json(data))
+        objects.update(fetched)
+        frontier = list({ref for kind, data in fetched.values() for ref in _child_refs(kind, data) if ref not in objects})
+    return objects
+
+
+def _backfill() -> None:
+    bind = op.get_bind()
+    stmt = sa.text(
+        "UPDATE commits SET asset_count = :asset_count, clip_count = :clip_count, "
+        "total_duration = :total_duration, video_urls = :video_urls WHERE id = :id"
+    ).bindparams(sa.bindparam("video_urls", type_=sa.JSON))
+    after = ""
+    while True:
+        rows = bind.execute(
+            sa.text("SELECT id, tree_hash, video_assets FROM commits WHERE id > :after ORDER BY id LIMIT :n"),
+            {"after": after, "n": BATCH},
+        ).fetchall()
+        if not rows:
+            return
+        objects = _fetch_trees(bind, [tree_hash for _id, tree_hash, _raw in rows if tree_hash])
+        bind.execute(
+            stmt,
+            [
+                {"id": commit_id, **_summarize(_build(tree_hash, objects) if tree_hash else _json(raw))}
+                for commit_id, tree_hash, raw in rows
+            ],
+        )
+        after = rows[-1][0]
+
+
+def upgrade() -> None:
+    columns = [
+        sa.Column("asset_count", sa.Integer(), nullable=True),
+        sa.Column("clip_count", sa.Integer(), nullable=True),
+        sa.Column("total_duration", sa.Float(), nullable=True),
+        sa.Column("video_urls", sa.JSON(), nullable=True),
+    ]
+    if op.get_bind().dialect.name == "sqlite":
+        with op.batch_alter_table("commits") as batch_op:
+            for column in columns:
+                batch_op.add_column(column)
+    else:
+        for column in columns:
+            op.add_column("commits", column)
+    _backfill()
+
+
+def downgrade() -> None:
+    names = ["video_urls", "total_duration", "clip_count", "asset_count"]
+    if op.get_bind().dialect.name == "sqlite":
+        with op.batch_alter_table("commits") as batch_op:
+            for name in names:
+                batch_op.drop_column(name)
+        return
+    for name in names:
+        op.drop_column("commits", name)
@@ -0,0 +1,77 @@
+"""add normalized project tags and tag counts
+
+Revision ID: d9b5f1c3e782
+Revises: c6e2a8f4d913
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+
+import json
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "d9b5f1c3e782"
+down_revision: Union[str, None] = "c6e2a8f4d913"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _normalize_tags(tags):
+    # Frozen copy of app.services.tag_service.normalize_tags at the time of this revision
+    out = []
+    for t in tags or []:
+        if isinstance(t, str) and t.strip() and t.strip() not in out:
+            out.append(t.strip())
+    return out
+
+
+def _backfill() -> None:
+    bind = op.get_bind()
+    rows = []
+    counts: dict[str, int] = {}
+    for project_id, tags, is_public in bind.execute(sa.text("SELECT id, tags, is_public FROM projects")).fetchall():
+        if isinstance(tags, str):
+            try:
+                tags = json.loads(tags)
+            except ValueError:
+                tags = None
+        for tag in _normalize_tags(tags if isinstance(tags, list) else None):
+            rows.append({"project_id": project_id, "tag": tag})
+            if is_public:
+                counts[tag] = counts.get(tag, 0) + 1
+    stmt = sa.text("INSERT INTO project_tags (project_id, tag) VALUES (:project_id, :tag)")
+    for i in range(0, len(rows), 1000):
+        bind.execute(stmt, rows[i : i + 1000])
+    if counts:
+        bind.execute(
+            sa.text("INSERT INTO tag_counts (tag, project_count) VALUES (:tag, :count)"),
+            [{"tag": t, "count": c} for t, c in counts.items()],
+        )
+
+
+def upgrade() -> None:
+    op.create_table(
+        "project_tags",
+        sa.Column("project_id", sa.Integer(), sa.ForeignKey("projects.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("tag", sa.String(), nullable=False),
+        sa.PrimaryKeyConstraint("project_id", "tag"),
+    )
+    op.create_index("ix_project_tags_tag_project_id", "project_tags", ["tag", "project_id"], unique=False)
+    op.create_table(
+        "tag_counts",
+        sa.Column("tag", sa.String(), nullable=False),
+        sa.Column("project_count", sa.Integer(), nullable=False, server_default="0"),
+        sa.PrimaryKeyConstraint("tag"),
+    )
+    op.create_index(op.f("ix_tag_counts_project_count"), "tag_counts", ["project_count"], unique=False)
+    _backfill()
+
+
+def downgrade() -> None:
+    op.drop_index(op.f("ix_tag_counts_project_count"), table_name="tag_counts")
+    op.drop_table("tag_counts")
+    op.drop_index("ix_project_tags_tag_project_id", table_name="project_tags")
+    op.drop_table("project_tags")
@@ -0,0 +1,36 @@
+"""add fork commit to projects for copy-on-write forks
+
+Revision ID: e5a1c7d3b942
+Revises: d2b6f9e4c871
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "e5a1c7d3b942"
+down_revision: Union[str, None] = "d2b6f9e4c871"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    if op.get_bind().dialect.name == "sqlite":
+        with op.batch_alter_table("projects") as batch_op:
+            batch_op.add_column(sa.Column("fork_commit_id", sa.String(), nullable=True))
+    else:
+        op.add_column("projects", sa.Column("fork_commit_id", sa.String(), nullable=True))
+    op.create_index(op.f("ix_projects_fork_commit_id"), "projects", ["fork_commit_id"], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f("ix_projects_fork_commit_id"), table_name="projects")
+    if op.get_bind().dialect.name == "sqlite":
+        with op.batch_alter_table("projects") as batch_op:
+            batch_op.drop_column("fork_commit_id")
+        return
+    op.drop_column("projects", "fork_commit_id")
@@ -0,0 +1,78 @@
+"""add composite and partial indexes for hot query shapes
+
+Revision ID: e8a3c5f1b274
+Revises: d9b5f1c3e782
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "e8a3c5f1b274"
+down_revision: Union[str, None] = "d9b5f1c3e782"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+INDEXES = [
+    ("ix_commits_project_id_created_at", "commits", ["project_id", "created_at"]),
+    ("ix_likes_project_id", "likes", ["project_id"]),
+    ("ix_clip_segments_project_id_branch_id_id", "clip_segments", ["project_id", "branch_id", sa.text("id DESC")]),
+]
+
+# (name, partial index columns, columns of the full index it replaces)
+FEED_INDEXES = [
+    ("ix_projects_public_likes_count", ["likes_count", "created_at", "id"], ["is_public", "likes_count", "created_at"]),
+    ("ix_projects_public_created_at_id", ["created_at", "id"], ["is_public", "created_at", "id"]),
+]
+
+
+def _rename_duplicate_branches() -> None:
+    # Older rows may repeat a name within a project; keep the first and suffix the rest with their id.
+    op.execute(
+        "UPDATE branches SET name = name || '-' || CAST(id AS VARCHAR) "
+        "WHERE id NOT IN (SELECT min(id) FROM branches GROUP BY project_id, name)"
+    )
+
+
+def upgrade() -> None:
+    for name, table, columns in INDEXES:
+        op.create_index(name, table, columns, unique=False)
+
+    # The feed only ever reads public projects: index just those rows
+    for name, columns, _old_columns in FEED_INDEXES:
+        op.drop_index(name, table_name="projects")
+        op.create_index(
+            name,
+            "projects",
+            columns,
+            unique=False,
+            postgresql_where=sa.text("is_public"),
+            sqlite_where=sa.text("is_public = 1"),
+        )
+
+    _rename_duplicate_branches()
+    if op.get_bind().dialect.name == "sqlite":
+        with op.batch_alter_table("branches") as batch_op:
+            batch_op.create_unique_constraint("uq_branches_project_id_name", ["project_id", "name"])
+    else:
+        op.create_unique_constraint("uq_branches_project_id_name", "branches", ["project_id", "name"])
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name == "sqlite":
+        with op.batch_alter_table("branches") as batch_op:
+            batch_op.drop_constraint("uq_branches_project_id_name", type_="unique")
+    else:
+        op.drop_constraint("uq_branches_project_id_name", "branches", type_="unique")
+
+    for name, _columns, old_columns in reversed(FEED_INDEXES):
+        op.drop_index(name, table_name="projects")
+        op.create_index(name, "projects", old_columns, unique=False)
+
+    for name, table, _columns in reversed(INDEXES):
+        op.drop_index(name, table_name=table)
@@ -0,0 +1,43 @@
+"""add denormalized likes_count to projects
+
+Revision ID: f3c9a6d1e258
+Revises: e5a1c7d3b942
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "f3c9a6d1e258"
+down_revision: Union[str, None] = "e5a1c7d3b942"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    column = sa.Column("likes_count", sa.Integer(), nullable=False, server_default="0")
+    if op.get_bind().dialect.name == "sqlite":
+        with op.batch_alter_table("projects") as batch_op:
+            batch_op.add_column(column)
+    else:
+        op.add_column("projects", column)
+    op.execute(
+        "UPDATE projects SET likes_count = "
+        "(SELECT count(*) FROM likes WHERE likes.project_id = projects.id)"
+    )
+    op.create_index(
+        "ix_projects_public_likes_count", "projects", ["is_public", "likes_count", "created_at"], unique=False
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_projects_public_likes_count", table_name="projects")
+    if op.get_bind().dialect.name == "sqlite":
+        with op.batch_alter_table("projects") as batch_op:
+            batch_op.drop_column("likes_count")
+        return
+    op.drop_column("projects", "likes_count")
@@ -5,6 +5,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 
 from app.api import deps
+from app.core.cache import cache, project_tag
 from app.models.user import User
 from app.models.project import Project
 from app.models.branch import Branch
@@ -66,6 +67,7 @@ async def create_branch(
         parent_public_id = parent.public_id
     await db.commit()
     await db.refresh(branch)
+    await cache.invalidate_tags(project_tag(project.internal_id))
     return BranchResponse.model_validate(
         {
             "id": branch.public_id,
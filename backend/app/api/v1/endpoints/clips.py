@@ -1,11 +1,12 @@
 from typing import Any, Optional
 
 from celery.result import AsyncResult
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Response
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api import deps
+from app.core.pagination import MAX_PAGE_SIZE, decode_cursor, keyset_after, page_limit, set_next_cursor
 from app.models.clip_segment import ClipSegment as ClipSegmentModel
 from app.models.project import Project
 from app.models.user import User
@@ -23,8 +24,11 @@ def _is_terminal(status: str) -> bool:
 
 @router.get("/", response_model=list[ClipSegmentSchema])
 async def list_clips(
+    response: Response,
     project_id: Optional[str] = None,
     branch_name: Optional[str] = None,
+    limit: int = MAX_PAGE_SIZE,
+    cursor: Optional[str] = None,
     db: AsyncSession = Depends(deps.get_db),
     current_user: User = Depends(deps.get_current_user),
 ) -> Any:
@@ -48,12 +52,22 @@ async def list_clips(
     else:
         q = q.where(ClipSegmentModel.owner_internal_id == current_user.internal_id)
 
-    res = await db.execute(q.order_by(ClipSegmentModel.internal_id.desc()).limit(200))
+    after = decode_cursor(cursor)
+    if after:
+        q = q.where(keyset_after([ClipSegmentModel.internal_id], [ClipSegmentModel.public_id == after]))
+    limit = page_limit(limit)
+    res = await db.execute(q.order_by(ClipSegmentModel.internal_id.desc()).limit(limit))
     items = list(res.scalars().all())
+    set_next_cursor(response, items, limit)
+    # One lookup per page rather than per clip
+    project_ids = {} if project_id else await publish_service.resolve_project_public_ids(
+        db, [c.project_internal_id for c in items]
+    )
+    branch_names = {} if branch_name else await publish_service.resolve_branch_names(db, [c.branch_id for c in items])
     out: list[ClipSegmentSchema] = []
     for c in items:
-        pid = project_id or (await publish_service.resolve_project_public_id(db, c.project_internal_id)) or ""
-        bn = branch_name or (await publish_service.resolve_branch_name(db, c.branch_id))
+        pid = project_id or project_ids.get(c.project_internal_id) or ""
+        bn = branch_name or branch_names.get(c.branch_id)
         out.append(
             ClipSegmentSchema.model_validate(
                 {
@@ -1,12 +1,16 @@
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional
 from fastapi import APIRouter, Depends, HTTPException
 from pydantic import BaseModel
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api import deps
 from app.models.user import User
+from app.models.commit import Commit
+from app.models.project import Project
 from app.services.commit_service import commit_service
+from app.services.diff_service import diff_service
 from app.services.project_service import ProjectService
+from app.services.snapshot_service import SnapshotService
 
 router = APIRouter()
 
@@ -16,6 +20,29 @@ class CommitCreate(BaseModel):
     video_assets: Dict[str, Any]
     branch_name: str = "main"
     parent_hash: Optional[str] = None
+    # Merge onto a moved HEAD instead of failing with 409; clips changed on both sides still conflict
+    rebase_on_conflict: bool = False
+
+class CommitPushItem(BaseModel):
+    message: str
+    video_assets: Dict[str, Any]
+    # Client-computed hash; requires the timestamp it was computed with
+    id: Optional[str] = None
+    timestamp: Optional[str] = None
+    parent_hash: Optional[str] = None
+
+class CommitPush(BaseModel):
+    project_id: str
+    branch_name: str = "main"
+    # Expected HEAD the run builds on (defaults to the first commit's parent, then the current HEAD)
+    parent_hash: Optional[str] = None
+    commits: List[CommitPushItem]
+
+class CommitPushResponse(BaseModel):
+    branch_name: str
+    head_commit_id: str
+    created: List[str]
+    skipped: List[str]
 
 class CommitResponse(BaseModel):
     id: str
@@ -48,7 +75,8 @@ async def create_commit(
         message=commit_in.message,
         video_assets=commit_in.video_assets,
         branch_name=commit_in.branch_name,
-        parent_hash=commit_in.parent_hash
+        parent_hash=commit_in.parent_hash,
+        rebase_on_conflict=commit_in.rebase_on_conflict,
     )
     return CommitResponse.model_validate(
         {
@@ -56,7 +84,55 @@ async def create_commit(
             "project_id": project.public_id,
             "message": commit.message,
             "parent_hash": commit.parent_hash,
-            "video_assets": commit.video_assets,
+            # What the commit stores: a rebased commit holds the merged snapshot
+            "video_assets": await SnapshotService.load(db, commit),
             "created_at": commit.created_at,
         }
     )
+
+
+@router.post("/batch", response_model=CommitPushResponse)
+async def push_commits(
+    push_in: CommitPush,
+    db: AsyncSession = Depends(deps.get_db),
+    current_user: User = Depends(deps.get_current_user),
+) -> Any:
+    """
+    Push an ordered list of commits (oldest first) to a branch in one transaction.
+    """
+    project = await ProjectService.resolve_project(db, push_in.project_id)
+    if not project:
+        raise HTTPException(status_code=404, detail="Project not found")
+    return await commit_service.push_commits(
+        db=db,
+        project_id=project.internal_id,
+        author_id=current_user.internal_id,
+        commits=[c.model_dump() for c in push_in.commits],
+        branch_name=push_in.branch_name,
+        parent_hash=push_in.parent_hash,
+    )
+
+
+async def _readable_commit(db: AsyncSession, commit_id: str, user: User) -> Commit:
+    commit = await diff_service.get_commit(db, commit_id)
+    project = await db.get(Project, commit.project_id)
+    if not project or not (project.is_public or project.owner_internal_id == user.internal_id):
+        raise HTTPException(status_code=404, detail=f"Commit {commit_id} not found")
+    return commit
+
+
+@router.get("/diff", response_model=Dict[str, Any])
+async def diff_commits(
+    head: str,
+    base: Optional[str] = None,
+    db: AsyncSession = Depends(deps.get_db),
+    current_user: User = Depends(deps.get_current_user),
+) -> Any:
+    """
+    Structural diff between two commits (clips added/removed/modified/moved).
+    Without base the head commit is compared with its parent.
+    """
+    head_commit = await _readable_commit(db, head, current_user)
+    base_id = base or head_commit.parent_hash
+    base_commit = await _readable_commit(db, base_id, current_user) if base_id else None
+    return await diff_service.diff_commits(db, base_commit, head_commit)
@@ -1,17 +1,20 @@
 from datetime import datetime, timezone
 from typing import Any, Optional
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Response
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api import deps
+from app.core.pagination import MAX_PAGE_SIZE, decode_cursor, keyset_after, page_limit, set_next_cursor
 from app.models.branch import Branch
 from app.models.clip_segment import ClipSegment as ClipSegmentModel
 from app.models.merge_request import MergeRequest as MergeRequestModel
 from app.models.project import Project
 from app.models.user import User
 from app.schemas.merge_request import MergeRequest as MergeRequestSchema, MergeRequestCreate
+from app.services.ancestry_service import AncestryService
+from app.services.diff_service import diff_service
 from app.services.publish_service import publish_service
 
 
@@ -126,7 +129,10 @@ async def create_merge_request(
 
 @router.get("/projects/{project_id}/merge-requests", response_model=list[MergeRequestSchema])
 async def list_merge_requests(
+    response: Response,
     project_id: str,
+    limit: int = MAX_PAGE_SIZE,
+    cursor: Optional[str] = None,
     db: AsyncSession = Depends(deps.get_db),
     current_user: User = Depends(deps.get_current_user),
 ) -> Any:
@@ -137,19 +143,25 @@ async def list_merge_requests(
     if not is_owner:
         q = q.where(MergeRequestModel.creator_internal_id == current_user.internal_id)
 
-    res = await db.execute(q.order_by(MergeRequestModel.internal_id.desc()).limit(200))
+    after = decode_cursor(cursor)
+    if after:
+        q = q.where(keyset_after([MergeRequestModel.internal_id], [MergeRequestModel.public_id == after]))
+    limit = page_limit(limit)
+    res = await db.execute(q.order_by(MergeRequestModel.internal_id.desc()).limit(limit))
     items = list(res.scalars().all())
+    set_next_cursor(response, items, limit)
+    branch_names = await publish_service.resolve_branch_names(
+        db, [b for mr in items for b in (mr.source_branch_id, mr.target_branch_id)]
+    )
     out: list[MergeRequestSchema] = []
     for mr in items:
-        sb = await db.get(Branch, mr.source_branch_id)
-        tb = await db.get(Branch, mr.target_branch_id)
         out.append(
             MergeRequestSchema.model_validate(
                 _to_schema_dict(
                     mr=mr,
                     project_id=project_id,
-                    source_branch_name=sb.name if sb else "",
-                    target_branch_name=tb.name if tb else "",
+                    source_branch_name=branch_names.get(mr.source_branch_id, ""),
+                    target_branch_name=branch_names.get(mr.target_branch_id, ""),
                 )
             )
         )
@@ -188,6 +200,38 @@ async def get_merge_request(
     )
 
 
+@router.get("/merge-requests/{mr_id}/diff", response_model=dict[str, Any])
+async def get_merge_request_diff(
+    mr_id: str,
+    db: AsyncSession = Depends(deps.get_db),
+    current_user: User = Depends(deps.get_current_user),
+) -> Any:
+    """
+    What merging would bring in: the source branch HEAD diffed against its merge base with the target.
+    """
+    mr = (await db.execute(select(MergeRequestModel).where(MergeRequestModel.public_id == mr_id))).scalar_one_or_none()
+    if not mr:
+        raise HTTPException(status_code=404, detail="Merge request not found")
+
+    project = await db.get(Project, mr.project_internal_id)
+    if not project:
+        raise HTTPException(status_code=404, detail="Project not found")
+
+    is_owner = project.owner_internal_id == current_user.internal_id
+    is_creator = mr.creator_internal_id == current_user.internal_id
+    if not (is_owner or is_creator):
+        raise HTTPException(status_code=404, detail="Merge request not found")
+
+    sb = await db.get(Branch, mr.source_branch_id)
+    tb = await db.get(Branch, mr.target_branch_id)
+    if not sb or not sb.head_commit_id:
+        raise HTTPException(status_code=400, detail="Source branch has no commits")
+    base_id = await AncestryService.merge_base(db, tb.head_commit_id, sb.head_commit_id) if tb and tb.head_commit_id else None
+    head = await diff_service.get_commit(db, sb.head_commit_id)
+    base = await diff_service.get_commit(db, base_id) if base_id else None
+    return await diff_service.diff_commits(db, base, head)
+
+
 @router.post("/merge-requests/{mr_id}/close", response_model=MergeRequestSchema)
 async def close_merge_request(
     mr_id: str,
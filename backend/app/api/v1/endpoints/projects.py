@@ -1,10 +1,11 @@
 from typing import Any, List, Dict, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Response, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 
 from app.api import deps
+from app.core.pagination import decode_cursor, page_limit, set_next_cursor
 from app.models.user import User
 from app.models.branch import Branch
 from app.schemas.project import Project, ProjectCreate, ProjectUpdate, ProjectFork, ProjectFeedItem, ProjectDeleteConfirm, ProjectExportPayload
@@ -12,6 +13,7 @@ from app.schemas.branch import Branch as BranchSchema
 from app.services.project_service import ProjectService
 from app.services.branch_service import branch_service
 from app.services.feed_service import FeedService
+from app.services.snapshot_service import SnapshotService
 from pydantic import BaseModel
 from app.models.commit import Commit
 
@@ -19,19 +21,29 @@ router = APIRouter()
 
 @router.get("/feed", response_model=List[ProjectFeedItem])
 async def read_public_feed(
+    response: Response,
     skip: int = 0,
     limit: int = 20,
     query: Optional[str] = None,
     tag: Optional[str] = None,
     sort: str = "new",
+    cursor: Optional[str] = None,
     db: AsyncSession = Depends(deps.get_db),
     current_user: Optional[User] = Depends(deps.get_current_user_optional), # Allow anonymous
 ) -> Any:
     """
-    Get public project feed.
+    Get public project feed. sort: "new", "hot" (most likes), "trending"
+    (time-decayed activity, recomputed every few minutes) or "relevance" (best
+    match for `query` first). Pass the X-Next-Cursor
+    response header back as `cursor` to fetch the next page.
     """
     user_id = current_user.internal_id if current_user else None
-    return await FeedService.get_public_feed(db, user_id, skip, limit, query, tag, sort)
+    limit = page_limit(limit)
+    items = await FeedService.get_public_feed(
+        db, user_id, skip, limit, query, tag, sort, after=decode_cursor(cursor)
+    )
+    set_next_cursor(response, items, limit)
+    return items
 
 @router.get("/public/{project_id}", response_model=ProjectFeedItem)
 async def read_public_project(
@@ -60,8 +72,10 @@ async def create_project(
 @router.get("", response_model=List[Project])
 @router.get("/", response_model=List[Project])
 async def read_projects(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
     db: AsyncSession = Depends(deps.get_db),
     current_user: User = Depends(deps.get_current_user),
 ) -> Any:
@@ -69,7 +83,12 @@ async def read_projects(
     Retrieve current user's projects.
     Includes both owned projects and projects where the user has created branches (forked).
     """
-    return await ProjectService.get_involved_projects(db, current_user.internal_id, skip, limit)
+    limit = page_limit(limit)
+    items = await ProjectService.get_involved_projects(
+        db, current_user.internal_id, skip, limit, after=decode_cursor(cursor)
+    )
+    set_next_cursor(response, items, limit)
+    return items
 
 @router.get("/{project_id}", response_model=Project)
 async def read_project(
@@ -157,7 +176,7 @@ async def export_project(
     if branch.head_commit_id:
         commit = await db.get(Commit, branch.head_commit_id)
         if commit:
-            head_commit = {"message": commit.message, "video_assets": commit.video_assets}
+            head_commit = {"message": commit.message, "video_assets": await SnapshotService.load(db, commit)}
 
     return {
         "source": {"cloud_project_id": project.public_id, "cloud_branch_name": branch.name, "cloud_origin": None},
@@ -252,6 +271,27 @@ async def read_project_graph(
     
     return await branch_service.get_project_graph(db, project.internal_id)
 
+@router.get("/{project_id}/graph/window", response_model=Dict[str, Any])
+async def read_project_graph_window(
+    project_id: str,
+    cursor: Optional[str] = None,
+    depth: int = 50,
+    limit: int = 500,
+    branch_name: Optional[str] = None,
+    db: AsyncSession = Depends(deps.get_db),
+    current_user: User = Depends(deps.get_current_user),
+) -> Any:
+    """
+    Get a bounded slice of the project commit graph (newest first) for incremental loading.
+    """
+    project = await ProjectService.resolve_project(db, project_id)
+    if not project:
+        raise HTTPException(status_code=404, detail="Project not found")
+    if project.owner_internal_id != current_user.internal_id:
+        raise HTTPException(status_code=403, detail="Not enough permissions")
+
+    return await branch_service.get_project_graph_window(db, project.internal_id, cursor, depth, limit, branch_name)
+
 @router.get("/{project_id}/head", response_model=Dict[str, Any])
 async def read_project_head(
     project_id: str,
@@ -357,6 +397,25 @@ async def fork_project(
         raise HTTPException(status_code=404, detail=str(e))
 
 
+@router.get("/{project_id}/lineage", response_model=Dict[str, Any])
+async def read_project_lineage(
+    project_id: str,
+    db: AsyncSession = Depends(deps.get_db),
+    current_user: Optional[User] = Depends(deps.get_current_user_optional),
+) -> Any:
+    """
+    Fork lineage: the projects this one was forked from (nearest first, with the shared
+    commit each fork was made at) and its direct forks.
+    """
+    project = await ProjectService.resolve_project(db, project_id)
+    if not project:
+        raise HTTPException(status_code=404, detail="Project not found")
+    user_id = current_user.internal_id if current_user else None
+    if not project.is_public and project.owner_internal_id != user_id:
+        raise HTTPException(status_code=403, detail="Not enough permissions")
+    return await ProjectService.get_fork_lineage(db, project, user_id)
+
+
 class ForkBranchCreate(BaseModel):
     source_branch_name: str = "main"
     from_commit_hash: Optional[str] = None
@@ -0,0 +1,26 @@
+from typing import Any, List
+
+from fastapi import APIRouter, Depends
+from pydantic import BaseModel
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api import deps
+from app.services.tag_service import TagService
+
+router = APIRouter()
+
+
+class TagCountOut(BaseModel):
+    tag: str
+    count: int
+
+
+@router.get("/trending", response_model=List[TagCountOut])
+async def read_trending_tags(
+    limit: int = 50,
+    db: AsyncSession = Depends(deps.get_db),
+) -> Any:
+    """
+    Most used tags across public projects, from precomputed counts.
+    """
+    return await TagService.trending(db, max(1, min(limit, 200)))
@@ -1,37 +1,43 @@
 from typing import Any, List, Optional
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Response
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, or_
+from sqlalchemy import select
 
 from app.api import deps
+from app.core.pagination import decode_cursor, keyset_after, page_limit, set_next_cursor
 from app.models.user import User
 from app.schemas.user import User as UserSchema, UserPublic
 from app.schemas.project import ProjectFeedItem as ProjectSchema
 from app.services.feed_service import FeedService
+from app.services.search_service import SearchService
 
 router = APIRouter()
 
 @router.get("/search", response_model=List[UserPublic])
 async def search_users(
+    response: Response,
     query: str,
     skip: int = 0,
     limit: int = 20,
+    cursor: Optional[str] = None,
     db: AsyncSession = Depends(deps.get_db),
 ) -> Any:
+    after = decode_cursor(cursor)
     text = query.strip()
     if not text:
         return []
-    q = select(User)
-    conditions = [User.email.ilike(f"%{text}%")]
-    if hasattr(User, "full_name"):
-        conditions.append(User.full_name.ilike(f"%{text}%"))
-    if text.isdigit():
-        conditions.append(User.internal_id == int(text))
-    if len(text) >= 8:
-        conditions.append(User.public_id.ilike(f"%{text}%"))
-    q = q.where(or_(*conditions)).offset(skip).limit(limit)
-    result = await db.execute(q)
-    return result.scalars().all()
+    condition, relevance = SearchService.users(db, text)
+    keys = [relevance, User.internal_id]
+    q = select(User).where(condition).order_by(*(k.desc() for k in keys))
+    if after:
+        q = q.where(keyset_after(keys, [User.public_id == after]))
+    else:
+        q = q.offset(skip)
+    limit = page_limit(limit)
+    result = await db.execute(q.limit(limit))
+    items = result.scalars().all()
+    set_next_cursor(response, items, limit)
+    return items
 
 @router.get("/me", response_model=UserSchema)
 async def read_users_me(
@@ -62,9 +68,11 @@ async def read_user(
 
 @router.get("/{user_id}/projects", response_model=List[ProjectSchema])
 async def read_user_projects(
+    response: Response,
     user_id: str,
     skip: int = 0,
     limit: int = 20,
+    cursor: Optional[str] = None,
     db: AsyncSession = Depends(deps.get_db),
     current_user: Optional[User] = Depends(deps.get_current_user_optional),
 ) -> Any:
@@ -82,4 +90,9 @@ async def read_user_projects(
          raise HTTPException(status_code=404, detail="User not found")
 
     current_user_id = current_user.internal_id if current_user else None
-    return await FeedService.get_user_public_projects(db, target_user.internal_id, current_user_id, skip, limit)
+    limit = page_limit(limit)
+    items = await FeedService.get_user_public_projects(
+        db, target_user.internal_id, current_user_id, skip, limit, after=decode_cursor(cursor)
+    )
+    set_next_cursor(response, items, limit)
+    return items
@@ -2,11 +2,12 @@ from typing import Any, Optional
 
 from celery.result import AsyncResult
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Response
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api import deps
+from app.core.pagination import MAX_PAGE_SIZE, decode_cursor, keyset_after, page_limit, set_next_cursor
 from app.core.config import settings
 from app.models.user import User
 from app.models.clip_segment import ClipSegment as ClipSegmentModel
@@ -167,9 +168,12 @@ async def create_vn_asset(
 
 @router.get("/assets", response_model=list[VNAssetSchema])
 async def list_vn_assets(
+    response: Response,
     project_id: Optional[str] = None,
     branch_name: Optional[str] = None,
     type: Optional[str] = None,
+    limit: int = MAX_PAGE_SIZE,
+    cursor: Optional[str] = None,
     db: AsyncSession = Depends(deps.get_db),
     current_user: User = Depends(deps.get_current_user),
 ) -> Any:
@@ -190,8 +194,13 @@ async def list_vn_assets(
     if type:
         q = q.where(VNAsset.type == type)
 
-    res = await db.execute(q.order_by(VNAsset.internal_id.desc()).limit(200))
+    after = decode_cursor(cursor)
+    if after:
+        q = q.where(keyset_after([VNAsset.internal_id], [VNAsset.public_id == after]))
+    limit = page_limit(limit)
+    res = await db.execute(q.order_by(VNAsset.internal_id.desc()).limit(limit))
     items = list(res.scalars().all())
+    set_next_cursor(response, items, limit)
 
     out: list[VNAssetSchema] = []
     for a in items:
@@ -1,45 +1,430 @@
 import redis.asyncio as redis
+import asyncio
 import json
-from typing import Optional, Any
-import fnmatch
+import math
+import random
+import time
+import uuid
+from collections import OrderedDict
+from typing import Optional, Any, Awaitable, Callable, Iterable
 from app.core.config import settings
+from app.core.metrics import cache_lookups, cache_prefix
+
+
+def project_tag(project_id: int) -> str:
+    """Tag shared by every cache entry derived from a project's branches/commits."""
+    return f"project:{project_id}"
+
+
+# Tag of every cached public feed page; dropped whenever a public project changes.
+FEED_TAG = "feed"
+# Also carried by pages sorted by likes; dropped when stored like counts change.
+FEED_HOT_TAG = "feed:hot"
+
+
+class LocalLRUCache:
+    """
+    In-process LRU bounded by entry count, total payload bytes and per-entry TTL.
+    Values are stored as encoded JSON strings so callers never share mutable state.
+    Each entry may carry invalidation tags so a tag can be dropped without key patterns.
+    """
+
+    def __init__(self, max_entries: int, max_bytes: int, ttl: int):
+        self.max_entries = max(int(max_entries), 0)
+        self.max_bytes = max(int(max_bytes), 0)
+        self.ttl = max(int(ttl), 0)
+        self._data: "OrderedDict[str, tuple[str, float, tuple[str, ...]]]" = OrderedDict()
+        self._bytes = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    @property
+    def size_bytes(self) -> int:
+        return self._bytes
+
+    def get(self, key: str) -> Optional[str]:
+        item = self._data.get(key)
+        if item is None:
+            return None
+        payload, expires_at, _tags = item
+        if expires_at <= time.monotonic():
+            self._drop(key)
+            return None
+        self._data.move_to_end(key)
+        return payload
+
+    def set(self, key: str, payload: str, ttl: Optional[int] = None, tags: Iterable[str] = ()) -> None:
+        ttl = self.ttl if ttl is None else min(int(ttl), self.ttl)
+        size = len(payload)
+        if ttl <= 0 or self.max_entries == 0 or size > self.max_bytes:
+            self._drop(key)
+            return
+        self._drop(key)
+        self._data[key] = (payload, time.monotonic() + ttl, tuple(tags))
+        self._bytes += size
+        while len(self._data) > self.max_entries or self._bytes > self.max_bytes:
+            oldest = next(iter(self._data))
+            self._drop(oldest)
+
+    def delete(self, key: str) -> None:
+        self._drop(key)
+
+    def delete_tag(self, tag: str) -> None:
+        for k in [k for k, item in self._data.items() if tag in item[2]]:
+            self._drop(k)
+
+    def clear(self) -> None:
+        self._data.clear()
+        self._bytes = 0
+
+    def _drop(self, key: str) -> None:
+        item = self._data.pop(key, None)
+        if item is not None:
+            self._bytes -= len(item[0])
+
 
 class RedisCache:
+    """
+    Two-tier cache: a bounded in-process LRU (L1) in front of Redis (L2).
+
+    L1 entries live at most CACHE_LOCAL_TTL_SECONDS. Tagged L1 hits are checked
+    against the tag generations this worker last read, which are re-read from
+    Redis at most every CACHE_TAG_VERSION_TTL_SECONDS, so L1 hits make no network
+    call and an invalidation by another worker is seen within that interval
+    (invalidations by this worker at once). The L1 TTL bounds staleness only for
+    untagged keys deleted elsewhere, or while Redis is unreachable. When Redis is
+    unreachable the cache keeps serving from L1 only and skips Redis for
+    CACHE_REDIS_RETRY_SECONDS instead of paying a connection error per call.
+
+    Invalidation is tag based: every tag has a generation counter in Redis and
+    entries remember the generations they were built against. Invalidating a
+    tag is a single INCR; entries built against an older generation are treated
+    as misses and age out through their TTL. Generation counters never expire,
+    so a counter cannot wrap back to a value a live entry was stored with.
+    """
+
+    TAG_VERSION_PREFIX = "cache:tagver:"
+    LOCK_PREFIX = "cache:lock:"
+    _RELEASE_LOCK_SCRIPT = (
+        "if redis.call('get', KEYS[1]) == ARGV[1] then return redis.call('del', KEYS[1]) else return 0 end"
+    )
+
     def __init__(self):
         self.redis = redis.from_url(settings.CELERY_RESULT_BACKEND, encoding="utf-8", decode_responses=True)
-        self._mem: dict[str, str] = {}
+        self.local = LocalLRUCache(
+            max_entries=settings.CACHE_LOCAL_MAX_ENTRIES,
+            max_bytes=settings.CACHE_LOCAL_MAX_BYTES,
+            ttl=settings.CACHE_LOCAL_TTL_SECONDS,
+        )
+        self._redis_retry_at = 0.0
+        # tag -> (generation, monotonic time it stops being trusted)
+        self._tag_generations: dict[str, tuple[int, float]] = {}
+        self._flights: dict[str, asyncio.Future] = {}
+        self.stats = {
+            "local_hits": 0,
+            "local_misses": 0,
+            "redis_hits": 0,
+            "redis_misses": 0,
+            "redis_stale": 0,
+            "redis_errors": 0,
+            "builds": 0,
+            "coalesced": 0,
+            "stale_served": 0,
+        }
+
+    def _redis_available(self) -> bool:
+        return time.monotonic() >= self._redis_retry_at
+
+    def _mark_redis_down(self) -> None:
+        self.stats["redis_errors"] += 1
+        self._redis_retry_at = time.monotonic() + settings.CACHE_REDIS_RETRY_SECONDS
+
+    def redis_available(self) -> bool:
+        """
+        Whether callers sharing this Redis connection should try it; false for
+        CACHE_REDIS_RETRY_SECONDS after any caller reported an error.
+        """
+        return self._redis_available()
 
-    async def get(self, key: str) -> Optional[Any]:
+    def report_redis_error(self) -> None:
+        """Record a failed Redis call so every caller skips Redis for the retry window."""
+        self._mark_redis_down()
+
+    def _tag_key(self, tag: str) -> str:
+        return f"{self.TAG_VERSION_PREFIX}{tag}"
+
+    def _remember_generations(self, versions: dict[str, int]) -> None:
+        until = time.monotonic() + settings.CACHE_TAG_VERSION_TTL_SECONDS
+        for t, v in versions.items():
+            self._tag_generations[t] = (int(v), until)
+
+    def get_stats(self) -> dict[str, int]:
+        return {**self.stats, "local_entries": len(self.local), "local_bytes": self.local.size_bytes}
+
+    async def tag_versions(self, tags: Iterable[str]) -> dict[str, int]:
+        """
+        Current generation of each tag. Capture this before reading the source
+        data and pass it to set() so a concurrent invalidation is never masked.
+        """
+        tags = list(tags)
+        if not tags or not self._redis_available():
+            return {t: 0 for t in tags}
         try:
-            value = await self.redis.get(key)
-            if value:
-                return json.loads(value)
-            return None
+            raw = await self.redis.mget([self._tag_key(t) for t in tags])
         except Exception:
-            value = self._mem.get(key)
-            return json.loads(value) if value else None
+            self._mark_redis_down()
+            return {t: 0 for t in tags}
+        versions = {t: int(v or 0) for t, v in zip(tags, raw)}
+        self._remember_generations(versions)
+        return versions
+
+    async def _local_tags_current(self, key: str, envelope: dict) -> bool:
+        """
+        Whether an L1 entry's tag generations are still current; dropped from L1
+        if not. Only generations not read within the trust interval cost an MGET.
+        """
+        stored = envelope.get("t") or {}
+        if not stored:
+            return True
+        now = time.monotonic()
+        current: dict[str, int] = {}
+        expired = []
+        for t in stored:
+            known = self._tag_generations.get(t)
+            if known is not None and known[1] > now:
+                current[t] = known[0]
+            else:
+                expired.append(t)
+        if expired and self._redis_available():
+            try:
+                raw = await self.redis.mget([self._tag_key(t) for t in expired])
+            except Exception:
+                self._mark_redis_down()
+            else:
+                fetched = {t: int(v or 0) for t, v in zip(expired, raw)}
+                self._remember_generations(fetched)
+                current.update(fetched)
+        if any(t in current and current[t] != int(v) for t, v in stored.items()):
+            self.local.delete(key)
+            return False
+        return True
+
+    async def _lookup(self, key: str, tags: list[str]) -> tuple[Optional[dict], bool]:
+        """
+        Return (envelope, fresh). An envelope that is past its soft expiry or was
+        built against an older tag generation is returned with fresh=False so
+        callers can serve it while one of them rebuilds.
+        """
+        payload = self.local.get(key)
+        if payload is not None:
+            envelope = json.loads(payload)
+            if envelope.get("x", float("inf")) > time.time() and await self._local_tags_current(key, envelope):
+                self.stats["local_hits"] += 1
+                cache_lookups.inc(prefix=cache_prefix(key), result="local_hit")
+                return envelope, True
+        self.stats["local_misses"] += 1
 
-    async def set(self, key: str, value: Any, expire: int = 300):
-        payload = json.dumps(value)
+        if not self._redis_available():
+            cache_lookups.inc(prefix=cache_prefix(key), result="miss")
+            return None, False
         try:
-            await self.redis.set(key, payload, ex=expire)
+            raw = await self.redis.mget([key] + [self._tag_key(t) for t in tags])
         except Exception:
-            self._mem[key] = payload
+            self._mark_redis_down()
+            cache_lookups.inc(prefix=cache_prefix(key), result="miss")
+            return None, False
+        envelope = json.loads(raw[0]) if raw[0] else None
+        if not isinstance(envelope, dict) or "v" not in envelope:
+            self.stats["redis_misses"] += 1
+            cache_lookups.inc(prefix=cache_prefix(key), result="miss")
+            return None, False
+
+        current = {t: int(v or 0) for t, v in zip(tags, raw[1:])}
+        self._remember_generations(current)
+        stored = envelope.get("t") or {}
+        missing = [t for t in stored if t not in current]
+        if missing:
+            current.update(await self.tag_versions(missing))
+        remaining = envelope.get("x", float("inf")) - time.time()
+        if remaining <= 0 or any(current.get(t, 0) != int(v) for t, v in stored.items()):
+            self.stats["redis_stale"] += 1
+            cache_lookups.inc(prefix=cache_prefix(key), result="stale")
+            return envelope, False
+        self.stats["redis_hits"] += 1
+        cache_lookups.inc(prefix=cache_prefix(key), result="redis_hit")
+        self.local.set(key, json.dumps(envelope), ttl=int(min(remaining, self.local.ttl)), tags=stored.keys())
+        return envelope, True
+
+    async def get(self, key: str, tags: Optional[Iterable[str]] = None) -> Optional[Any]:
+        """
+        Passing the entry's tags lets the L2 lookup fetch the value and the
+        current tag generations in one MGET round trip.
+        """
+        envelope, fresh = await self._lookup(key, list(tags or []))
+        return envelope["v"] if envelope is not None and fresh else None
+
+    async def set(
+        self,
+        key: str,
+        value: Any,
+        expire: int = 300,
+        tags: Optional[Iterable[str]] = None,
+        tag_versions: Optional[dict[str, int]] = None,
+        stale_ttl: int = 0,
+        delta: float = 0.0,
+    ):
+        """
+        `expire` is the freshness window. With `stale_ttl` the entry is kept in
+        Redis that much longer so get_or_build can serve it while rebuilding.
+        `delta` is the rebuild cost in seconds, used for early refresh.
+        """
+        tags = list(tags or (tag_versions or {}).keys())
+        versions = dict(tag_versions or {})
+        missing = [t for t in tags if t not in versions]
+        if missing:
+            versions.update(await self.tag_versions(missing))
+        payload = json.dumps({"v": value, "t": versions, "x": time.time() + expire, "d": round(delta, 4)})
+        self.local.set(key, payload, ttl=expire, tags=tags)
+        if not self._redis_available():
+            return
+        try:
+            await self.redis.set(key, payload, ex=expire + max(int(stale_ttl), 0))
+        except Exception:
+            self._mark_redis_down()
+
+    def _should_refresh_early(self, envelope: dict, beta: float) -> bool:
+        # Probabilistic early expiration (XFetch): the closer an entry is to its
+        # soft expiry and the slower it is to rebuild, the likelier one caller
+        # refreshes it ahead of time, so hot keys never expire for everyone at once.
+        delta = float(envelope.get("d") or 0.0)
+        expires_at = envelope.get("x")
+        if beta <= 0 or delta <= 0 or expires_at is None:
+            return False
+        return time.time() - delta * beta * math.log(1.0 - random.random()) >= expires_at
+
+    async def _acquire_lock(self, key: str) -> Optional[str]:
+        """Cross-process build lock. Returns a token, "" when Redis is unavailable, or None if held elsewhere."""
+        if not self._redis_available():
+            return ""
+        token = uuid.uuid4().hex
+        try:
+            ok = await self.redis.set(f"{self.LOCK_PREFIX}{key}", token, nx=True, px=settings.CACHE_LOCK_TTL_SECONDS * 1000)
+        except Exception:
+            self._mark_redis_down()
+            return ""
+        return token if ok else None
+
+    async def _release_lock(self, key: str, token: Optional[str]) -> None:
+        if not token or not self._redis_available():
+            return
+        try:
+            await self.redis.eval(self._RELEASE_LOCK_SCRIPT, 1, f"{self.LOCK_PREFIX}{key}", token)
+        except Exception:
+            self._mark_redis_down()
+
+    async def get_or_build(
+        self,
+        key: str,
+        builder: Callable[[], Awaitable[Any]],
+        expire: int = 300,
+        tags: Optional[Iterable[str]] = None,
+        stale_ttl: Optional[int] = None,
+        beta: Optional[float] = None,
+    ) -> Any:
+        """
+        Read-through cache with stampede protection:
+        - concurrent callers in this process share one build (single flight);
+        - a Redis lock makes one node rebuild while others wait for its result;
+        - stale entries are served to everyone except the caller that rebuilds;
+        - fresh entries are refreshed early with probability rising towards expiry.
+        The rebuild runs in the calling request, never in a detached task, so the
+        builder may safely use the caller's DB session.
+        """
+        tags = list(tags or [])
+        stale_ttl = settings.CACHE_STALE_TTL_SECONDS if stale_ttl is None else stale_ttl
+        beta = settings.CACHE_EARLY_REFRESH_BETA if beta is None else beta
+
+        envelope, fresh = await self._lookup(key, tags)
+        if envelope is not None and fresh and not self._should_refresh_early(envelope, beta):
+            return envelope["v"]
+
+        flight = self._flights.get(key)
+        if flight is not None:
+            if envelope is not None:
+                self.stats["stale_served"] += 1
+                return envelope["v"]
+            self.stats["coalesced"] += 1
+            return await asyncio.shield(flight)
+
+        flight = asyncio.get_running_loop().create_future()
+        flight.add_done_callback(lambda f: f.cancelled() or f.exception())
+        self._flights[key] = flight
+        token: Optional[str] = None
+        try:
+            token = await self._acquire_lock(key)
+            if token is None:
+                if envelope is not None:
+                    self.stats["stale_served"] += 1
+                    flight.set_result(envelope["v"])
+                    return envelope["v"]
+                deadline = time.monotonic() + settings.CACHE_LOCK_WAIT_SECONDS
+                while time.monotonic() < deadline:
+                    await asyncio.sleep(0.05)
+                    waited, waited_fresh = await self._lookup(key, tags)
+                    if waited is not None and waited_fresh:
+                        flight.set_result(waited["v"])
+                        return waited["v"]
+                # The lock holder is slow or gone; build anyway rather than fail.
+
+            self.stats["builds"] += 1
+            versions = await self.tag_versions(tags)
+            started = time.monotonic()
+            value = await builder()
+            await self.set(
+                key,
+                value,
+                expire=expire,
+                tag_versions=versions,
+                stale_ttl=stale_ttl,
+                delta=time.monotonic() - started,
+            )
+            flight.set_result(value)
+            return value
+        except BaseException as e:
+            if not flight.done():
+                if isinstance(e, asyncio.CancelledError):
+                    flight.cancel()
+                else:
+                    flight.set_exception(e)
+            raise
+        finally:
+            self._flights.pop(key, None)
+            await self._release_lock(key, token)
 
     async def delete(self, key: str):
+        self.local.delete(key)
+        if not self._redis_available():
+            return
         try:
             await self.redis.delete(key)
         except Exception:
-            self._mem.pop(key, None)
+            self._mark_redis_down()
 
-    async def delete_pattern(self, pattern: str):
+    async def invalidate_tags(self, *tags: str):
+        """Drop every entry registered under any of the tags in O(1) Redis work per tag."""
+        for t in tags:
+            self.local.delete_tag(t)
+        if not tags or not self._redis_available():
+            return
         try:
-            keys = await self.redis.keys(pattern)
-            if keys:
-                await self.redis.delete(*keys)
+            pipe = self.redis.pipeline(transaction=False)
+            for t in tags:
+                pipe.incr(self._tag_key(t))
+            generations = await pipe.execute()
         except Exception:
-            for k in list(self._mem.keys()):
-                if fnmatch.fnmatch(k, pattern):
-                    self._mem.pop(k, None)
+            self._mark_redis_down()
+            return
+        self._remember_generations(dict(zip(tags, generations)))
 
 cache = RedisCache()
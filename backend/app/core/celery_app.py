@@ -7,6 +7,8 @@ if str(repo_root) not in sys.path:
 
 from celery import Celery
 from app.core.config import settings
+import app.core.task_metrics  # noqa: F401  (task runtime signal handlers)
+import app.core.tracing  # noqa: F401  (trace context in task headers, task spans)
 
 celery_app = Celery(
     "worker",
@@ -19,6 +21,8 @@ celery_app = Celery(
         "app.workers.workflow_tasks",
         "app.workers.publish_tasks",
         "app.workers.vn_tasks",
+        "app.workers.like_tasks",
+        "app.workers.trending_tasks",
     ]
 )
 
@@ -31,4 +35,18 @@ celery_app.conf.update(
     task_always_eager=settings.CELERY_TASK_ALWAYS_EAGER,
     task_eager_propagates=settings.CELERY_TASK_EAGER_PROPAGATES,
     task_store_eager_result=settings.CELERY_TASK_STORE_EAGER_RESULT,
+    beat_schedule={
+        "flush-like-counts": {
+            "task": "app.workers.like_tasks.flush_like_counts",
+            "schedule": settings.LIKES_FLUSH_INTERVAL_SECONDS,
+        },
+        "reconcile-like-counts": {
+            "task": "app.workers.like_tasks.reconcile_like_counts",
+            "schedule": settings.LIKES_RECONCILE_INTERVAL_SECONDS,
+        },
+        "refresh-trending": {
+            "task": "app.workers.trending_tasks.refresh_trending",
+            "schedule": settings.TRENDING_REFRESH_INTERVAL_SECONDS,
+        },
+    },
 )
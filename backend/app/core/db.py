@@ -1,12 +1,27 @@
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
-from sqlalchemy.orm import sessionmaker
-from sqlalchemy import event
 import datetime
+import functools
+import hashlib
+import importlib
+import json
+import time
+from typing import Any, Callable, Optional
+
+from fastapi import Request
+from sqlalchemy import event, make_url, text
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+from app.core.cache import cache
 from app.core.config import settings
+from app.core.metrics import Gauge, db_pool_checkout_wait, registry
+from app.core.slow_query import install_slow_query_log
 
-engine = create_async_engine(str(settings.SQLALCHEMY_DATABASE_URI), echo=True)
 
-if engine.url.get_backend_name() == "sqlite":
+def _register_sqlite_now(engine: AsyncEngine) -> None:
+    if engine.url.get_backend_name() != "sqlite":
+        return
+
     @event.listens_for(engine.sync_engine, "connect")
     def _sqlite_register_now(dbapi_connection, _connection_record):
         try:
@@ -17,10 +32,258 @@ if engine.url.get_backend_name() == "sqlite":
             )
         except Exception:
             pass
-AsyncSessionLocal = sessionmaker(
-    engine, class_=AsyncSession, expire_on_commit=False
+
+
+def _import_callable(path: str) -> Callable[..., Any]:
+    module, _, name = path.rpartition(".")
+    return getattr(importlib.import_module(module), name)
+
+
+def _json_serializer(value: Any) -> str:
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":"))
+
+
+class TimedQueuePool(AsyncAdaptedQueuePool):
+    """Queue pool reporting how long each checkout waited, labelled by the pool's logging name."""
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            db_pool_checkout_wait.observe(time.perf_counter() - started, engine=self.logging_name or "default")
+
+
+def engine_options(url: str, name: str = "primary") -> dict:
+    """create_async_engine keyword arguments for `url` from the DB_* settings."""
+    parsed = make_url(url)
+    options: dict = {
+        "echo": settings.DB_ECHO,
+        "json_serializer": (
+            _import_callable(settings.DB_JSON_SERIALIZER) if settings.DB_JSON_SERIALIZER else _json_serializer
+        ),
+        "json_deserializer": (
+            _import_callable(settings.DB_JSON_DESERIALIZER) if settings.DB_JSON_DESERIALIZER else json.loads
+        ),
+    }
+    if parsed.get_backend_name() != "sqlite":
+        options.update(
+            pool_size=settings.DB_POOL_SIZE,
+            max_overflow=settings.DB_MAX_OVERFLOW,
+            pool_timeout=settings.DB_POOL_TIMEOUT_SECONDS,
+            pool_recycle=settings.DB_POOL_RECYCLE_SECONDS,
+            pool_pre_ping=settings.DB_POOL_PRE_PING,
+            poolclass=TimedQueuePool,
+            pool_logging_name=name,
+        )
+    if parsed.get_driver_name() == "asyncpg":
+        connect_args: dict = {"prepared_statement_cache_size": max(settings.DB_STATEMENT_CACHE_SIZE, 0)}
+        if settings.DB_STATEMENT_CACHE_SIZE <= 0:
+            # asyncpg's own cache too: prepared statements do not survive PgBouncer transaction pooling
+            connect_args["statement_cache_size"] = 0
+        options["connect_args"] = connect_args
+    return options
+
+
+def create_db_engine(url: str, name: str = "primary") -> AsyncEngine:
+    db_engine = create_async_engine(url, **engine_options(url, name))
+    _register_sqlite_now(db_engine)
+    install_slow_query_log(db_engine.sync_engine)
+    return db_engine
+
+
+engine = create_db_engine(str(settings.SQLALCHEMY_DATABASE_URI))
+replica_engine: Optional[AsyncEngine] = (
+    create_db_engine(settings.DATABASE_REPLICA_URL.strip(), "replica")
+    if settings.DATABASE_REPLICA_URL and settings.DATABASE_REPLICA_URL.strip()
+    else None
+)
+
+
+def _pool_connections() -> dict:
+    values = {}
+    for name, db_engine in (("primary", engine), ("replica", replica_engine)):
+        pool = getattr(db_engine, "pool", None) if db_engine is not None else None
+        if isinstance(pool, AsyncAdaptedQueuePool):
+            values[(name, "checked_out")] = pool.checkedout()
+            values[(name, "idle")] = pool.checkedin()
+            values[(name, "overflow")] = max(pool.overflow(), 0)
+    return values
+
+
+registry.register(
+    Gauge(
+        "db_pool_connections",
+        "Pooled database connections by state.",
+        ["engine", "state"],
+        collector=_pool_connections,
+    )
+)
+
+# Session.info keys
+USE_REPLICA = "use_replica"  # plain reads may go to the replica
+READ_ONLY_DEPTH = "read_only_depth"  # inside a @read_only service method
+WROTE = "wrote"  # the session has written; only the primary sees it
+CLIENT_KEY = "client_key"  # identifies the caller for read-your-writes
+PINNED = "pinned"  # the caller wrote recently: stay on the primary
+
+# 0 when the replica has replayed everything it received, else the age of the last replayed transaction
+REPLICA_LAG_SQL = text(
+    "SELECT CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+    "ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) END"
 )
 
-async def get_db():
+
+class ReplicaLagMonitor:
+    """
+    Per-process view of replica freshness, re-measured at most every
+    DATABASE_REPLICA_LAG_CHECK_SECONDS. An unreachable or lagging replica
+    sends reads to the primary until a later check succeeds.
+    """
+
+    def __init__(self, engine: AsyncEngine):
+        self.engine = engine
+        self.lag: Optional[float] = None
+        self.checked_at = float("-inf")
+        self._checking = False
+
+    async def measure(self) -> float:
+        async with self.engine.connect() as conn:
+            if conn.dialect.name != "postgresql":
+                return 0.0
+            return float((await conn.execute(REPLICA_LAG_SQL)).scalar() or 0.0)
+
+    async def usable(self) -> bool:
+        if time.monotonic() - self.checked_at >= settings.DATABASE_REPLICA_LAG_CHECK_SECONDS and not self._checking:
+            # Concurrent callers keep using the previous measurement meanwhile
+            self._checking = True
+            try:
+                self.lag = await self.measure()
+            except Exception:
+                self.lag = None
+            finally:
+                self.checked_at = time.monotonic()
+                self._checking = False
+        return self.lag is not None and self.lag <= settings.DATABASE_REPLICA_MAX_LAG_SECONDS
+
+
+class RoutingSession(Session):
+    """
+    Sends plain SELECTs to the replica when the session allows it, everything
+    else (flushes, DML, SELECT ... FOR UPDATE, raw SQL) to the primary. Once
+    the session has written, it reads from the primary too.
+    """
+
+    def __init__(
+        self,
+        *args: Any,
+        primary: AsyncEngine,
+        replica: Optional[AsyncEngine] = None,
+        monitor: Optional[ReplicaLagMonitor] = None,
+        **kw: Any,
+    ):
+        super().__init__(*args, **kw)
+        self.primary = primary
+        self.replica = replica
+        self.monitor = monitor
+
+    def get_bind(self, mapper=None, clause=None, **kw):
+        if self._flushing or getattr(clause, "is_dml", False):
+            self.info[WROTE] = True
+            return self.primary.sync_engine
+        if (
+            self.replica is not None
+            and (self.info.get(USE_REPLICA) or self.info.get(READ_ONLY_DEPTH, 0) > 0)
+            and not self.info.get(WROTE)
+            and not self.info.get(PINNED)
+            and getattr(clause, "is_select", False)
+            and getattr(clause, "_for_update_arg", None) is None
+        ):
+            return self.replica.sync_engine
+        return self.primary.sync_engine
+
+
+class RoutingAsyncSession(AsyncSession):
+    async def commit(self) -> None:
+        await super().commit()
+        info = self.sync_session.info
+        if info.get(WROTE) and info.get(CLIENT_KEY) and getattr(self.sync_session, "replica", None) is not None:
+            await pin_to_primary(info[CLIENT_KEY])
+
+
+def routing_sessionmaker(primary: AsyncEngine, replica: Optional[AsyncEngine] = None) -> sessionmaker:
+    return sessionmaker(
+        class_=RoutingAsyncSession,
+        sync_session_class=RoutingSession,
+        expire_on_commit=False,
+        primary=primary,
+        replica=replica,
+        monitor=ReplicaLagMonitor(replica) if replica is not None else None,
+    )
+
+
+AsyncSessionLocal = routing_sessionmaker(engine, replica_engine)
+
+
+def _pin_key(client_key: str) -> str:
+    return f"db:primary:{client_key}"
+
+
+async def pin_to_primary(client_key: str) -> None:
+    """Keep the client's reads on the primary until the replica has caught up with its write."""
+    await cache.set(_pin_key(client_key), True, expire=settings.DATABASE_REPLICA_STICKY_SECONDS)
+
+
+async def is_pinned(client_key: str) -> bool:
+    return bool(await cache.get(_pin_key(client_key)))
+
+
+def client_key(request: Request) -> Optional[str]:
+    auth = request.headers.get("authorization")
+    if not auth:
+        return None
+    return hashlib.sha1(auth.encode("utf-8")).hexdigest()
+
+
+async def route_request(session: AsyncSession, request: Request) -> None:
+    """Allow the replica for GET/HEAD requests unless the caller wrote within the sticky window or it lags."""
+    sync_session = session.sync_session
+    monitor = getattr(sync_session, "monitor", None)
+    if monitor is None:
+        return
+    key = client_key(request)
+    if key:
+        sync_session.info[CLIENT_KEY] = key
+        sync_session.info[PINNED] = await is_pinned(key)
+    if request.method in ("GET", "HEAD") and not sync_session.info.get(PINNED) and await monitor.usable():
+        sync_session.info[USE_REPLICA] = True
+
+
+def read_only(fn):
+    """
+    Mark a service method (taking the session as `db`) as read-only: its
+    queries may run on the replica, even within a write request or a worker.
+    """
+
+    @functools.wraps(fn)
+    async def wrapper(*args: Any, **kwargs: Any):
+        db = kwargs.get("db")
+        if db is None:
+            db = next((a for a in args if isinstance(a, AsyncSession)), None)
+        monitor = getattr(getattr(db, "sync_session", None), "monitor", None)
+        if monitor is None or not await monitor.usable():
+            return await fn(*args, **kwargs)
+        info = db.sync_session.info
+        info[READ_ONLY_DEPTH] = info.get(READ_ONLY_DEPTH, 0) + 1
+        try:
+            return await fn(*args, **kwargs)
+        finally:
+            info[READ_ONLY_DEPTH] -= 1
+
+    return wrapper
+
+
+async def get_db(request: Request):
     async with AsyncSessionLocal() as session:
+        await route_request(session, request)
         yield session
@@ -0,0 +1,204 @@
+import bisect
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+# Seconds; request latencies, pool waits and task runtimes share one layout
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0)
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _number(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class _Metric:
+    type_name = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        return tuple(str(labels.get(n, "")) for n in self.labelnames)
+
+    def header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type_name}"]
+
+    def render(self) -> List[str]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    type_name = "counter"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self.values[key] = self.values.get(key, 0.0) + amount
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = sorted(self.values.items())
+        return self.header() + [f"{self.name}{_labels(self.labelnames, k)} {_number(v)}" for k, v in items]
+
+
+class Gauge(_Metric):
+    """Set directly, or computed at scrape time by `collector` (returning {label values: value})."""
+
+    type_name = "gauge"
+
+    def __init__(self, *args, collector: Optional[Callable[[], Dict[Tuple[str, ...], float]]] = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.values: Dict[Tuple[str, ...], float] = {}
+        self.collector = collector
+
+    def set(self, value: float, **labels: str) -> None:
+        with self._lock:
+            self.values[self._key(labels)] = value
+
+    def render(self) -> List[str]:
+        values = dict(self.values)
+        if self.collector is not None:
+            try:
+                values.update(self.collector())
+            except Exception:
+                pass
+        return self.header() + [f"{self.name}{_labels(self.labelnames, k)} {_number(v)}" for k, v in sorted(values.items())]
+
+
+class Histogram(_Metric):
+    type_name = "histogram"
+
+    def __init__(self, *args, buckets: Sequence[float] = DEFAULT_BUCKETS, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.buckets = tuple(sorted(buckets))
+        # label values -> (per-bucket counts, +Inf overflow last), sum, count
+        self.values: Dict[Tuple[str, ...], Tuple[List[int], float, int]] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            counts, total, n = self.values.get(key) or ([0] * (len(self.buckets) + 1), 0.0, 0)
+            counts[bisect.bisect_left(self.buckets, value)] += 1
+            self.values[key] = (counts, total + value, n + 1)
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = sorted((k, (list(c), s, n)) for k, (c, s, n) in self.values.items())
+        return self.header() + render_histogram_samples(self.name, self.labelnames, self.buckets, items)
+
+
+def render_histogram_samples(
+    name: str,
+    labelnames: Sequence[str],
+    buckets: Sequence[float],
+    items: Iterable[Tuple[Tuple[str, ...], Tuple[List[int], float, int]]],
+) -> List[str]:
+    lines = []
+    for key, (counts, total, n) in items:
+        cumulative = 0
+        for bound, count in zip(list(buckets) + [float("inf")], counts):
+            cumulative += count
+            le = 'le="%s"' % _number(bound)
+            lines.append(f"{name}_bucket{_labels(labelnames, key, le)} {cumulative}")
+        lines.append(f"{name}_sum{_labels(labelnames, key)} {_number(total)}")
+        lines.append(f"{name}_count{_labels(labelnames, key)} {n}")
+    return lines
+
+
+class Registry:
+    def __init__(self):
+        self.metrics: List[_Metric] = []
+
+    def register(self, metric):
+        self.metrics.append(metric)
+        return metric
+
+    def render(self, extra: Iterable[str] = ()) -> str:
+        """Text exposition format; `extra` lines are collected elsewhere (e.g. Celery metrics from Redis)."""
+        lines: List[str] = []
+        for metric in self.metrics:
+            lines.extend(metric.render())
+        lines.extend(extra)
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+http_request_duration = registry.register(
+    Histogram("http_request_duration_seconds", "HTTP request latency by route template.", ["method", "route"])
+)
+http_requests = registry.register(
+    Counter("http_requests_total", "HTTP responses by route template and status code.", ["method", "route", "status"])
+)
+cache_lookups = registry.register(
+    Counter(
+        "cache_lookups_total",
+        "RedisCache lookups by key prefix and result (local_hit, redis_hit, stale, miss).",
+        ["prefix", "result"],
+    )
+)
+db_pool_checkout_wait = registry.register(
+    Histogram("db_pool_checkout_wait_seconds", "Time spent waiting for a pooled database connection.", ["engine"])
+)
+
+
+def cache_prefix(key: str) -> str:
+    return key.split(":", 1)[0]
+
+
+def route_template(scope: dict) -> str:
+    """
+    The request path with path parameter values put back as {name}, so
+    /projects/{project_id} is one series rather than one per id (the matched
+    route's own path lacks the prefixes of the routers it was included in).
+    """
+    if scope.get("route") is None:
+        return "unmatched"
+    names = {str(v): k for k, v in (scope.get("path_params") or {}).items()}
+    return "/".join(f"{{{names[s]}}}" if s in names else s for s in scope.get("path", "").split("/"))
+
+
+class MetricsMiddleware:
+    """Records latency and status of every HTTP request by route template."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        started = time.perf_counter()
+        status = {"code": 500}
+
+        async def send_with_status(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            route = route_template(scope)
+            http_request_duration.observe(time.perf_counter() - started, method=scope["method"], route=route)
+            http_requests.inc(method=scope["method"], route=route, status=str(status["code"]))
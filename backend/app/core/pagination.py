@@ -0,0 +1,57 @@
+import base64
+import binascii
+import json
+from typing import Any, Optional, Sequence
+
+from fastapi import HTTPException, Response
+from sqlalchemy import and_, or_, select
+
+# Response header carrying the cursor of the next page; absent on the last page.
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+# Largest page any cursor-paginated list endpoint returns.
+MAX_PAGE_SIZE = 200
+
+
+def page_limit(limit: int) -> int:
+    return max(1, min(int(limit), MAX_PAGE_SIZE))
+
+
+def encode_cursor(anchor: str) -> str:
+    """Opaque cursor pointing just after the item with public id `anchor`."""
+    raw = json.dumps({"after": anchor}, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: Optional[str]) -> Optional[str]:
+    if not cursor:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        anchor = json.loads(raw.decode("utf-8")).get("after")
+    except (binascii.Error, ValueError, UnicodeDecodeError, AttributeError):
+        anchor = None
+    if not isinstance(anchor, str) or not anchor:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return anchor
+
+
+def keyset_after(columns: Sequence[Any], anchor_where: Sequence[Any], descending: bool = True):
+    """
+    WHERE clause for the rows that come after the anchor row in ORDER BY columns
+    (all in the same direction; the last column must be unique). The anchor's sort
+    values are read back with indexed lookups, so the cursor only carries its id
+    and the page is an index range scan however deep it is.
+    """
+    conditions = []
+    equal: list = []
+    for col in columns:
+        value = select(col).where(*anchor_where).correlate(None).scalar_subquery()
+        conditions.append(and_(*equal, col < value if descending else col > value))
+        equal.append(col == value)
+    return or_(*conditions)
+
+
+def set_next_cursor(response: Response, items: Sequence[Any], limit: int) -> None:
+    """Advertise the next page when this one is full."""
+    if items and len(items) >= limit:
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(str(items[-1].id))
@@ -0,0 +1,105 @@
+import logging
+import re
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, List, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.datastructures import MutableHeaders
+
+from app.core.config import settings
+
+logger = logging.getLogger("app.db.n_plus_one")
+
+_PLACEHOLDER = r"(?:\?|\$\d+|%\(\w+\)s|:\w+)"
+# Placeholder lists of any length ("IN (?, ?, ?)") count as one statement shape
+_PLACEHOLDER_LIST = re.compile(rf"\(\s*{_PLACEHOLDER}(?:\s*,\s*{_PLACEHOLDER})*\s*\)")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def statement_shape(statement: str) -> str:
+    return _PLACEHOLDER_LIST.sub("(?)", _WHITESPACE.sub(" ", statement).strip())
+
+
+class QueryStats:
+    """SQL statements run and time spent in the database while a request (or tracked block) was active."""
+
+    def __init__(self):
+        self.count = 0
+        self.duration_ms = 0.0
+        self.shapes: Counter = Counter()
+
+    def record(self, statement: str, duration_ms: float) -> None:
+        self.count += 1
+        self.duration_ms += duration_ms
+        self.shapes[statement_shape(statement)] += 1
+
+    def repeated(self, threshold: int) -> List[Tuple[str, int]]:
+        """Statement shapes run at least `threshold` times, most frequent first."""
+        return [(shape, n) for shape, n in self.shapes.most_common() if n >= threshold]
+
+    def server_timing(self) -> str:
+        return f'db;dur={self.duration_ms:.1f};desc="{self.count} queries"'
+
+
+# Every enclosing tracker sees each statement, so a test-level budget also counts request-level queries
+_active: ContextVar[Tuple[QueryStats, ...]] = ContextVar("query_stats", default=())
+
+
+@contextmanager
+def track_queries() -> Iterator[QueryStats]:
+    stats = QueryStats()
+    token = _active.set(_active.get() + (stats,))
+    try:
+        yield stats
+    finally:
+        _active.reset(token)
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _start(conn, cursor, statement, parameters, context, executemany):
+    if _active.get():
+        context._query_stats_started = time.perf_counter()
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _finish(conn, cursor, statement, parameters, context, executemany):
+    started = getattr(context, "_query_stats_started", None)
+    active = _active.get()
+    if started is None or not active:
+        return
+    duration_ms = (time.perf_counter() - started) * 1000.0
+    for stats in active:
+        stats.record(statement, duration_ms)
+
+
+class QueryStatsMiddleware:
+    """
+    Counts the SQL statements and database time of each request, reports them
+    in a Server-Timing header and logs statement shapes repeated at least
+    DB_N_PLUS_ONE_THRESHOLD times (a query per row: N+1).
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not settings.DB_QUERY_STATS_ENABLED:
+            await self.app(scope, receive, send)
+            return
+
+        with track_queries() as stats:
+
+            async def send_with_timing(message):
+                if message["type"] == "http.response.start":
+                    MutableHeaders(scope=message).append("Server-Timing", stats.server_timing())
+                    for shape, n in stats.repeated(settings.DB_N_PLUS_ONE_THRESHOLD):
+                        logger.warning(
+                            "possible N+1: %s %s ran %d times: %s", scope["method"], scope["path"], n, shape
+                        )
+                await send(message)
+
+            await self.app(scope, receive, send_with_timing)
@@ -0,0 +1,78 @@
+import logging
+import random
+import time
+from typing import Any, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.core.config import settings
+
+logger = logging.getLogger("app.db.slow_query")
+
+EXPLAIN_PREFIX = {"postgresql": "EXPLAIN ", "sqlite": "EXPLAIN QUERY PLAN "}
+
+
+def redact(parameters: Any, executemany: bool) -> Any:
+    """Bind values are replaced by their type names unless DB_SLOW_QUERY_LOG_PARAMS is set."""
+    if settings.DB_SLOW_QUERY_LOG_PARAMS:
+        return parameters
+    if executemany:
+        return f"<{len(parameters)} parameter sets>"
+    if isinstance(parameters, dict):
+        return {k: type(v).__name__ for k, v in parameters.items()}
+    return [type(v).__name__ for v in parameters or ()]
+
+
+def explain(conn: Any, statement: str, parameters: Any) -> Optional[str]:
+    """
+    Plan of a SELECT, read through a raw DBAPI cursor (so it is neither timed
+    nor logged itself) inside a savepoint, so a failing EXPLAIN cannot abort
+    the caller's transaction.
+    """
+    prefix = EXPLAIN_PREFIX.get(conn.dialect.name)
+    if prefix is None or not statement.lstrip()[:6].upper() in ("SELECT", "WITH"):
+        return None
+    cursor = conn.connection.cursor()
+    try:
+        cursor.execute("SAVEPOINT slow_query_explain")
+        try:
+            cursor.execute(prefix + statement, parameters)
+            rows = cursor.fetchall()
+        except Exception:
+            cursor.execute("ROLLBACK TO SAVEPOINT slow_query_explain")
+            return None
+        cursor.execute("RELEASE SAVEPOINT slow_query_explain")
+    except Exception:
+        return None
+    finally:
+        cursor.close()
+    return "\n".join(str(row[-1] if conn.dialect.name == "sqlite" else row[0]) for row in rows)
+
+
+def install_slow_query_log(engine: Engine) -> None:
+    """Log (a DB_SLOW_QUERY_SAMPLE_RATE sample of) statements slower than DB_SLOW_QUERY_MS; 0 disables."""
+    if settings.DB_SLOW_QUERY_MS <= 0:
+        return
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _start(conn, cursor, statement, parameters, context, executemany):
+        context._slow_query_started = time.perf_counter()
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _finish(conn, cursor, statement, parameters, context, executemany):
+        started = getattr(context, "_slow_query_started", None)
+        if started is None:
+            return
+        elapsed_ms = (time.perf_counter() - started) * 1000.0
+        if elapsed_ms < settings.DB_SLOW_QUERY_MS or random.random() >= settings.DB_SLOW_QUERY_SAMPLE_RATE:
+            return
+        plan = explain(conn, statement, parameters) if settings.DB_SLOW_QUERY_EXPLAIN and not executemany else None
+        logger.warning(
+            "slow query (%.1f ms): %s | params=%s%s",
+            elapsed_ms,
+            " ".join(statement.split()),
+            redact(parameters, executemany),
+            f"\nplan:\n{plan}" if plan else "",
+            extra={"duration_ms": round(elapsed_ms, 1)},
+        )
@@ -0,0 +1,123 @@
+import asyncio
+import bisect
+import time
+from typing import Dict, List, Sequence
+
+import redis
+from celery.signals import task_postrun, task_prerun
+
+from app.core.cache import cache
+from app.core.config import settings
+from app.core.metrics import DEFAULT_BUCKETS, Counter, Gauge, Histogram
+
+# Workers aggregate task runtimes in Redis, so the API's /metrics covers every worker process
+TASKS_KEY = "metrics:celery:tasks"
+RUNTIME_KEY = "metrics:celery:runtime:{task}"
+STATES_KEY = "metrics:celery:states"
+
+_redis = None
+_started: Dict[str, float] = {}
+
+
+def _client() -> redis.Redis:
+    global _redis
+    if _redis is None:
+        _redis = redis.Redis.from_url(
+            settings.CELERY_RESULT_BACKEND, socket_timeout=1, socket_connect_timeout=1, decode_responses=True
+        )
+    return _redis
+
+
+def record_task_run(task_name: str, seconds: float, state: str) -> None:
+    key = RUNTIME_KEY.format(task=task_name)
+    try:
+        pipe = _client().pipeline(transaction=False)
+        pipe.sadd(TASKS_KEY, task_name)
+        pipe.hincrbyfloat(key, "sum", seconds)
+        pipe.hincrby(key, "count", 1)
+        pipe.hincrby(key, f"b{bisect.bisect_left(DEFAULT_BUCKETS, seconds)}", 1)
+        pipe.hincrby(STATES_KEY, f"{task_name}|{state}", 1)
+        pipe.execute()
+    except Exception:
+        # Metrics must never fail a task
+        pass
+
+
+@task_prerun.connect
+def _task_started(task_id=None, **_kwargs):
+    if task_id:
+        _started[task_id] = time.perf_counter()
+
+
+@task_postrun.connect
+def _task_finished(task_id=None, task=None, state=None, **_kwargs):
+    started = _started.pop(task_id, None)
+    if started is None or task is None:
+        return
+    record_task_run(task.name, time.perf_counter() - started, state or "UNKNOWN")
+
+
+async def _task_lines() -> List[str]:
+    if not cache.redis_available():
+        return []
+    try:
+        names = sorted(await cache.redis.smembers(TASKS_KEY))
+        pipe = cache.redis.pipeline(transaction=False)
+        for name in names:
+            pipe.hgetall(RUNTIME_KEY.format(task=name))
+        pipe.hgetall(STATES_KEY)
+        *runtimes, states = await pipe.execute()
+    except Exception:
+        cache.report_redis_error()
+        return []
+
+    runtime = Histogram("celery_task_runtime_seconds", "Celery task runtime by task name.", ["task"])
+    for name, fields in zip(names, runtimes):
+        counts = [int(fields.get(f"b{i}", 0)) for i in range(len(DEFAULT_BUCKETS) + 1)]
+        runtime.values[(name,)] = (counts, float(fields.get("sum", 0.0)), int(fields.get("count", 0)))
+    finished = Counter("celery_tasks_total", "Finished Celery tasks by task name and final state.", ["task", "state"])
+    for field, count in (states or {}).items():
+        name, _, state = field.rpartition("|")
+        finished.inc(int(count), task=name, state=state)
+    return runtime.render() + finished.render()
+
+
+def _queue_depths_sync(queues: Sequence[str]) -> Dict[str, int]:
+    from app.core.celery_app import celery_app
+
+    depths: Dict[str, int] = {}
+    with celery_app.connection_for_read(connect_timeout=settings.METRICS_BROKER_TIMEOUT_SECONDS) as conn:
+        for queue in queues:
+            # A channel per queue: AMQP closes the channel when a passive declare fails
+            channel = conn.channel()
+            try:
+                depths[queue] = channel.queue_declare(queue=queue, passive=True).message_count
+            except Exception:
+                pass
+            finally:
+                try:
+                    channel.close()
+                except Exception:
+                    pass
+    return depths
+
+
+async def _queue_lines() -> List[str]:
+    queues = list(settings.METRICS_CELERY_QUEUES or [])
+    if not queues:
+        return []
+    try:
+        depths = await asyncio.wait_for(
+            asyncio.to_thread(_queue_depths_sync, queues), timeout=settings.METRICS_BROKER_TIMEOUT_SECONDS
+        )
+    except Exception:
+        return []
+    gauge = Gauge("celery_queue_length", "Messages waiting in each Celery queue.", ["queue"])
+    for queue, depth in depths.items():
+        gauge.set(depth, queue=queue)
+    return gauge.render()
+
+
+async def collect_celery_metrics() -> List[str]:
+    """Exposition lines for Celery task runtimes (from Redis) and queue depths (from the broker)."""
+    return await _task_lines() + await _queue_lines()
@@ -0,0 +1,373 @@
+import atexit
+import json
+import logging
+import os
+import queue
+import random
+import re
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, List, MutableMapping, Optional, Tuple
+
+from celery.signals import before_task_publish, task_failure, task_postrun, task_prerun
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.datastructures import MutableHeaders
+
+from app.core.config import settings
+from app.core.metrics import route_template
+
+logger = logging.getLogger("app.tracing")
+
+TRACEPARENT = "traceparent"
+TRACE_ID_HEADER = "X-Trace-Id"
+_TRACEPARENT_RE = re.compile(r"^00-([0-9a-f]{32})-([0-9a-f]{16})-([0-9a-f]{2})$")
+
+# OTLP span kinds
+INTERNAL, SERVER, CLIENT, PRODUCER, CONSUMER = 1, 2, 3, 4, 5
+
+
+class SpanContext:
+    __slots__ = ("trace_id", "span_id", "sampled")
+
+    def __init__(self, trace_id: str, span_id: str, sampled: bool):
+        self.trace_id = trace_id
+        self.span_id = span_id
+        self.sampled = sampled
+
+    def traceparent(self) -> str:
+        return f"00-{self.trace_id}-{self.span_id}-{'01' if self.sampled else '00'}"
+
+
+def parse_traceparent(value: Optional[str]) -> Optional[SpanContext]:
+    """W3C trace context header; None when absent or malformed."""
+    match = _TRACEPARENT_RE.match((value or "").strip().lower())
+    if not match or set(match.group(1)) == {"0"} or set(match.group(2)) == {"0"}:
+        return None
+    return SpanContext(match.group(1), match.group(2), bool(int(match.group(3), 16) & 1))
+
+
+class Span:
+    def __init__(self, name: str, parent: Optional[SpanContext], kind: int, attributes: Dict[str, Any]):
+        if parent is None:
+            parent_id = ""
+            context = SpanContext(
+                os.urandom(16).hex(), os.urandom(8).hex(), random.random() < settings.TRACING_SAMPLE_RATE
+            )
+        else:
+            parent_id = parent.span_id
+            context = SpanContext(parent.trace_id, os.urandom(8).hex(), parent.sampled)
+        self.name = name
+        self.context = context
+        self.parent_id = parent_id
+        self.kind = kind
+        self.attributes = dict(attributes)
+        self.start_ns = time.time_ns()
+        self.end_ns: Optional[int] = None
+        self.error: Optional[str] = None
+
+    def set(self, **attributes: Any) -> None:
+        self.attributes.update(attributes)
+
+    def record_error(self, error: Any) -> None:
+        self.error = str(error)[:500] or type(error).__name__
+
+    def end(self) -> None:
+        if self.end_ns is not None:
+            return
+        self.end_ns = time.time_ns()
+        if self.context.sampled:
+            exporter.export(self)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "trace_id": self.context.trace_id,
+            "span_id": self.context.span_id,
+            "parent_id": self.parent_id or None,
+            "name": self.name,
+            "kind": self.kind,
+            "start_ns": self.start_ns,
+            "end_ns": self.end_ns,
+            "duration_ms": round(((self.end_ns or self.start_ns) - self.start_ns) / 1e6, 3),
+            "attributes": self.attributes,
+            "error": self.error,
+        }
+
+
+# The span (or remote parent) new spans are children of
+_current: ContextVar[Optional[SpanContext]] = ContextVar("trace_context", default=None)
+
+
+def enabled() -> bool:
+    return bool(settings.TRACING_EXPORTER)
+
+
+def current() -> Optional[SpanContext]:
+    return _current.get()
+
+
+def start_span(name: str, kind: int = INTERNAL, parent: Optional[SpanContext] = None, **attributes: Any) -> Span:
+    """A span that does not become current: for leaves timed by a pair of callbacks (DB statements)."""
+    return Span(name, parent or _current.get(), kind, attributes)
+
+
+@contextmanager
+def span(name: str, kind: int = INTERNAL, parent: Optional[SpanContext] = None, **attributes: Any) -> Iterator[Optional[Span]]:
+    """
+    Time the block as a child of the current span (or `parent`), current
+    while it runs; yields None when tracing is off.
+    """
+    if not enabled():
+        yield None
+        return
+    active = start_span(name, kind, parent, **attributes)
+    token = _current.set(active.context)
+    try:
+        yield active
+    except BaseException as e:
+        active.record_error(e)
+        raise
+    finally:
+        _current.reset(token)
+        active.end()
+
+
+def inject(headers: MutableMapping[str, str]) -> MutableMapping[str, str]:
+    """Add the current trace context to outgoing headers (HTTP requests, Celery messages)."""
+    context = _current.get()
+    if context is not None:
+        headers[TRACEPARENT] = context.traceparent()
+    return headers
+
+
+class SpanExporter:
+    """
+    Spans go through a queue to a background thread that appends them to
+    TRACING_FILE_PATH as JSON lines ("file") or posts them in batches to an
+    OTLP/HTTP collector ("otlp"), so request and task threads never block on it.
+    """
+
+    def __init__(self):
+        self._queue: "queue.Queue[Span]" = queue.Queue(maxsize=10000)
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self.dropped = 0
+
+    def export(self, finished: Span) -> None:
+        self._ensure_started()
+        try:
+            self._queue.put_nowait(finished)
+        except queue.Full:
+            self.dropped += 1
+
+    def _ensure_started(self) -> None:
+        # Also after a fork: Celery prefork children do not inherit the parent's thread
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="span-exporter", daemon=True)
+                self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            batch = self._next_batch()
+            if batch:
+                try:
+                    self.write(batch)
+                except Exception:
+                    logger.exception("exporting %d spans failed", len(batch))
+
+    def _next_batch(self) -> List[Span]:
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + settings.TRACING_EXPORT_INTERVAL_SECONDS
+        while len(batch) < settings.TRACING_EXPORT_BATCH_SIZE:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def flush(self) -> None:
+        batch: List[Span] = []
+        while True:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        if batch:
+            try:
+                self.write(batch)
+            except Exception:
+                logger.exception("exporting %d spans failed", len(batch))
+
+    def write(self, batch: List[Span]) -> None:
+        if settings.TRACING_EXPORTER == "otlp":
+            self._post_otlp(batch)
+        else:
+            lines = "".join(
+                json.dumps({**s.to_dict(), "service": settings.TRACING_SERVICE_NAME}, default=str) + "\n" for s in batch
+            )
+            with open(settings.TRACING_FILE_PATH, "a", encoding="utf-8") as f:
+                f.write(lines)
+
+    def _post_otlp(self, batch: List[Span]) -> None:
+        import httpx
+
+        body = {
+            "resourceSpans": [
+                {
+                    "resource": {"attributes": _otlp_attributes({"service.name": settings.TRACING_SERVICE_NAME})},
+                    "scopeSpans": [{"scope": {"name": "evidverse"}, "spans": [otlp_span(s) for s in batch]}],
+                }
+            ]
+        }
+        httpx.post(settings.TRACING_OTLP_ENDPOINT, json=body, timeout=5.0).raise_for_status()
+
+
+def _otlp_value(value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def _otlp_attributes(attributes: Dict[str, Any]) -> List[Dict[str, Any]]:
+    return [{"key": k, "value": _otlp_value(v)} for k, v in attributes.items() if v is not None]
+
+
+def otlp_span(finished: Span) -> Dict[str, Any]:
+    """OTLP/JSON encoding of a finished span."""
+    data: Dict[str, Any] = {
+        "traceId": finished.context.trace_id,
+        "spanId": finished.context.span_id,
+        "name": finished.name,
+        "kind": finished.kind,
+        "startTimeUnixNano": str(finished.start_ns),
+        "endTimeUnixNano": str(finished.end_ns or finished.start_ns),
+        "attributes": _otlp_attributes(finished.attributes),
+        "status": {"code": 2, "message": finished.error} if finished.error else {"code": 1},
+    }
+    if finished.parent_id:
+        data["parentSpanId"] = finished.parent_id
+    return data
+
+
+exporter = SpanExporter()
+atexit.register(exporter.flush)
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _db_start(conn, cursor, statement, parameters, context, executemany):
+    if enabled() and _current.get() is not None:
+        context._trace_span = start_span(
+            "db.query",
+            CLIENT,
+            **{"db.system": conn.dialect.name, "db.statement": " ".join(statement.split())[:1000]},
+        )
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _db_finish(conn, cursor, statement, parameters, context, executemany):
+    started = getattr(context, "_trace_span", None)
+    if started is not None:
+        started.end()
+
+
+@event.listens_for(Engine, "handle_error")
+def _db_error(exception_context):
+    started = getattr(exception_context.execution_context, "_trace_span", None)
+    if started is not None:
+        started.record_error(exception_context.original_exception)
+        started.end()
+
+
+class TracingMiddleware:
+    """
+    Server span per HTTP request, continuing an incoming traceparent; the
+    trace id is returned in X-Trace-Id so a slow request can be looked up.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not enabled():
+            await self.app(scope, receive, send)
+            return
+        headers = {k.decode("latin-1"): v.decode("latin-1") for k, v in scope.get("headers") or []}
+        with span(
+            f"{scope['method']} {scope.get('path', '')}",
+            SERVER,
+            parent=parse_traceparent(headers.get(TRACEPARENT)),
+            **{"http.method": scope["method"], "http.target": scope.get("path", "")},
+        ) as server:
+
+            async def send_with_trace_id(message):
+                if message["type"] == "http.response.start":
+                    MutableHeaders(scope=message).append(TRACE_ID_HEADER, server.context.trace_id)
+                    server.set(**{"http.status_code": message["status"]})
+                    if message["status"] >= 500:
+                        server.error = f"HTTP {message['status']}"
+                await send(message)
+
+            try:
+                await self.app(scope, receive, send_with_trace_id)
+            finally:
+                route = route_template(scope)
+                server.name = f"{scope['method']} {route}"
+                server.set(**{"http.route": route})
+
+
+# Celery: the publisher's context travels in a message header; a task's span
+# is current while it runs, so tasks run inline with .apply() nest under it
+_task_spans: Dict[str, Tuple[Span, Any]] = {}
+
+
+@before_task_publish.connect
+def _inject_task_headers(headers=None, **_kwargs):
+    if enabled() and headers is not None:
+        inject(headers)
+
+
+@task_prerun.connect
+def _task_started(task_id=None, task=None, **_kwargs):
+    if not enabled() or task_id is None or task is None:
+        return
+    request = task.request
+    header = getattr(request, TRACEPARENT, None) or (getattr(request, "headers", None) or {}).get(TRACEPARENT)
+    started = start_span(
+        f"celery.task {task.name}",
+        CONSUMER,
+        parent=parse_traceparent(header),
+        **{"celery.task_name": task.name, "celery.task_id": task_id},
+    )
+    _task_spans[task_id] = (started, _current.set(started.context))
+
+
+@task_failure.connect
+def _task_failed(task_id=None, exception=None, **_kwargs):
+    entry = _task_spans.get(task_id)
+    if entry is not None and exception is not None:
+        entry[0].record_error(exception)
+
+
+@task_postrun.connect
+def _task_finished(task_id=None, state=None, **_kwargs):
+    entry = _task_spans.pop(task_id, None)
+    if entry is None:
+        return
+    started, token = entry
+    _current.reset(token)
+    started.set(**{"celery.state": state or "UNKNOWN"})
+    if state == "FAILURE" and started.error is None:
+        started.error = "task failed"
+    started.end()
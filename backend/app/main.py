@@ -5,9 +5,17 @@ repo_root = Path(__file__).resolve().parents[2]
 if str(repo_root) not in sys.path:
     sys.path.insert(0, str(repo_root))
 
-from fastapi import FastAPI
+import secrets
+
+from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
 from app.core.config import settings
+from app.core.metrics import MetricsMiddleware, registry
+from app.core.pagination import NEXT_CURSOR_HEADER
+from app.core.query_stats import QueryStatsMiddleware
+from app.core.task_metrics import collect_celery_metrics
+from app.core.tracing import TRACE_ID_HEADER, TracingMiddleware
 from app.api.v1.router import api_router
 
 app = FastAPI(
@@ -29,7 +37,13 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER, TRACE_ID_HEADER],
 )
+app.add_middleware(QueryStatsMiddleware)
+# The last one added is outermost: tracing wraps metrics, so the server span is
+# current for everything below it, and metrics latency covers the rest of the stack
+app.add_middleware(MetricsMiddleware)
+app.add_middleware(TracingMiddleware)
 
 app.include_router(api_router, prefix=settings.API_V1_STR)
 
@@ -37,6 +51,17 @@ app.include_router(api_router, prefix=settings.API_V1_STR)
 def root():
     return {"message": "Welcome to Evidverse API"}
 
+@app.get("/metrics", include_in_schema=False)
+async def metrics(request: Request):
+    if not settings.METRICS_ENABLED:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if settings.METRICS_TOKEN:
+        expected = f"Bearer {settings.METRICS_TOKEN}"
+        if not secrets.compare_digest(request.headers.get("authorization", ""), expected):
+            raise HTTPException(status_code=401, detail="Not authenticated")
+    body = registry.render(await collect_celery_metrics())
+    return PlainTextResponse(body, media_type="text/plain; version=0.0.4; charset=utf-8")
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000)
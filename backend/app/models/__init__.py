@@ -10,3 +10,6 @@ from .publish import PublishAccount, PublishJob
 from .vn import VNAsset, VNParseJob
 from .clip_segment import ClipSegment
 from .merge_request import MergeRequest
+from .snapshot import SnapshotObject
+from .trending import ProjectTrending
+from .tag import ProjectTag, TagCount
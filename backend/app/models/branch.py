@@ -1,6 +1,6 @@
 import uuid
 
-from sqlalchemy import Column, Integer, String, ForeignKey, Text, JSON
+from sqlalchemy import Column, Integer, String, ForeignKey, Text, JSON, Index, UniqueConstraint
 from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import relationship
 from app.models.base import Base
@@ -24,6 +24,13 @@ class Branch(Base):
     creator = relationship("User", foreign_keys=[creator_internal_id])
     parent_branch = relationship("Branch", remote_side=[internal_id], foreign_keys=[parent_branch_internal_id])
 
+    __table_args__ = (
+        # Projects a user is involved in through branches they created
+        Index("ix_branches_creator_id_project_id", "creator_id", "project_id"),
+        # Branches are looked up by (project, name) everywhere; names are unique per project
+        UniqueConstraint("project_id", "name", name="uq_branches_project_id_name"),
+    )
+
     @property
     def id(self) -> str:
         return self.public_id
@@ -1,5 +1,5 @@
-from sqlalchemy import Column, String, ForeignKey, DateTime, Integer, JSON
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, String, ForeignKey, DateTime, Integer, Float, JSON, Index
+from sqlalchemy.orm import relationship, deferred
 from sqlalchemy.sql import func
 from app.models.base import Base
 
@@ -11,9 +11,24 @@ class Commit(Base):
     author_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     message = Column(String, nullable=False)
     parent_hash = Column(String, ForeignKey("commits.id"), nullable=True)
+
+    # Ancestry index (see AncestryService): distance from the root (root = 1) and a
+    # skew-binary jump pointer to an older ancestor, written once at commit time.
+    generation = Column(Integer, nullable=True)
+    jump_hash = Column(String, nullable=True)
     
-    # Snapshot of the project state (timeline, clips, settings)
-    video_assets = Column(JSON, nullable=True) 
+    # Snapshot of the project state (timeline, clips, settings): root of the
+    # content-addressed object tree. Commits written before the object store
+    # keep the inline video_assets document instead; read through SnapshotService.
+    tree_hash = Column(String, ForeignKey("snapshot_objects.hash"), nullable=True)
+    video_assets = deferred(Column(JSON, nullable=True))
+
+    # Summary of the snapshot computed once at commit time (CommitService.summarize_snapshot),
+    # so graph/log/export planning never has to rebuild the snapshot.
+    asset_count = Column(Integer, nullable=True)
+    clip_count = Column(Integer, nullable=True)
+    total_duration = Column(Float, nullable=True)
+    video_urls = Column(JSON, nullable=True)
     
     # Optional: Rendered result of this commit
     video_url = Column(String, nullable=True) 
@@ -23,3 +38,8 @@ class Commit(Base):
     project = relationship("Project", back_populates="commits")
     author = relationship("User", backref="commits")
     parent = relationship("Commit", remote_side=[id], backref="children")
+
+    __table_args__ = (
+        Index("ix_commits_project_id_generation", "project_id", "generation"),
+        Index("ix_commits_project_id_created_at", "project_id", "created_at"),
+    )
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, ForeignKey, DateTime, UniqueConstraint
+from sqlalchemy import Column, Integer, ForeignKey, DateTime, Index, UniqueConstraint
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from app.models.base import Base
@@ -16,4 +16,6 @@ class Like(Base):
 
     __table_args__ = (
         UniqueConstraint('user_id', 'project_id', name='unique_user_project_like'),
+        # Per-project like lookups and counts (the unique constraint leads with user_id)
+        Index("ix_likes_project_id", "project_id"),
     )
@@ -1,6 +1,6 @@
 import uuid
 
-from sqlalchemy import Column, DateTime, ForeignKey, Integer, String, Text, JSON
+from sqlalchemy import Column, DateTime, ForeignKey, Index, Integer, String, Text, JSON
 from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.sql import func
 
@@ -32,6 +32,12 @@ class MergeRequest(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
+    # Keyset pagination of the list endpoint (newest first)
+    __table_args__ = (
+        Index("ix_merge_requests_project_id_id", "project_id", "id"),
+        Index("ix_merge_requests_project_id_creator_id_id", "project_id", "creator_id", "id"),
+    )
+
     @property
     def id(self) -> str:
         return self.public_id
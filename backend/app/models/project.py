@@ -1,6 +1,6 @@
 import uuid
 
-from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, JSON, Boolean
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, JSON, Boolean, Index, text
 from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
@@ -17,8 +17,13 @@ class Project(Base):
     tags = Column(JSON().with_variant(JSONB, "postgresql"), nullable=True)
     owner_internal_id = Column("owner_id", Integer, ForeignKey("users.id"), nullable=False)
     parent_project_internal_id = Column("parent_project_id", Integer, ForeignKey("projects.id", ondelete="SET NULL"), nullable=True)
+    # Commit of the parent project this fork was made at. Forks share the parent's commits
+    # (history up to here stays owned by the parent project) instead of copying them.
+    fork_commit_id = Column(String, nullable=True, index=True)
     is_public = Column(Boolean, default=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
+    # Denormalized like count, maintained write-behind by LikeCounterService.
+    likes_count = Column(Integer, nullable=False, default=0, server_default="0")
     
     owner = relationship("User", backref="projects")
     parent_project = relationship(
@@ -32,6 +37,28 @@ class Project(Base):
     commits = relationship("Commit", back_populates="project", cascade="all, delete-orphan")
     likes = relationship("Like", back_populates="project", cascade="all, delete-orphan")
 
+    __table_args__ = (
+        # Keyset pagination of the public feed ("hot" and "new"); partial, since private
+        # projects never appear there
+        Index(
+            "ix_projects_public_likes_count",
+            "likes_count",
+            "created_at",
+            "id",
+            postgresql_where=text("is_public"),
+            sqlite_where=text("is_public = 1"),
+        ),
+        Index(
+            "ix_projects_public_created_at_id",
+            "created_at",
+            "id",
+            postgresql_where=text("is_public"),
+            sqlite_where=text("is_public = 1"),
+        ),
+        # Keyset pagination of profile listings
+        Index("ix_projects_owner_public_created_at_id", "owner_id", "is_public", "created_at", "id"),
+    )
+
     @property
     def id(self) -> str:
         return self.public_id
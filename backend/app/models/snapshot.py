@@ -0,0 +1,21 @@
+from sqlalchemy import Column, String, Integer, JSON
+
+from app.models.base import Base
+
+
+class SnapshotObject(Base):
+    """
+    Immutable content-addressed node of a commit snapshot (see SnapshotService).
+    Rows are keyed by the SHA-1 of their canonical JSON, so identical subtrees
+    of different commits, forks and imports are stored once.
+    """
+
+    __tablename__ = "snapshot_objects"
+
+    hash = Column(String, primary_key=True)
+    kind = Column(String, nullable=False)  # "dict" | "list" | "chunks" | "value" (a scalar root)
+    # Plain JSON (text) on every backend: JSONB would re-sort the keys of inline dicts,
+    # changing the order snapshots are rebuilt in and the content they hash to
+    data = Column(JSON, nullable=False)
+    # Number of entries of the represented dict/list (all chunks for "chunks")
+    entries = Column(Integer, nullable=False, default=0)
@@ -0,0 +1,25 @@
+from sqlalchemy import Column, Integer, String, ForeignKey, Index
+
+from app.models.base import Base
+
+
+class ProjectTag(Base):
+    """One row per (project, tag): the indexed form of Project.tags (see TagService)."""
+
+    __tablename__ = "project_tags"
+
+    project_id = Column(Integer, ForeignKey("projects.id", ondelete="CASCADE"), primary_key=True)
+    tag = Column(String, primary_key=True)
+
+    __table_args__ = (
+        Index("ix_project_tags_tag_project_id", "tag", "project_id"),
+    )
+
+
+class TagCount(Base):
+    """Number of public projects carrying each tag, maintained on every project write."""
+
+    __tablename__ = "tag_counts"
+
+    tag = Column(String, primary_key=True)
+    project_count = Column(Integer, nullable=False, default=0, server_default="0", index=True)
@@ -0,0 +1,18 @@
+from sqlalchemy import Column, Integer, Float, ForeignKey, DateTime
+
+from app.models.base import Base
+
+
+class ProjectTrending(Base):
+    """
+    Materialized trending ranking of public projects, rebuilt periodically by
+    TrendingService.refresh so feeds page through it by rank instead of scoring
+    every project per request.
+    """
+
+    __tablename__ = "project_trending"
+
+    project_id = Column(Integer, ForeignKey("projects.id", ondelete="CASCADE"), primary_key=True)
+    rank = Column(Integer, nullable=False, unique=True, index=True)
+    score = Column(Float, nullable=False)
+    computed_at = Column(DateTime(timezone=True), nullable=False)
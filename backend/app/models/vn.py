@@ -1,6 +1,6 @@
 import uuid
 
-from sqlalchemy import Column, DateTime, ForeignKey, Integer, String, Text, JSON
+from sqlalchemy import Column, DateTime, ForeignKey, Index, Integer, String, Text, JSON
 from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.sql import func
 
@@ -25,6 +25,12 @@ class VNAsset(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
+    # Keyset pagination of the list endpoint (newest first)
+    __table_args__ = (
+        Index("ix_vn_assets_owner_id_id", "owner_id", "id"),
+        Index("ix_vn_assets_owner_id_project_id_id", "owner_id", "project_id", "id"),
+    )
+
     @property
     def id(self) -> str:
         return self.public_id
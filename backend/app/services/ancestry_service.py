@@ -0,0 +1,216 @@
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import case, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased
+
+from app.models.commit import Commit
+
+
+def compute_jump(
+    commit_id: str,
+    parent_hash: Optional[str],
+    parent_generation: Optional[int],
+    parent_jump: Optional[str],
+    parent_jump_generation: Optional[int],
+    parent_jump_jump: Optional[str],
+    parent_jump_jump_generation: Optional[int],
+) -> Tuple[int, str]:
+    """
+    Generation and jump pointer of a new commit from its parent's index entry.
+
+    Skew-binary jump pointers: a commit jumps two hops further than its parent
+    whenever the parent's two jumps are the same length, otherwise to its parent.
+    Any ancestor is then reachable in O(log depth) hops with one pointer per commit.
+    """
+    if parent_hash is None or parent_generation is None:
+        return 1, commit_id
+    generation = parent_generation + 1
+    if (
+        parent_jump_generation is not None
+        and parent_jump_jump is not None
+        and parent_jump_jump_generation is not None
+        and parent_generation - parent_jump_generation == parent_jump_generation - parent_jump_jump_generation
+    ):
+        return generation, parent_jump_jump
+    return generation, parent_hash
+
+
+class AncestryService:
+    """
+    Reachability questions over the commit DAG answered from the persisted
+    generation/jump_hash index with indexed lookups instead of loading history.
+    """
+
+    @staticmethod
+    async def index_entry(db: AsyncSession, commit_id: str, parent_hash: Optional[str]) -> Tuple[int, str]:
+        """(generation, jump_hash) for a commit about to be inserted on top of parent_hash."""
+        if not parent_hash:
+            return 1, commit_id
+        p, pj, pjj = aliased(Commit), aliased(Commit), aliased(Commit)
+        row = (
+            await db.execute(
+                select(p.generation, p.jump_hash, pj.generation, pj.jump_hash, pjj.generation)
+                .select_from(p)
+                .outerjoin(pj, pj.id == p.jump_hash)
+                .outerjoin(pjj, pjj.id == pj.jump_hash)
+                .where(p.id == parent_hash)
+            )
+        ).first()
+        if row is None:
+            return 1, commit_id
+        if row[0] is None:
+            await AncestryService.backfill(db, parent_hash)
+            return await AncestryService.index_entry(db, commit_id, parent_hash)
+        return compute_jump(commit_id, parent_hash, *row)
+
+    @staticmethod
+    async def index_chain(db: AsyncSession, entries: List[Tuple[str, Optional[str]]]) -> List[Tuple[int, str]]:
+        """
+        index_entry for a run of new commits (oldest first) where each may build on an earlier
+        one; only the existing commits the chain hangs off are read from the database.
+        """
+        known: Dict[str, Tuple[int, str]] = {}
+
+        async def entry(cid: str) -> Optional[Tuple[int, str]]:
+            if cid not in known:
+                row = (await db.execute(select(Commit.generation, Commit.jump_hash).where(Commit.id == cid))).first()
+                if row is None:
+                    return None
+                if row[0] is None:
+                    await AncestryService.backfill(db, cid)
+                    row = (await db.execute(select(Commit.generation, Commit.jump_hash).where(Commit.id == cid))).first()
+                known[cid] = (row[0], row[1])
+            return known[cid]
+
+        out: List[Tuple[int, str]] = []
+        for cid, parent in entries:
+            p = await entry(parent) if parent else None
+            if p is None:
+                known[cid] = (1, cid)
+            else:
+                pj = await entry(p[1])
+                pjj = await entry(pj[1]) if pj else None
+                known[cid] = compute_jump(
+                    cid, parent, p[0], p[1], pj[0] if pj else None, pj[1] if pj else None, pjj[0] if pjj else None
+                )
+            out.append(known[cid])
+        return out
+
+    @staticmethod
+    async def backfill(db: AsyncSession, commit_id: str) -> None:
+        """Index commit_id and any unindexed ancestors (commits written before the index existed)."""
+        chain: List[Tuple[str, Optional[str]]] = []
+        cursor: Optional[str] = commit_id
+        while cursor:
+            row = (await db.execute(select(Commit.id, Commit.parent_hash, Commit.generation).where(Commit.id == cursor))).first()
+            if row is None or row[2] is not None:
+                break
+            chain.append((row[0], row[1]))
+            cursor = row[1]
+        for cid, parent in reversed(chain):
+            generation, jump = await AncestryService.index_entry(db, cid, parent)
+            await db.execute(update(Commit).where(Commit.id == cid).values(generation=generation, jump_hash=jump))
+
+    @staticmethod
+    async def generations(db: AsyncSession, commit_ids: List[str]) -> Dict[str, int]:
+        res = await db.execute(select(Commit.id, Commit.generation).where(Commit.id.in_(commit_ids)))
+        return {row[0]: row[1] for row in res.all() if row[1] is not None}
+
+    @staticmethod
+    async def ancestor_at(db: AsyncSession, commit_id: str, generation: int) -> Optional[str]:
+        """The ancestor of commit_id at the given generation, in one recursive query over O(log n) rows."""
+        if generation < 1:
+            return None
+        walk = select(Commit.id, Commit.generation).where(Commit.id == commit_id).cte("ancestry_walk", recursive=True)
+        cur, jmp, nxt = aliased(Commit), aliased(Commit), aliased(Commit)
+        step = (
+            select(nxt.id, nxt.generation)
+            .select_from(walk)
+            .join(cur, cur.id == walk.c.id)
+            .outerjoin(jmp, jmp.id == cur.jump_hash)
+            .join(nxt, nxt.id == case((jmp.generation >= generation, cur.jump_hash), else_=cur.parent_hash))
+            .where(walk.c.generation > generation)
+        )
+        walk = walk.union_all(step)
+        res = await db.execute(select(walk.c.id).where(walk.c.generation == generation))
+        row = res.first()
+        return row[0] if row else None
+
+    @staticmethod
+    async def is_ancestor(db: AsyncSession, ancestor_id: str, descendant_id: str) -> bool:
+        """True if ancestor_id is descendant_id or one of its ancestors."""
+        gens = await AncestryService.generations(db, [ancestor_id, descendant_id])
+        if ancestor_id not in gens or descendant_id not in gens:
+            return False
+        if gens[ancestor_id] > gens[descendant_id]:
+            return False
+        return await AncestryService.ancestor_at(db, descendant_id, gens[ancestor_id]) == ancestor_id
+
+    @staticmethod
+    async def merge_base(db: AsyncSession, a: str, b: str) -> Optional[str]:
+        """Nearest common ancestor of two commits (None if their histories are disjoint)."""
+        gens = await AncestryService.generations(db, [a, b])
+        if a not in gens or b not in gens:
+            return None
+        level = min(gens[a], gens[b])
+        a_at = await AncestryService.ancestor_at(db, a, level)
+        b_at = await AncestryService.ancestor_at(db, b, level)
+        if a_at is not None and a_at == b_at:
+            return a_at
+        # Sharing an ancestor at generation g implies sharing all older ones: binary search.
+        lo, hi, best = 1, level - 1, None
+        while lo <= hi:
+            mid = (lo + hi) // 2
+            a_mid = await AncestryService.ancestor_at(db, a, mid)
+            if a_mid is not None and a_mid == await AncestryService.ancestor_at(db, b, mid):
+                best, lo = a_mid, mid + 1
+            else:
+                hi = mid - 1
+        return best
+
+    @staticmethod
+    def chain_cte(head: str, stop_generation: int = 0, name: str = "ancestry_chain"):
+        """Recursive CTE (id, parent_hash, generation) of head's first-parent chain above stop_generation."""
+        chain = (
+            select(Commit.id, Commit.parent_hash, Commit.generation)
+            .where(Commit.id == head, Commit.generation > stop_generation)
+            .cte(name, recursive=True)
+        )
+        parent = aliased(Commit)
+        return chain.union_all(
+            select(parent.id, parent.parent_hash, parent.generation)
+            .join(chain, parent.id == chain.c.parent_hash)
+            .where(parent.generation > stop_generation)
+        )
+
+    @staticmethod
+    async def _chain(db: AsyncSession, head: str, stop_generation: int) -> List[str]:
+        # First-parent chain from head down to (excluding) stop_generation, newest first.
+        chain = AncestryService.chain_cte(head, stop_generation)
+        res = await db.execute(select(chain.c.id).order_by(chain.c.generation.desc()))
+        return [row[0] for row in res.all()]
+
+    @staticmethod
+    async def commits_between(db: AsyncSession, head: str, base: Optional[str]) -> List[str]:
+        """
+        Commits reachable from head but not from base, newest first (e.g. the
+        commits unique to a branch). Cost is proportional to the result size.
+        """
+        stop_generation = 0
+        if base:
+            mb = await AncestryService.merge_base(db, head, base)
+            if mb is not None:
+                stop_generation = (await AncestryService.generations(db, [mb])).get(mb, 0)
+        return await AncestryService._chain(db, head, stop_generation)
+
+    @staticmethod
+    async def ancestor_chain(db: AsyncSession, head: str, depth: int) -> List[str]:
+        """head and up to depth - 1 of its ancestors, newest first."""
+        gens = await AncestryService.generations(db, [head])
+        if head not in gens:
+            return []
+        return await AncestryService._chain(db, head, max(gens[head] - depth, 0))
+
+
+ancestry_service = AncestryService()
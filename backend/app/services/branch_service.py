@@ -1,14 +1,18 @@
 from typing import List, Optional, Dict, Any
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import select, func, or_, and_
+from sqlalchemy.exc import IntegrityError
 from fastapi import HTTPException
 from fastapi.encoders import jsonable_encoder
-from app.core.cache import cache
+from app.core.cache import cache, project_tag
 
 from app.models.branch import Branch
 from app.models.commit import Commit
 from app.models.project import Project
 from app.models.user import User
+from app.services.ancestry_service import AncestryService
+from app.services.graph_stats import BranchGraphStats
+from app.services.snapshot_service import SnapshotService
 
 class BranchService:
     @staticmethod
@@ -42,11 +46,16 @@ class BranchService:
 
         branch = Branch(name=name, project_id=project_id, head_commit_id=from_commit_hash)
         db.add(branch)
-        await db.commit()
+        try:
+            await db.commit()
+        except IntegrityError:
+            # Lost a race with a concurrent create of the same name (uq_branches_project_id_name)
+            await db.rollback()
+            raise HTTPException(status_code=400, detail="Branch already exists")
         await db.refresh(branch)
         
-        # Invalidate graph cache
-        await cache.delete(f"project_graph:{project_id}")
+        # Invalidate everything derived from the project (graph, etc.)
+        await cache.invalidate_tags(project_tag(project_id))
         
         return branch
 
@@ -54,27 +63,29 @@ class BranchService:
     async def get_project_graph(db: AsyncSession, project_id: int) -> Dict[str, Any]:
         """
         Get the DAG graph of the project (commits and branches).
+        Rebuilds are coalesced so a commit to a popular project costs one rebuild, not one per request.
         """
-        # Try cache first
-        cache_key = f"project_graph:{project_id}"
-        cached_data = await cache.get(cache_key)
-        if cached_data:
-            return cached_data
+        return await cache.get_or_build(
+            f"project_graph:{project_id}",
+            lambda: BranchService._build_project_graph(db, project_id),
+            expire=600,  # Cache for 10 mins
+            tags=[project_tag(project_id)],
+        )
 
+    @staticmethod
+    async def _build_project_graph(db: AsyncSession, project_id: int) -> Dict[str, Any]:
         # Fetch all branches
         branches_query = select(Branch).where(Branch.project_id == project_id)
         branches_res = await db.execute(branches_query)
         branches = branches_res.scalars().all()
         id_map = {b.internal_id: b.public_id for b in branches}
 
-        # Fetch all commits
-        commits_query = select(Commit).where(Commit.project_id == project_id).order_by(Commit.created_at.asc())
+        # Fetch all commits (including history shared with the project this one was forked from)
+        visible = await BranchService._project_commits_filter(db, project_id)
+        commits_query = select(Commit).where(visible).order_by(Commit.created_at.asc())
         commits_res = await db.execute(commits_query)
         commits = commits_res.scalars().all()
         
-        # Build commits map for traversal
-        commits_map = {c.id: c for c in commits}
-        
         # Fetch authors
         author_ids = {c.author_id for c in commits if c.author_id}
         if author_ids:
@@ -84,75 +95,20 @@ class BranchService:
         else:
             users = {}
 
-        # Calculate scores for all commits first
-        commit_scores = {}
+        # Score every commit once (base 1, bonus for assets), then derive all branch stats in a single pass
+        engine = BranchGraphStats()
         for c in commits:
-            # Base score 1, bonus for assets
-            asset_score = len(c.video_assets.keys()) if c.video_assets else 0
-            commit_scores[c.id] = 1 + (asset_score * 0.5)
-            
-        total_project_score = sum(commit_scores.values()) or 1
-
-        # Calculate branch stats
-        branch_stats = {}
+            asset_score = c.asset_count or 0
+            engine.add_commit(c.id, c.parent_hash, c.author_id or None, 1 + (asset_score * 0.5))
         for b in branches:
-            stats = {"commit_count": 0, "contributors": {}, "total_score": 0}
-            current_hash = b.head_commit_id
-            visited = set()
-            
-            queue = [current_hash] if current_hash else []
-            
-            while queue:
-                h = queue.pop(0)
-                if not h or h in visited or h not in commits_map:
-                    continue
-                visited.add(h)
-                
-                c = commits_map[h]
-                stats["commit_count"] += 1
-                
-                # Add to branch total score
-                score = commit_scores.get(h, 0)
-                stats["total_score"] += score
-                
-                if c.author_id:
-                    uid = c.author_id
-                    if uid not in stats["contributors"]:
-                        u = users.get(uid)
-                        stats["contributors"][uid] = {
-                            "name": u.full_name if u else f"User {uid}",
-                            "count": 0,
-                            "score": 0
-                        }
-                    stats["contributors"][uid]["count"] += 1
-                    stats["contributors"][uid]["score"] += score
+            engine.set_head(b.public_id, b.head_commit_id)
+        engine.compute()
 
-                if c.parent_hash:
-                    queue.append(c.parent_hash)
-            
-            # Normalize contributors
-            branch_total_score = stats["total_score"] or 1
-            contributors_list = []
-            for uid, cdata in stats["contributors"].items():
-                percent = round((cdata["score"] / branch_total_score) * 100, 1)
-                contributors_list.append({
-                    "name": cdata["name"],
-                    "count": cdata["count"],
-                    "score": cdata["score"],
-                    "percent": percent
-                })
-            
-            # Sort by score desc
-            contributors_list.sort(key=lambda x: x["score"], reverse=True)
-            
-            # Calculate branch contribution to project
-            project_percent = round((stats["total_score"] / total_project_score) * 100, 1)
-            
-            branch_stats[b.public_id] = {
-                "contributors": contributors_list,
-                "project_percent": project_percent,
-                "commit_count": stats["commit_count"]
-            }
+        def contributor_name(uid: int) -> Any:
+            u = users.get(uid)
+            return u.full_name if u else f"User {uid}"
+
+        branch_stats = {b.public_id: engine.branch_summary(b.public_id, contributor_name) for b in branches}
 
         data = {
             "branches": [
@@ -175,18 +131,150 @@ class BranchService:
                     "message": c.message, 
                     "parent_hash": c.parent_hash, 
                     "created_at": c.created_at,
-                    "author_id": c.author_id
+                    "author_id": c.author_id,
+                    "clip_count": c.clip_count,
+                    "total_duration": c.total_duration,
                 } 
                 for c in commits
             ]
         }
         
-        # Cache the result (convert to JSON-friendly format first)
-        json_data = jsonable_encoder(data)
-        await cache.set(cache_key, json_data, expire=600) # Cache for 10 mins
-        
-        return json_data
+        # Convert to JSON-friendly format so it can be cached
+        return jsonable_encoder(data)
     
+    @staticmethod
+    async def _project_commits_filter(db: AsyncSession, project_id: int, stop_generation: int = 0):
+        """
+        Condition selecting a project's commits: its own plus, for copy-on-write forks, the
+        shared history of the commit it was forked at (above stop_generation).
+        """
+        own = Commit.project_id == project_id
+        fork_commit_id = (await db.execute(select(Project.fork_commit_id).where(Project.internal_id == project_id))).scalar()
+        if not fork_commit_id:
+            return own
+        chain = AncestryService.chain_cte(fork_commit_id, stop_generation, name="fork_history")
+        return or_(own, Commit.id.in_(select(chain.c.id)))
+
+    @staticmethod
+    def _parse_graph_cursor(cursor: Optional[str]) -> tuple[Optional[int], Optional[str]]:
+        text = (cursor or "").strip()
+        if not text:
+            return None, None
+        gen_text, _, after_id = text.partition(":")
+        if not gen_text.isdigit():
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        return int(gen_text), (after_id or None)
+
+    @staticmethod
+    async def get_project_graph_window(
+        db: AsyncSession,
+        project_id: int,
+        cursor: Optional[str] = None,
+        depth: int = 50,
+        limit: int = 500,
+        branch_name: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """
+        A bounded slice of the commit graph, newest generations first.
+
+        `cursor` is "<generation>" (start at that generation) or "<generation>:<commit id>"
+        (continue after that commit within the generation); omit it to start at the tip.
+        At most `depth` generations and `limit` commits are returned. `edge_stubs` lists
+        parents outside the slice and `next_cursor` loads the next older slice.
+        With `branch_name` only that branch's first-parent history is returned.
+        """
+        depth = min(max(int(depth), 1), 500)
+        limit = min(max(int(limit), 1), 2000)
+        top_generation, after_id = BranchService._parse_graph_cursor(cursor)
+
+        branches_res = await db.execute(select(Branch).where(Branch.project_id == project_id))
+        branches = branches_res.scalars().all()
+        id_map = {b.internal_id: b.public_id for b in branches}
+
+        columns = (
+            Commit.id,
+            Commit.message,
+            Commit.parent_hash,
+            Commit.created_at,
+            Commit.author_id,
+            Commit.generation,
+            Commit.clip_count,
+            Commit.total_duration,
+        )
+        next_cursor: Optional[str] = None
+        if branch_name:
+            branch = next((b for b in branches if b.name == branch_name), None)
+            if not branch:
+                raise HTTPException(status_code=404, detail="Branch not found")
+            rows = []
+            start = branch.head_commit_id
+            if start and top_generation is not None:
+                head_generation = (await AncestryService.generations(db, [start])).get(start, 0)
+                if top_generation < head_generation:
+                    start = await AncestryService.ancestor_at(db, start, top_generation)
+            if start:
+                chain = await AncestryService.ancestor_chain(db, start, min(depth, limit))
+                if chain:
+                    res = await db.execute(select(*columns).where(Commit.id.in_(chain)))
+                    rows = sorted(res.all(), key=lambda r: -(r.generation or 0))
+            if rows and rows[-1].parent_hash and (rows[-1].generation or 0) > 1:
+                next_cursor = str(rows[-1].generation - 1)
+        else:
+            if top_generation is None:
+                visible = await BranchService._project_commits_filter(db, project_id)
+                top_generation = (await db.execute(select(func.max(Commit.generation)).where(visible))).scalar() or 0
+            visible = await BranchService._project_commits_filter(db, project_id, max(top_generation - depth, 0))
+            q = select(*columns).where(
+                visible,
+                Commit.generation <= top_generation,
+                Commit.generation > top_generation - depth,
+            )
+            if after_id:
+                q = q.where(or_(Commit.generation < top_generation, and_(Commit.generation == top_generation, Commit.id > after_id)))
+            res = await db.execute(q.order_by(Commit.generation.desc(), Commit.id.asc()).limit(limit + 1))
+            rows = res.all()
+            if len(rows) > limit:
+                rows = rows[:limit]
+                next_cursor = f"{rows[-1].generation}:{rows[-1].id}"
+            elif top_generation - depth >= 1:
+                next_cursor = str(top_generation - depth)
+
+        in_window = {r.id for r in rows}
+        data = {
+            "branches": [
+                {
+                    "id": b.public_id,
+                    "name": b.name,
+                    "head_commit_id": b.head_commit_id,
+                    "description": b.description,
+                    "tags": b.tags,
+                    "parent_branch_id": id_map.get(b.parent_branch_internal_id),
+                }
+                for b in branches
+            ],
+            "commits": [
+                {
+                    "id": r.id,
+                    "message": r.message,
+                    "parent_hash": r.parent_hash,
+                    "created_at": r.created_at,
+                    "author_id": r.author_id,
+                    "generation": r.generation,
+                    "clip_count": r.clip_count,
+                    "total_duration": r.total_duration,
+                }
+                for r in rows
+            ],
+            "edge_stubs": [
+                {"commit_id": r.id, "parent_hash": r.parent_hash, "parent_generation": (r.generation or 1) - 1}
+                for r in rows
+                if r.parent_hash and r.parent_hash not in in_window
+            ],
+            "next_cursor": next_cursor,
+            "has_more": next_cursor is not None,
+        }
+        return jsonable_encoder(data)
+
     @staticmethod
     async def get_head_state(db: AsyncSession, project_id: int, branch_name: str = "main") -> Dict[str, Any]:
         """
@@ -209,7 +297,7 @@ class BranchService:
         return {
             "commit_id": commit.id,
             "message": commit.message,
-            "video_assets": commit.video_assets
+            "video_assets": await SnapshotService.load(db, commit)
         }
 
     @staticmethod
@@ -271,7 +359,7 @@ class BranchService:
         db.add(branch)
         await db.commit()
         await db.refresh(branch)
-        await cache.delete(f"project_graph:{project_internal_id}")
+        await cache.invalidate_tags(project_tag(project_internal_id))
         return branch
 
 branch_service = BranchService()
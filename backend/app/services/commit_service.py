@@ -1,17 +1,25 @@
 import hashlib
 import json
 from datetime import datetime
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List, Tuple
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, update
+from sqlalchemy.orm.attributes import set_committed_value
 from fastapi import HTTPException
-from app.core.cache import cache
+from app.core.cache import cache, project_tag
 
 from app.models.commit import Commit
 from app.models.branch import Branch
 from app.models.project import Project
+from app.services.ancestry_service import AncestryService
+from app.services.diff_service import merge_snapshots
+from app.services.publish_service import PublishService
+from app.services.snapshot_service import SnapshotService
 
 class CommitService:
+    HEAD_CAS_ATTEMPTS = 8
+    PUSH_MAX_COMMITS = 500
+
     @staticmethod
     def calculate_hash(message: str, parent_hash: Optional[str], video_assets: Dict[str, Any], timestamp: str) -> str:
         """
@@ -27,6 +35,33 @@ class CommitService:
         content_str = json.dumps(content, sort_keys=True)
         return hashlib.sha1(content_str.encode("utf-8")).hexdigest()
 
+    @staticmethod
+    def summarize_snapshot(video_assets: Any) -> Dict[str, Any]:
+        """
+        Summary columns of a snapshot: top-level asset count, clip count, total clip
+        duration (seconds, from numeric "duration" fields) and the ordered video URL manifest.
+        """
+        video_urls = PublishService.collect_video_urls(video_assets)
+        asset_count = len(video_assets) if isinstance(video_assets, (dict, list)) else 0
+        clips: Any = video_assets.get("clips") if isinstance(video_assets, dict) else None
+        if isinstance(clips, list):
+            clip_count = len(clips)
+            durations: List[float] = [
+                float(c["duration"])
+                for c in clips
+                if isinstance(c, dict) and isinstance(c.get("duration"), (int, float)) and not isinstance(c.get("duration"), bool)
+            ]
+            total_duration = sum(durations)
+        else:
+            clip_count = len(video_urls)
+            total_duration = 0.0
+        return {
+            "asset_count": asset_count,
+            "clip_count": clip_count,
+            "total_duration": total_duration,
+            "video_urls": video_urls,
+        }
+
     @staticmethod
     async def create_commit(
         db: AsyncSession,
@@ -35,7 +70,8 @@ class CommitService:
         message: str,
         video_assets: Dict[str, Any],
         branch_name: str = "main",
-        parent_hash: Optional[str] = None
+        parent_hash: Optional[str] = None,
+        rebase_on_conflict: bool = False,
     ) -> Commit:
         """
         Create a new commit and update the branch HEAD.
@@ -62,46 +98,204 @@ class CommitService:
             else:
                 raise HTTPException(status_code=404, detail=f"Branch {branch_name} not found")
 
-        # 3. Determine Parent Hash
-        # If parent_hash is not provided, use branch.head_commit_id
-        if not parent_hash:
-            parent_hash = branch.head_commit_id
-        
-        # 4. Create Commit
-        timestamp = datetime.utcnow().isoformat()
-        commit_id = CommitService.calculate_hash(message, parent_hash, video_assets, timestamp)
-        
-        # Check collision (unlikely but good practice)
-        existing_commit = await db.get(Commit, commit_id)
-        if existing_commit:
-             # If exact same content, just return existing? Or error?
-             # Git allows empty commits but hash changes with timestamp. 
-             # Our timestamp is generated here, so collision means exact same millisecond.
-             pass
-
-        commit = Commit(
-            id=commit_id,
-            project_id=project_id,
-            author_id=author_id,
-            message=message,
-            parent_hash=parent_hash,
-            video_assets=video_assets,
-            # created_at is auto-handled by DB default, but for hashing consistency we might want to set it explicitly
-            # Let's rely on DB for now, hash uses the generated timestamp string.
-        )
-        db.add(commit)
-        
-        # 5. Update Branch HEAD
-        # We need to update the branch to point to this new commit
-        branch.head_commit_id = commit_id
-        db.add(branch) # Update branch
-        
+        # 3. Store the snapshot once; it does not depend on the parent
+        snapshot = video_assets if video_assets is not None else {}
+        tree_hash = await SnapshotService.put(db, snapshot)
+        summary = CommitService.summarize_snapshot(snapshot)
+
+        # 4. Create the commit on top of the expected HEAD (parent_hash, else the HEAD read
+        # now) and compare-and-swap HEAD to it. A moved HEAD is a 409; with rebase_on_conflict
+        # the snapshot is three-way merged with the new HEAD's instead, and a clip changed
+        # on both sides is still a 409, so a concurrent writer's changes are never overwritten.
+        expected_head = parent_hash or await CommitService.current_head(db, branch)
+        hashed_assets = video_assets
+        for _attempt in range(CommitService.HEAD_CAS_ATTEMPTS):
+            timestamp = datetime.utcnow().isoformat()
+            commit_id = CommitService.calculate_hash(message, expected_head, hashed_assets, timestamp)
+            generation, jump_hash = await AncestryService.index_entry(db, commit_id, expected_head)
+
+            commit = Commit(
+                id=commit_id,
+                project_id=project_id,
+                author_id=author_id,
+                message=message,
+                parent_hash=expected_head,
+                generation=generation,
+                jump_hash=jump_hash,
+                tree_hash=tree_hash,
+                **summary,
+                # created_at is auto-handled by DB default, but for hashing consistency we might want to set it explicitly
+                # Let's rely on DB for now, hash uses the generated timestamp string.
+            )
+            db.add(commit)
+            await db.flush()
+
+            if await CommitService.swap_head(db, branch, expected_head, commit_id):
+                break
+
+            # Lost the race: drop this attempt and look at the HEAD that won
+            await db.delete(commit)
+            await db.flush()
+            current_head = await CommitService.current_head(db, branch)
+            conflict = {"message": f"Branch {branch_name} HEAD has moved", "expected_head": expected_head, "current_head": current_head}
+            if not rebase_on_conflict:
+                await db.rollback()
+                raise HTTPException(status_code=409, detail=conflict)
+            snapshot, conflicts = await CommitService._rebase_snapshot(db, snapshot, expected_head, current_head)
+            if conflicts:
+                await db.rollback()
+                raise HTTPException(status_code=409, detail={**conflict, "conflicts": conflicts})
+            hashed_assets = snapshot
+            tree_hash = await SnapshotService.put(db, snapshot)
+            summary = CommitService.summarize_snapshot(snapshot)
+            expected_head = current_head
+        else:
+            await db.rollback()
+            raise HTTPException(status_code=409, detail=f"Branch {branch_name} is being updated concurrently, retry")
+
         await db.commit()
         await db.refresh(commit)
         
-        # Invalidate graph cache
-        await cache.delete(f"project_graph:{project_id}")
+        # Invalidate everything derived from the project (graph, etc.)
+        await cache.invalidate_tags(project_tag(project_id))
         
         return commit
 
+    @staticmethod
+    async def _rebase_snapshot(
+        db: AsyncSession, snapshot: Any, base_id: Optional[str], head_id: Optional[str]
+    ) -> Tuple[Any, List[str]]:
+        """Replay the changes snapshot made to base_id's snapshot on top of head_id's: (merged, conflicts)."""
+        base_commit = await db.get(Commit, base_id) if base_id else None
+        head_commit = await db.get(Commit, head_id) if head_id else None
+        base = await SnapshotService.load(db, base_commit) if base_commit is not None else {}
+        head = await SnapshotService.load(db, head_commit) if head_commit is not None else {}
+        return merge_snapshots(base, snapshot, head)
+
+    @staticmethod
+    async def push_commits(
+        db: AsyncSession,
+        project_id: int,
+        author_id: int,
+        commits: List[Dict[str, Any]],
+        branch_name: str = "main",
+        parent_hash: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """
+        Append an ordered run of commits (oldest first) to a branch in one transaction
+        with one HEAD swap and one cache invalidation.
+
+        Each item has message and video_assets, and optionally the client-computed id
+        (with the timestamp it was hashed with) and parent_hash, which must be the
+        previous item. The run builds on parent_hash, else on the first item's parent,
+        else on the current HEAD; a HEAD that moved off the base is a 409. Items whose
+        id already exists are skipped, so a push that timed out can be retried.
+        """
+        if not commits:
+            raise HTTPException(status_code=400, detail="No commits to push")
+        if len(commits) > CommitService.PUSH_MAX_COMMITS:
+            raise HTTPException(status_code=413, detail=f"At most {CommitService.PUSH_MAX_COMMITS} commits per push")
+
+        project = await db.get(Project, project_id)
+        if not project:
+            raise HTTPException(status_code=404, detail="Project not found")
+        result = await db.execute(select(Branch).where(Branch.project_id == project_id, Branch.name == branch_name))
+        branch = result.scalar_one_or_none()
+        if not branch:
+            raise HTTPException(status_code=404, detail=f"Branch {branch_name} not found")
+
+        base = parent_hash or commits[0].get("parent_hash")
+        if base is None:
+            base = await CommitService.current_head(db, branch)
+
+        snapshots = [c.get("video_assets") if c.get("video_assets") is not None else {} for c in commits]
+        tree_hashes = await SnapshotService.put_many(db, snapshots)
+        summaries = [CommitService.summarize_snapshot(v) for v in snapshots]
+
+        # Hash and chain the run on top of base
+        chain: List[tuple] = []
+        prev = base
+        for i, item in enumerate(commits):
+            if item.get("parent_hash") and item["parent_hash"] != prev:
+                raise HTTPException(status_code=400, detail=f"Commit {i} does not build on the previous commit")
+            timestamp = item.get("timestamp") or datetime.utcnow().isoformat()
+            commit_id = CommitService.calculate_hash(item["message"], prev, item.get("video_assets"), timestamp)
+            if item.get("id") and item["id"] != commit_id:
+                raise HTTPException(status_code=400, detail=f"Commit {i} hash does not match its content")
+            chain.append((commit_id, prev))
+            prev = commit_id
+
+        ids = [cid for cid, _ in chain]
+        res = await db.execute(select(Commit.id, Commit.project_id).where(Commit.id.in_(ids)))
+        existing = dict(res.all())
+        if any(pid != project_id for pid in existing.values()):
+            raise HTTPException(status_code=409, detail="Commit already exists in another project")
+
+        indexes = await AncestryService.index_chain(db, chain)
+        created = []
+        for item, (commit_id, parent), (generation, jump_hash), tree_hash, summary in zip(
+            commits, chain, indexes, tree_hashes, summaries
+        ):
+            if commit_id in existing:
+                continue
+            commit = Commit(
+                id=commit_id,
+                project_id=project_id,
+                author_id=author_id,
+                message=item["message"],
+                parent_hash=parent,
+                generation=generation,
+                jump_hash=jump_hash,
+                tree_hash=tree_hash,
+                **summary,
+            )
+            db.add(commit)
+            created.append(commit)
+        await db.flush()
+
+        # Every snapshot in the run is a full state built on base, so a moved HEAD is a
+        # conflict: re-parenting would silently revert the other writer's changes
+        head = await CommitService.current_head(db, branch)
+        if head != prev and not await CommitService.swap_head(db, branch, base, prev):
+            current_head = await CommitService.current_head(db, branch)
+            await db.rollback()
+            raise HTTPException(
+                status_code=409,
+                detail={"message": f"Branch {branch_name} HEAD has moved", "expected_head": base, "current_head": current_head},
+            )
+
+        pushed = {
+            "branch_name": branch_name,
+            "head_commit_id": prev,
+            "created": [c.id for c in created],
+            "skipped": [cid for cid, _ in chain if cid in existing],
+        }
+        await db.commit()
+        await cache.invalidate_tags(project_tag(project_id))
+        return pushed
+
+    @staticmethod
+    async def current_head(db: AsyncSession, branch: Branch) -> Optional[str]:
+        res = await db.execute(select(Branch.head_commit_id).where(Branch.internal_id == branch.internal_id))
+        return res.scalar()
+
+    @staticmethod
+    async def swap_head(db: AsyncSession, branch: Branch, expected: Optional[str], new_head: str) -> bool:
+        """
+        Atomically move branch HEAD from expected to new_head
+        (UPDATE ... WHERE head_commit_id = :expected RETURNING). False if HEAD had moved.
+        """
+        guard = Branch.head_commit_id.is_(None) if expected is None else Branch.head_commit_id == expected
+        res = await db.execute(
+            update(Branch)
+            .where(Branch.internal_id == branch.internal_id, guard)
+            .values(head_commit_id=new_head)
+            .returning(Branch.internal_id)
+            .execution_options(synchronize_session=False)
+        )
+        if res.scalar_one_or_none() is None:
+            return False
+        set_committed_value(branch, "head_commit_id", new_head)
+        return True
+
 commit_service = CommitService()
@@ -0,0 +1,251 @@
+import hashlib
+import json
+from bisect import bisect_left
+from typing import Any, Dict, List, Optional, Tuple
+
+from fastapi import HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.cache import cache
+from app.models.commit import Commit
+from app.services.snapshot_service import SnapshotService
+
+_MISSING = object()
+
+
+def _clip_key(clip: Any) -> str:
+    if isinstance(clip, dict):
+        for field in ("id", "clip_id", "key", "name"):
+            if clip.get(field) is not None:
+                return f"{field}:{clip[field]}"
+    # No identity: clips match only when identical
+    return "sha1:" + hashlib.sha1(json.dumps(clip, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+
+def _keyed(items: List[Tuple[str, Any]]) -> List[Tuple[str, Any]]:
+    # Disambiguate repeated keys by occurrence so every clip has a unique identity
+    seen: Dict[str, int] = {}
+    out = []
+    for key, value in items:
+        n = seen.get(key, 0)
+        seen[key] = n + 1
+        out.append((key if n == 0 else f"{key}#{n}", value))
+    return out
+
+
+def _clips(snapshot: Any) -> Tuple[List[Tuple[str, Any]], bool, Dict[str, Any]]:
+    """(keyed clips in timeline order, whether order is meaningful, remaining top-level fields)."""
+    if isinstance(snapshot, dict) and isinstance(snapshot.get("clips"), list):
+        rest = {k: v for k, v in snapshot.items() if k != "clips"}
+        return _keyed([(_clip_key(c), c) for c in snapshot["clips"]]), True, rest
+    if isinstance(snapshot, dict):
+        # Flat asset maps (e.g. the CLI's {filename: url}): every entry is a clip
+        return [(str(k), v) for k, v in snapshot.items()], False, {}
+    if isinstance(snapshot, list):
+        return _keyed([(_clip_key(c), c) for c in snapshot]), True, {}
+    return [], False, {}
+
+
+def _field_changes(before: Any, after: Any) -> Dict[str, Any]:
+    if not isinstance(before, dict) or not isinstance(after, dict):
+        return {"": {"from": before, "to": after}}
+    changes = {}
+    for k in list(before.keys()) + [k for k in after.keys() if k not in before]:
+        a, b = before.get(k, _MISSING), after.get(k, _MISSING)
+        if a != b:
+            changes[k] = {"from": None if a is _MISSING else a, "to": None if b is _MISSING else b}
+    return changes
+
+
+def _moved(base_order: List[str], head_pos: Dict[str, int]) -> List[str]:
+    """Clips outside a longest increasing subsequence of head positions: the fewest moves explaining the new order."""
+    seq = [head_pos[k] for k in base_order]
+    tails: List[int] = []
+    tails_idx: List[int] = []
+    prev = [-1] * len(seq)
+    for i, pos in enumerate(seq):
+        j = bisect_left(tails, pos)
+        if j == len(tails):
+            tails.append(pos)
+            tails_idx.append(i)
+        else:
+            tails[j] = pos
+            tails_idx[j] = i
+        prev[i] = tails_idx[j - 1] if j > 0 else -1
+    keep = set()
+    i = tails_idx[-1] if tails_idx else -1
+    while i >= 0:
+        keep.add(i)
+        i = prev[i]
+    return [k for i, k in enumerate(base_order) if i not in keep]
+
+
+def diff_snapshots(base: Any, head: Any) -> Dict[str, Any]:
+    """
+    Structural diff of two commit snapshots: clips added, removed, modified (per field)
+    and moved, plus changes to the other top-level fields. Clips are matched by id
+    (or clip_id/key/name, falling back to content).
+    """
+    base_clips, ordered, base_rest = _clips(base)
+    head_clips, head_ordered, head_rest = _clips(head)
+    ordered = ordered and head_ordered
+    base_map, head_map = dict(base_clips), dict(head_clips)
+    base_pos = {k: i for i, (k, _) in enumerate(base_clips)}
+    head_pos = {k: i for i, (k, _) in enumerate(head_clips)}
+
+    added = [{"key": k, "index": head_pos[k], "clip": v} for k, v in head_clips if k not in base_map]
+    removed = [{"key": k, "index": base_pos[k], "clip": v} for k, v in base_clips if k not in head_map]
+    modified = [
+        {"key": k, "index": head_pos[k], "changes": _field_changes(base_map[k], v)}
+        for k, v in head_clips
+        if k in base_map and base_map[k] != v
+    ]
+    moved = []
+    if ordered:
+        common = [k for k, _ in base_clips if k in head_map]
+        common_head = {k: i for i, k in enumerate(k for k, _ in head_clips if k in base_map)}
+        moved = [
+            {"key": k, "from_index": base_pos[k], "to_index": head_pos[k]}
+            for k in _moved(common, common_head)
+        ]
+
+    fields = _field_changes(base_rest, head_rest) if base_rest != head_rest else {}
+    return {
+        "clips": {"added": added, "removed": removed, "modified": modified, "moved": moved},
+        "fields": fields,
+        "identical": not (added or removed or modified or moved or fields),
+    }
+
+
+def _merge_value(base: Any, ours: Any, theirs: Any) -> Tuple[Any, bool]:
+    """Three-way merge of one value: (result, conflicted); _MISSING means absent."""
+    if ours == theirs or theirs == base:
+        return ours, False
+    if ours == base:
+        return theirs, False
+    return ours, True
+
+
+def _merge_order(base: List[str], ours: List[str], theirs: List[str], keep: set) -> Optional[List[str]]:
+    """
+    Order of the merged clips: the side that reordered the shared clips wins (None
+    if both did, differently); the other side's new clips follow their predecessor.
+    """
+    shared = [k for k in base if k in ours and k in theirs]
+    ours_shared = [k for k in ours if k in shared]
+    theirs_shared = [k for k in theirs if k in shared]
+    if ours_shared != shared and theirs_shared != shared and ours_shared != theirs_shared:
+        return None
+    skeleton, other = (ours, theirs) if ours_shared != shared else (theirs, ours)
+    order = [k for k in skeleton if k in keep]
+    placed = set(order)
+    for i, k in enumerate(other):
+        if k in placed or k not in keep:
+            continue
+        anchor = next((p for p in reversed(other[:i]) if p in placed), None)
+        order.insert(order.index(anchor) + 1 if anchor is not None else 0, k)
+        placed.add(k)
+    return order
+
+
+def merge_snapshots(base: Any, ours: Any, theirs: Any) -> Tuple[Any, List[str]]:
+    """
+    Three-way merge of commit snapshots: `ours` and `theirs` were both built on
+    `base`. Clips (matched as in diff_snapshots) and other top-level fields
+    changed on one side only take that side's version. Returns (merged,
+    conflicts): the keys of clips or fields changed differently on both sides,
+    "order" when both reordered the timeline, "" when the snapshots have
+    different shapes.
+    """
+    if ours == theirs or theirs == base:
+        return ours, []
+    if ours == base:
+        return theirs, []
+
+    def shape(snapshot: Any) -> Any:
+        if isinstance(snapshot, dict):
+            return "timeline" if isinstance(snapshot.get("clips"), list) else "assets"
+        return "list" if isinstance(snapshot, list) else None
+
+    shapes = {shape(ours), shape(theirs)} | ({shape(base)} if base else set())
+    if len(shapes) > 1 or None in shapes:
+        return ours, [""]
+
+    base_clips, _, base_rest = _clips(base)
+    our_clips, _, our_rest = _clips(ours)
+    their_clips, _, their_rest = _clips(theirs)
+    base_map, our_map, their_map = dict(base_clips), dict(our_clips), dict(their_clips)
+    our_order, their_order = [k for k, _ in our_clips], [k for k, _ in their_clips]
+    conflicts: List[str] = []
+    merged: Dict[str, Any] = {}
+    for k in our_order + [k for k in their_order if k not in our_map]:
+        value, conflicted = _merge_value(base_map.get(k, _MISSING), our_map.get(k, _MISSING), their_map.get(k, _MISSING))
+        if conflicted:
+            conflicts.append(k)
+        if value is not _MISSING:
+            merged[k] = value
+
+    order = _merge_order([k for k, _ in base_clips], our_order, their_order, set(merged))
+    if order is None:
+        conflicts.append("order")
+        order = [k for k in our_order if k in merged] + [k for k in their_order if k in merged and k not in our_map]
+    clips = [merged[k] for k in order]
+
+    if shape(ours) == "list":
+        return clips, conflicts
+    if shape(ours) == "assets":
+        # Flat asset map: the clip keys are the dict keys
+        return {k: merged[k] for k in order}, conflicts
+
+    rest: Dict[str, Any] = {}
+    for k in list(our_rest) + [k for k in their_rest if k not in our_rest]:
+        value, conflicted = _merge_value(base_rest.get(k, _MISSING), our_rest.get(k, _MISSING), their_rest.get(k, _MISSING))
+        if conflicted:
+            conflicts.append(f"field:{k}")
+        if value is not _MISSING:
+            rest[k] = value
+    out: Dict[str, Any] = {}
+    for k in ours:
+        if k == "clips":
+            out["clips"] = clips
+        elif k in rest:
+            out[k] = rest[k]
+    for k, v in rest.items():
+        out.setdefault(k, v)
+    out.setdefault("clips", clips)
+    return out, conflicts
+
+
+class DiffService:
+    CACHE_TTL_SECONDS = 7 * 24 * 3600
+
+    @staticmethod
+    async def diff_commits(db: AsyncSession, base: Optional[Commit], head: Commit) -> Dict[str, Any]:
+        """
+        Diff of two commits (base None = empty snapshot). Commits are immutable, so the
+        result is cached under the hash pair and never invalidated.
+        """
+        base_id = base.id if base else None
+
+        async def build() -> Dict[str, Any]:
+            if base is not None and base.tree_hash and base.tree_hash == head.tree_hash:
+                result = diff_snapshots({}, {})
+            else:
+                before = await SnapshotService.load(db, base) if base is not None else {}
+                after = await SnapshotService.load(db, head)
+                result = diff_snapshots(before, after)
+            return {"base": base_id, "head": head.id, **result}
+
+        return await cache.get_or_build(
+            f"commit_diff:{base_id or 'empty'}:{head.id}", build, expire=DiffService.CACHE_TTL_SECONDS
+        )
+
+    @staticmethod
+    async def get_commit(db: AsyncSession, commit_id: str) -> Commit:
+        commit = await db.get(Commit, commit_id)
+        if not commit:
+            raise HTTPException(status_code=404, detail=f"Commit {commit_id} not found")
+        return commit
+
+
+diff_service = DiffService()
@@ -1,15 +1,77 @@
-from typing import List, Optional
+import hashlib
+import json
+from typing import List, Optional, Sequence, Set
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, desc, and_, or_
-from sqlalchemy.dialects import postgresql
+from sqlalchemy import select, desc, and_
 from sqlalchemy.orm import selectinload
 
+from app.core.cache import FEED_HOT_TAG, FEED_TAG, cache
+from app.core.config import settings
+from app.core.db import read_only
+from app.core.pagination import keyset_after
 from app.models.project import Project
 from app.models.like import Like
+from app.models.tag import ProjectTag
+from app.models.trending import ProjectTrending
 from app.schemas.project import ProjectFeedItem as ProjectSchema
+from app.services.like_counter_service import LikeCounterService
+from app.services.search_service import SearchService
 
 class FeedService:
     @staticmethod
+    async def _overlay(
+        db: AsyncSession,
+        items: List[ProjectSchema],
+        project_ids: Sequence[int],
+        stored_counts: Optional[Sequence[int]],
+        current_user_id: Optional[int],
+    ) -> List[ProjectSchema]:
+        """
+        Set like counts (stored counter plus unflushed deltas) and the viewer's
+        is_liked bits on a page. Without `stored_counts` (a cached page) the
+        counters are read with the viewer's likes in one query; otherwise only
+        the viewer's likes are looked up, with one IN query.
+        """
+        if not items:
+            return items
+        pending = await LikeCounterService.pending(project_ids)
+        liked: Set[int] = set()
+        if stored_counts is None:
+            q = select(Project.internal_id, Project.likes_count).where(Project.internal_id.in_(project_ids))
+            if current_user_id:
+                q = q.add_columns(Like.id).outerjoin(
+                    Like, and_(Like.project_id == Project.internal_id, Like.user_id == current_user_id)
+                )
+            counts = {}
+            for pid, count, *like_id in (await db.execute(q)).all():
+                counts[pid] = count
+                if like_id and like_id[0] is not None:
+                    liked.add(pid)
+            stored_counts = [counts.get(pid, 0) for pid in project_ids]
+        elif current_user_id:
+            liked_query = select(Like.project_id).where(
+                and_(Like.project_id.in_(project_ids), Like.user_id == current_user_id)
+            )
+            liked = set((await db.execute(liked_query)).scalars().all())
+        for item, pid, stored in zip(items, project_ids, stored_counts):
+            item.likes_count = max((stored or 0) + pending.get(pid, 0), 0)
+            item.is_liked = pid in liked
+        return items
+
+    @staticmethod
+    async def _enrich(
+        db: AsyncSession, projects: Sequence[Project], current_user_id: Optional[int]
+    ) -> List[ProjectSchema]:
+        return await FeedService._overlay(
+            db,
+            [ProjectSchema.model_validate(p) for p in projects],
+            [p.internal_id for p in projects],
+            [p.likes_count for p in projects],
+            current_user_id,
+        )
+
+    @staticmethod
+    @read_only
     async def get_public_feed(
         db: AsyncSession, 
         current_user_id: Optional[int], 
@@ -18,80 +80,86 @@ class FeedService:
         query_text: Optional[str] = None,
         tag: Optional[str] = None,
         sort: str = "new",
+        after: Optional[str] = None,
     ) -> List[ProjectSchema]:
         """
-        Get public projects with like info.
+        Get public projects with like info. `after` (a project public id from a
+        cursor) continues the listing by keyset instead of `skip`.
+
+        The page itself (order and card data) is the same for every viewer, so it
+        is cached for FEED_CACHE_TTL_SECONDS, dropped early through FEED_TAG when a
+        public project changes. Like counts and is_liked are read per request, so
+        likes do not drop cached pages, except hot pages whose order they set.
         """
+        params = {"sort": sort, "tag": tag, "query": query_text, "after": after, "skip": skip, "limit": limit}
+        digest = hashlib.sha1(json.dumps(params, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+        async def build() -> dict:
+            projects = await FeedService._feed_page(db, skip, limit, query_text, tag, sort, after)
+            return {
+                "items": [
+                    ProjectSchema.model_validate(p).model_dump(mode="json", exclude={"likes_count", "is_liked"})
+                    for p in projects
+                ],
+                "ids": [p.internal_id for p in projects],
+            }
+
+        tags = [FEED_TAG, FEED_HOT_TAG] if sort == "hot" else [FEED_TAG]
+        page = await cache.get_or_build(
+            f"feed:{digest}", build, expire=settings.FEED_CACHE_TTL_SECONDS, tags=tags
+        )
+        items = [ProjectSchema.model_validate(item) for item in page["items"]]
+        return await FeedService._overlay(db, items, page["ids"], None, current_user_id)
+
+    @staticmethod
+    async def _feed_page(
+        db: AsyncSession,
+        skip: int,
+        limit: int,
+        query_text: Optional[str],
+        tag: Optional[str],
+        sort: str,
+        after: Optional[str],
+    ) -> Sequence[Project]:
         q = select(Project).where(Project.is_public == True)
 
+        relevance = None
         if isinstance(query_text, str) and query_text.strip():
-            text = query_text.strip()
-            conditions = [Project.name.ilike(f"%{text}%")]
-            if text.isdigit():
-                conditions.append(Project.internal_id == int(text))
-            if len(text) >= 8:
-                conditions.append(Project.public_id.ilike(f"%{text}%"))
-            q = q.where(or_(*conditions))
+            condition, relevance = SearchService.projects(db, query_text)
+            q = q.where(condition)
 
         if isinstance(tag, str) and tag.strip():
-            t = tag.strip()
-            dialect_name = ""
-            try:
-                bind = db.get_bind()
-                dialect_name = bind.dialect.name if bind is not None else ""
-            except Exception:
-                dialect_name = ""
+            tagged = select(ProjectTag.project_id).where(ProjectTag.tag == tag.strip())
+            q = q.where(Project.internal_id.in_(tagged))
 
-            if dialect_name == "postgresql":
-                q = q.where(Project.tags.cast(postgresql.JSONB).contains([t]))
-            else:
-                q = q.where(Project.tags.contains([t]))
-
-        if sort == "hot":
-            likes_subq = (
-                select(Like.project_id.label("project_id"), func.count(Like.id).label("likes_count"))
-                .group_by(Like.project_id)
-                .subquery()
-            )
-            q = (
-                q.outerjoin(likes_subq, likes_subq.c.project_id == Project.internal_id)
-                .order_by(desc(func.coalesce(likes_subq.c.likes_count, 0)), desc(Project.created_at))
-            )
+        anchor = [Project.public_id == after]
+        if sort == "trending":
+            # Materialized by TrendingService.refresh: an indexed walk over rank
+            q = q.join(ProjectTrending, ProjectTrending.project_id == Project.internal_id)
+            keys = [ProjectTrending.rank]
+            anchor = [ProjectTrending.project_id == Project.internal_id, *anchor]
+            q = q.order_by(ProjectTrending.rank)
+        elif sort == "relevance" and relevance is not None:
+            keys = [relevance, Project.internal_id]
+            q = q.order_by(*(desc(k) for k in keys))
+        elif sort == "hot":
+            keys = [Project.likes_count, Project.created_at, Project.internal_id]
+            q = q.order_by(*(desc(k) for k in keys))
         else:
-            q = q.order_by(desc(Project.created_at))
+            keys = [Project.created_at, Project.internal_id]
+            q = q.order_by(*(desc(k) for k in keys))
 
-        q = q.offset(skip).limit(limit)
+        if after:
+            q = q.where(keyset_after(keys, anchor, descending=sort != "trending"))
+        else:
+            q = q.offset(skip)
+        q = q.limit(limit)
         
         # Eager load owner for display
         q = q.options(selectinload(Project.owner), selectinload(Project.parent_project))
         
         result = await db.execute(q)
-        projects = result.scalars().all()
-        
-        # Enrich with like info
-        # This is N+1 query, but for feed (limit 20) it's acceptable for MVP.
-        # Optimization: Use group_by and join in the main query.
-        enriched_projects = []
-        for p in projects:
-            # Count likes
-            count_query = select(func.count(Like.id)).where(Like.project_id == p.internal_id)
-            likes_count = (await db.execute(count_query)).scalar() or 0
-            
-            # Check is_liked
-            is_liked = False
-            if current_user_id:
-                liked_query = select(Like).where(
-                    and_(Like.project_id == p.internal_id, Like.user_id == current_user_id)
-                )
-                is_liked = (await db.execute(liked_query)).scalar_one_or_none() is not None
-            
-            # Manually construct schema
-            p_schema = ProjectSchema.model_validate(p)
-            p_schema.likes_count = likes_count
-            p_schema.is_liked = is_liked
-            enriched_projects.append(p_schema)
-            
-        return enriched_projects
+        return result.scalars().all()
 
     @staticmethod
     async def get_public_project(
@@ -116,18 +184,7 @@ class FeedService:
         if not p:
             return None
 
-        count_query = select(func.count(Like.id)).where(Like.project_id == p.internal_id)
-        likes_count = (await db.execute(count_query)).scalar() or 0
-
-        is_liked = False
-        if current_user_id:
-            liked_query = select(Like).where(and_(Like.project_id == p.internal_id, Like.user_id == current_user_id))
-            is_liked = (await db.execute(liked_query)).scalar_one_or_none() is not None
-
-        p_schema = ProjectSchema.model_validate(p)
-        p_schema.likes_count = likes_count
-        p_schema.is_liked = is_liked
-        return p_schema
+        return (await FeedService._enrich(db, [p], current_user_id))[0]
 
     @staticmethod
     async def toggle_like(db: AsyncSession, project_id: int, user_id: int) -> bool:
@@ -142,20 +199,24 @@ class FeedService:
         if existing_like:
             await db.delete(existing_like)
             await db.commit()
+            await LikeCounterService.record(db, project_id, -1)
             return False
         else:
             new_like = Like(project_id=project_id, user_id=user_id)
             db.add(new_like)
             await db.commit()
+            await LikeCounterService.record(db, project_id, 1)
             return True
             
     @staticmethod
+    @read_only
     async def get_user_public_projects(
         db: AsyncSession,
         target_user_id: int,
         current_user_id: Optional[int],
         skip: int = 0,
-        limit: int = 20
+        limit: int = 20,
+        after: Optional[str] = None,
     ) -> List[ProjectSchema]:
         """
         Get public projects of a specific user.
@@ -165,27 +226,16 @@ class FeedService:
         query = select(Project).where(
             and_(Project.owner_internal_id == target_user_id, Project.is_public == True)
         )
-        query = query.order_by(desc(Project.created_at)).offset(skip).limit(limit)
+        keys = [Project.created_at, Project.internal_id]
+        query = query.order_by(*(desc(k) for k in keys))
+        if after:
+            query = query.where(keyset_after(keys, [Project.public_id == after]))
+        else:
+            query = query.offset(skip)
+        query = query.limit(limit)
         query = query.options(selectinload(Project.owner), selectinload(Project.parent_project))
         
         result = await db.execute(query)
         projects = result.scalars().all()
         
-        enriched_projects = []
-        for p in projects:
-            count_query = select(func.count(Like.id)).where(Like.project_id == p.internal_id)
-            likes_count = (await db.execute(count_query)).scalar() or 0
-            
-            is_liked = False
-            if current_user_id:
-                liked_query = select(Like).where(
-                    and_(Like.project_id == p.internal_id, Like.user_id == current_user_id)
-                )
-                is_liked = (await db.execute(liked_query)).scalar_one_or_none() is not None
-            
-            p_schema = ProjectSchema.model_validate(p)
-            p_schema.likes_count = likes_count
-            p_schema.is_liked = is_liked
-            enriched_projects.append(p_schema)
-            
-        return enriched_projects
+        return await FeedService._enrich(db, projects, current_user_id)
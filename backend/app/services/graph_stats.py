@@ -0,0 +1,111 @@
+from collections import defaultdict
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+
+
+class _PathStats:
+    __slots__ = ("commit_count", "total_score", "contributors")
+
+    def __init__(self, commit_count: int = 0, total_score: float = 0.0, contributors: Optional[Dict[int, Tuple[int, float, int]]] = None):
+        self.commit_count = commit_count
+        self.total_score = total_score
+        # author_id -> (commit count, score, depth of the author's newest commit on the path)
+        self.contributors = contributors or {}
+
+
+class BranchGraphStats:
+    """
+    Commit counts, contributor scores and project share for every branch in one pass.
+
+    Commits have a single parent, so a project's history is a forest and the
+    ancestry of a branch head is its path to the root. A depth-first walk keeps
+    running totals for the current path and snapshots them at each head, so
+    history shared by many (fork) branches is visited once:
+    O(commits + heads x contributors) instead of O(branches x commits).
+    """
+
+    def __init__(self) -> None:
+        self._parent: Dict[str, Optional[str]] = {}
+        self._author: Dict[str, Optional[int]] = {}
+        self._score: Dict[str, float] = {}
+        self._heads: Dict[Hashable, Optional[str]] = {}
+        self._stats: Dict[Hashable, _PathStats] = {}
+        self.total_score = 0.0
+
+    def add_commit(self, commit_id: str, parent_hash: Optional[str], author_id: Optional[int], score: float) -> None:
+        if commit_id in self._score:
+            self.total_score -= self._score[commit_id]
+        self._parent[commit_id] = parent_hash
+        self._author[commit_id] = author_id
+        self._score[commit_id] = score
+        self.total_score += score
+
+    def set_head(self, branch_key: Hashable, head_commit_id: Optional[str]) -> None:
+        self._heads[branch_key] = head_commit_id
+
+    def compute(self) -> "BranchGraphStats":
+        children: Dict[str, List[str]] = defaultdict(list)
+        roots: List[str] = []
+        for h, p in self._parent.items():
+            if p is not None and p in self._parent:
+                children[p].append(h)
+            else:
+                roots.append(h)
+
+        heads_at: Dict[str, List[Hashable]] = defaultdict(list)
+        self._stats = {}
+        for b, h in self._heads.items():
+            if h in self._parent:
+                heads_at[h].append(b)
+            else:
+                self._stats[b] = _PathStats()
+
+        depth = 0
+        running_score = 0.0
+        contributors: Dict[int, Tuple[int, float, int]] = {}
+        # (commit, exiting, previous running score, previous contributor entry)
+        stack: List[Tuple[str, bool, float, Optional[Tuple[int, float, int]]]] = [(r, False, 0.0, None) for r in reversed(roots)]
+        while stack:
+            h, exiting, prev_score, prev_entry = stack.pop()
+            author = self._author[h]
+            if exiting:
+                depth -= 1
+                running_score = prev_score
+                if author is not None:
+                    if prev_entry is None:
+                        contributors.pop(author, None)
+                    else:
+                        contributors[author] = prev_entry
+                continue
+
+            entry = contributors.get(author) if author is not None else None
+            stack.append((h, True, running_score, entry))
+            depth += 1
+            running_score += self._score[h]
+            if author is not None:
+                count, score, _ = entry or (0, 0.0, 0)
+                contributors[author] = (count + 1, score + self._score[h], depth)
+
+            for b in heads_at.get(h, ()):
+                self._stats[b] = _PathStats(depth, running_score, dict(contributors))
+            for child in children.get(h, ()):
+                stack.append((child, False, 0.0, None))
+        return self
+
+    def branch_summary(self, branch_key: Hashable, name_for: Callable[[int], Any]) -> Dict[str, Any]:
+        stats = self._stats.get(branch_key) or _PathStats()
+        branch_total_score = stats.total_score or 1
+        ordered = sorted(stats.contributors.items(), key=lambda kv: (-kv[1][1], -kv[1][2]))
+        contributors_list = [
+            {
+                "name": name_for(uid),
+                "count": count,
+                "score": score,
+                "percent": round((score / branch_total_score) * 100, 1),
+            }
+            for uid, (count, score, _) in ordered
+        ]
+        return {
+            "contributors": contributors_list,
+            "project_percent": round((stats.total_score / (self.total_score or 1)) * 100, 1),
+            "commit_count": stats.commit_count,
+        }
@@ -0,0 +1,184 @@
+import logging
+import uuid
+from typing import Dict, Iterable, List, Optional
+
+from sqlalchemy import bindparam, func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.cache import FEED_HOT_TAG, cache
+from app.models.like import Like
+from app.models.project import Project
+
+logger = logging.getLogger(__name__)
+
+# Core table: the batched UPDATEs run as executemany, outside the ORM's bulk-by-primary-key mode.
+projects = Project.__table__
+
+
+class LikeCounterService:
+    """
+    Write-behind maintenance of Project.likes_count.
+
+    A like toggle adds its +1/-1 to a Redis hash instead of updating the project
+    row, so bursts of likes on one project do not contend on a single row. A
+    periodic flush moves the hash aside and applies the summed deltas in one
+    batched UPDATE; readers add the not-yet-flushed deltas on top of the column.
+    Without Redis the delta is applied to the row directly. A reconciliation
+    job recounts likes and corrects any drift (e.g. a flush that crashed after
+    committing but before clearing its batch). Flush and reconcile hold the
+    same Redis lock, so neither runs concurrently with itself or the other.
+    """
+
+    PENDING_KEY = "likes:pending"
+    FLUSHING_KEY = "likes:flushing"
+    LOCK_KEY = "likes:lock"
+    LOCK_TTL_SECONDS = 60
+    _RELEASE_LOCK_SCRIPT = (
+        "if redis.call('get', KEYS[1]) == ARGV[1] then return redis.call('del', KEYS[1]) else return 0 end"
+    )
+    # Drops the applied batch and releases the lock in one step, only for the lock holder
+    _FINISH_FLUSH_SCRIPT = (
+        "if redis.call('get', KEYS[2]) == ARGV[1] then redis.call('del', KEYS[1]); "
+        "return redis.call('del', KEYS[2]) else return 0 end"
+    )
+
+    @staticmethod
+    async def record(db: AsyncSession, project_id: int, delta: int) -> None:
+        """Count a committed like (+1) or unlike (-1)."""
+        if cache.redis_available():
+            try:
+                await cache.redis.hincrby(LikeCounterService.PENDING_KEY, str(project_id), delta)
+                return
+            except Exception:
+                cache.report_redis_error()
+        await db.execute(
+            update(Project).where(Project.internal_id == project_id).values(likes_count=Project.likes_count + delta)
+        )
+        await db.commit()
+        # Counts are read per request; only the hot ordering depends on the stored value.
+        await cache.invalidate_tags(FEED_HOT_TAG)
+
+    @staticmethod
+    async def pending(project_ids: Iterable[int]) -> Dict[int, int]:
+        """Buffered deltas not yet written to likes_count (empty when Redis is unavailable)."""
+        ids = [str(pid) for pid in project_ids]
+        if not ids or not cache.redis_available():
+            return {}
+        try:
+            # One MULTI, so a flush renaming the hash in between cannot hide or double a delta
+            pipe = cache.redis.pipeline(transaction=True)
+            pipe.hmget(LikeCounterService.PENDING_KEY, ids)
+            pipe.hmget(LikeCounterService.FLUSHING_KEY, ids)
+            queued, flushing = await pipe.execute()
+        except Exception:
+            cache.report_redis_error()
+            return {}
+        out: Dict[int, int] = {}
+        for pid, a, b in zip(ids, queued, flushing):
+            delta = int(a or 0) + int(b or 0)
+            if delta:
+                out[int(pid)] = delta
+        return out
+
+    @staticmethod
+    async def flush(db: AsyncSession) -> int:
+        """Apply buffered deltas in one batch; returns the number of projects updated (0 if another run holds the lock)."""
+        redis = cache.redis
+        token = await LikeCounterService._acquire_lock()
+        if not token:
+            return 0
+        try:
+            # A batch left behind by a crashed flush is applied before taking a new one.
+            if not await redis.exists(LikeCounterService.FLUSHING_KEY):
+                try:
+                    await redis.rename(LikeCounterService.PENDING_KEY, LikeCounterService.FLUSHING_KEY)
+                except Exception as e:
+                    if "no such key" in str(e).lower():
+                        await LikeCounterService._release_lock(token)
+                        return 0
+                    raise
+            batch = await redis.hgetall(LikeCounterService.FLUSHING_KEY)
+            deltas = {int(pid): int(delta) for pid, delta in batch.items() if int(delta)}
+            if deltas:
+                await LikeCounterService._apply(db, deltas)
+                await db.commit()
+        except BaseException:
+            await LikeCounterService._release_lock(token)
+            raise
+        finished = await redis.eval(
+            LikeCounterService._FINISH_FLUSH_SCRIPT, 2, LikeCounterService.FLUSHING_KEY, LikeCounterService.LOCK_KEY, token
+        )
+        if not finished:
+            logger.warning("like flush outlived its lock; reconcile will correct any double count")
+        if deltas:
+            await cache.invalidate_tags(FEED_HOT_TAG)
+        return len(deltas)
+
+    @staticmethod
+    async def reconcile(db: AsyncSession) -> List[int]:
+        """Reset likes_count to the true like count where they disagree; returns the corrected project ids."""
+        # Without Redis there is nothing buffered and no flush to race with
+        token: Optional[str] = ""
+        if cache.redis_available():
+            try:
+                token = await LikeCounterService._acquire_lock()
+            except Exception:
+                cache.report_redis_error()
+        if token is None:
+            return []
+        try:
+            return await LikeCounterService._reconcile(db)
+        finally:
+            await LikeCounterService._release_lock(token)
+
+    @staticmethod
+    async def _reconcile(db: AsyncSession) -> List[int]:
+        actual = (
+            select(func.count(Like.id))
+            .where(Like.project_id == Project.internal_id)
+            .correlate(Project)
+            .scalar_subquery()
+        )
+        res = await db.execute(select(Project.internal_id, actual).where(Project.likes_count != actual))
+        drifted = {pid: count for pid, count in res.all()}
+        if not drifted:
+            return []
+        # Buffered deltas are already in the likes table and will still be flushed.
+        pending = await LikeCounterService.pending(drifted.keys())
+        targets = {pid: count - pending.get(pid, 0) for pid, count in drifted.items()}
+        await db.execute(
+            update(projects).where(projects.c.id == bindparam("pid")).values(likes_count=bindparam("count")),
+            [{"pid": pid, "count": count} for pid, count in targets.items()],
+        )
+        await db.commit()
+        await cache.invalidate_tags(FEED_HOT_TAG)
+        return sorted(targets)
+
+    @staticmethod
+    async def _apply(db: AsyncSession, deltas: Dict[int, int]) -> None:
+        await db.execute(
+            update(projects)
+            .where(projects.c.id == bindparam("pid"))
+            .values(likes_count=projects.c.likes_count + bindparam("delta")),
+            [{"pid": pid, "delta": delta} for pid, delta in deltas.items()],
+        )
+
+    @staticmethod
+    async def _acquire_lock() -> Optional[str]:
+        # A token, or None while another flush/reconcile holds the lock
+        token = uuid.uuid4().hex
+        ok = await cache.redis.set(LikeCounterService.LOCK_KEY, token, nx=True, ex=LikeCounterService.LOCK_TTL_SECONDS)
+        return token if ok else None
+
+    @staticmethod
+    async def _release_lock(token: Optional[str]) -> None:
+        if not token:
+            return
+        try:
+            await cache.redis.eval(LikeCounterService._RELEASE_LOCK_SCRIPT, 1, LikeCounterService.LOCK_KEY, token)
+        except Exception:
+            # The lock expires on its own
+            cache.report_redis_error()
+
+
+like_counter_service = LikeCounterService()
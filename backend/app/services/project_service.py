@@ -1,11 +1,14 @@
 from typing import List, Optional
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, delete, or_
-from sqlalchemy.orm import selectinload
+from sqlalchemy import select, delete, or_, union_all, update
+from sqlalchemy.orm import aliased, selectinload
 
+from app.core.cache import FEED_TAG, cache, project_tag
+from app.core.pagination import keyset_after
 from app.models.project import Project
 from app.models.branch import Branch
 from app.schemas.project import ProjectCreate, ProjectUpdate
+from app.services.tag_service import TagService, normalize_tags
 
 class ProjectService:
     @staticmethod
@@ -15,28 +18,33 @@ class ProjectService:
         return result.scalar_one_or_none()
 
     @staticmethod
-    async def get_involved_projects(db: AsyncSession, user_id: int, skip: int = 0, limit: int = 100) -> List[Project]:
+    async def get_involved_projects(
+        db: AsyncSession, user_id: int, skip: int = 0, limit: int = 100, after: Optional[str] = None
+    ) -> List[Project]:
         """
-        查询用户参与的项目：
+        查询用户参与的项目（按创建顺序）：
         1. 用户是项目的所有者
         2. 用户在项目中创建了分支 (Fork-as-Branch)
+        `after`（游标中的项目 public id）按 keyset 继续翻页，代替 skip。
         """
+        branch_projects = select(Branch.project_id).where(Branch.creator_internal_id == user_id)
         query = (
             select(Project)
-            .join(Branch, Branch.project_id == Project.internal_id) # 关联分支表
             .where(
                 or_(
                     Project.owner_internal_id == user_id,   # 条件1: 我是项目拥有者
-                    Branch.creator_internal_id == user_id   # 条件2: 我是某分支的创建者
+                    Project.internal_id.in_(branch_projects)   # 条件2: 我是某分支的创建者
                 )
             )
-            .group_by(Project.internal_id) # 去重，防止因为有多个分支导致项目重复出现
+            .order_by(Project.internal_id)
             .options(selectinload(Project.owner), selectinload(Project.parent_project))
-            .offset(skip)
-            .limit(limit)
         )
+        if after:
+            query = query.where(keyset_after([Project.internal_id], [Project.public_id == after], descending=False))
+        else:
+            query = query.offset(skip)
         
-        result = await db.execute(query)
+        result = await db.execute(query.limit(limit))
         return result.scalars().all()
 
     @staticmethod
@@ -54,12 +62,13 @@ class ProjectService:
         db_project = Project(
             name=project_in.name,
             description=project_in.description,
-            tags=project_in.tags,
+            tags=normalize_tags(project_in.tags) if project_in.tags is not None else None,
             owner_internal_id=owner_id,
             is_public=project_in.is_public,
         )
         db.add(db_project)
         await db.flush() # Get ID
+        await TagService.sync(db, db_project.internal_id, None, False, db_project.tags, bool(db_project.is_public))
 
         # 2. Create Default 'main' Branch
         main_branch = Branch(
@@ -71,6 +80,8 @@ class ProjectService:
         db.add(main_branch)
         
         await db.commit()
+        if project_in.is_public:
+            await cache.invalidate_tags(FEED_TAG)
         await db.refresh(db_project)
         await db.refresh(db_project, attribute_names=["owner", "parent_project"])
         return db_project
@@ -95,6 +106,7 @@ class ProjectService:
 
     @staticmethod
     async def update_project(db: AsyncSession, db_project: Project, project_in: ProjectUpdate) -> Project:
+        old_tags, old_public = list(db_project.tags or []), bool(db_project.is_public)
         if project_in.name is not None:
             db_project.name = project_in.name
         if project_in.description is not None:
@@ -102,21 +114,107 @@ class ProjectService:
         if project_in.workspace_data is not None:
             db_project.workspace_data = project_in.workspace_data
         if project_in.tags is not None:
-            db_project.tags = project_in.tags
+            db_project.tags = normalize_tags(project_in.tags)
         if project_in.is_public is not None:
             db_project.is_public = project_in.is_public
+        await TagService.sync(
+            db, db_project.internal_id, old_tags, old_public, db_project.tags, bool(db_project.is_public)
+        )
         
+        new_public = bool(db_project.is_public)
         db.add(db_project)
         await db.commit()
+        if old_public or new_public:
+            await cache.invalidate_tags(FEED_TAG)
         await db.refresh(db_project)
         return db_project
 
     @staticmethod
     async def delete_project(db: AsyncSession, db_project: Project) -> Project:
+        await ProjectService._hand_over_shared_commits(db, db_project.internal_id)
+        # Reload on delete so the cascade only sees the commits this project still owns
+        db.expire(db_project, ["commits"])
+        was_public = bool(db_project.is_public)
+        await TagService.sync(db, db_project.internal_id, db_project.tags, was_public, None, False)
         await db.delete(db_project)
         await db.commit()
+        await cache.invalidate_tags(project_tag(db_project.internal_id))
+        if was_public:
+            await cache.invalidate_tags(FEED_TAG)
         return db_project
         
+    @staticmethod
+    async def _hand_over_shared_commits(db: AsyncSession, project_id: int) -> None:
+        # Other projects (forks, and forks of forks) reference this project's commits
+        # through branch heads, commit parents and fork points. Each referenced chain is
+        # handed to a referencing project before the rest is deleted with this one; a
+        # chain shared by several forks goes to the first, and deleting that fork later
+        # hands it on the same way.
+        from app.models.commit import Commit
+        from app.services.ancestry_service import AncestryService
+
+        owned = select(Commit.id).where(Commit.project_id == project_id)
+        child = aliased(Commit)
+        refs = union_all(
+            select(Branch.project_id.label("project_id"), Branch.head_commit_id.label("commit_id")).where(
+                Branch.project_id != project_id, Branch.head_commit_id.in_(owned)
+            ),
+            select(child.project_id, child.parent_hash).where(
+                child.project_id != project_id, child.parent_hash.in_(owned)
+            ),
+            select(Project.internal_id, Project.fork_commit_id).where(
+                Project.internal_id != project_id, Project.fork_commit_id.in_(owned)
+            ),
+        ).subquery()
+        res = await db.execute(select(refs.c.project_id, refs.c.commit_id).distinct().order_by(refs.c.project_id, refs.c.commit_id))
+        for ref_project_id, commit_id in res.all():
+            chain = AncestryService.chain_cte(commit_id)
+            await db.execute(
+                update(Commit)
+                .where(Commit.project_id == project_id, Commit.id.in_(select(chain.c.id)))
+                .values(project_id=ref_project_id)
+                .execution_options(synchronize_session=False)
+            )
+
+    @staticmethod
+    async def get_fork_lineage(db: AsyncSession, project: Project, viewer_id: Optional[int] = None) -> dict:
+        """
+        Where a fork came from and what was forked from it: the chain of parent projects
+        (nearest first) with the commit each fork was made at, and the direct forks.
+        Only public projects and the viewer's own are listed.
+        """
+        def visible(p: Project) -> bool:
+            return bool(p.is_public) or (viewer_id is not None and p.owner_internal_id == viewer_id)
+
+        ancestors = []
+        current = project
+        seen = {project.internal_id}
+        while current.parent_project_internal_id and current.parent_project_internal_id not in seen:
+            parent = await db.get(Project, current.parent_project_internal_id)
+            if not parent:
+                break
+            seen.add(parent.internal_id)
+            shown = visible(parent)
+            ancestors.append(
+                {
+                    "id": parent.public_id if shown else None,
+                    "name": parent.name if shown else None,
+                    "forked_at": current.fork_commit_id,
+                }
+            )
+            current = parent
+
+        res = await db.execute(
+            select(Project).where(Project.parent_project_internal_id == project.internal_id).order_by(Project.created_at.asc())
+        )
+        forks = [{"id": p.public_id, "name": p.name, "forked_at": p.fork_commit_id} for p in res.scalars().all() if visible(p)]
+        return {
+            "id": project.public_id,
+            "fork_commit_id": project.fork_commit_id,
+            "ancestors": ancestors,
+            "forks": forks,
+        }
+
     @staticmethod
     async def get_project_branches(db: AsyncSession, project_id: int) -> List[Branch]:
         query = select(Branch).where(Branch.project_id == project_id)
@@ -125,31 +223,38 @@ class ProjectService:
 
     @staticmethod
     async def fork_project(db: AsyncSession, source_project_id: int, user_id: int, commit_hash: Optional[str] = None) -> Project:
+        """
+        Copy-on-write fork: the new project's main branch points at a commit of the source
+        and shares all history up to it. Nothing is copied, so the cost does not depend on
+        history or snapshot size; commits made in the fork belong to the fork.
+        """
+        from app.models.commit import Commit
+        from app.services.ancestry_service import AncestryService
+
         # 1. Get Source Project
         source_project = await ProjectService.get_project(db, source_project_id)
         if not source_project:
             raise ValueError("Source project not found")
 
         # 2. Determine Target Commit (State to fork from)
-        from app.models.commit import Commit
-        from app.models.branch import Branch
-        
-        target_commit = None
+        target_commit_id = None
         if commit_hash:
-            target_commit = await db.get(Commit, commit_hash)
+            res = await db.execute(select(Commit.id, Commit.project_id).where(Commit.id == commit_hash))
+            row = res.first()
+            inherited = (
+                row is not None
+                and row.project_id != source_project_id
+                and source_project.fork_commit_id is not None
+                and await AncestryService.is_ancestor(db, commit_hash, source_project.fork_commit_id)
+            )
+            if row is None or (row.project_id != source_project_id and not inherited):
+                raise ValueError("Commit not found in source project")
+            target_commit_id = row.id
         else:
             # Get HEAD of main branch
-            query = select(Branch).where(Branch.project_id == source_project_id, Branch.name == "main")
+            query = select(Branch.head_commit_id).where(Branch.project_id == source_project_id, Branch.name == "main")
             result = await db.execute(query)
-            main_branch = result.scalar_one_or_none()
-            if main_branch and main_branch.head_commit_id:
-                target_commit = await db.get(Commit, main_branch.head_commit_id)
-        
-        if not target_commit:
-             # If source project has no commits, just fork empty project
-             video_assets = {}
-        else:
-             video_assets = target_commit.video_assets
+            target_commit_id = result.scalar_one_or_none()
 
         # 3. Create New Project
         fork_name = f"Fork of {source_project.name}"
@@ -158,37 +263,21 @@ class ProjectService:
             description=f"Forked from project {source_project.id}",
             owner_internal_id=user_id,
             parent_project_internal_id=source_project.internal_id,
+            fork_commit_id=target_commit_id,
             tags=source_project.tags,
             is_public=False,
         )
         db.add(new_project)
         await db.flush()
+        await TagService.sync(db, new_project.internal_id, None, False, new_project.tags, False)
 
-        # 4. Create Default Branch (main)
-        # Note: We rely on CommitService to update branch HEAD if we use it, 
-        # but here we might want to manually set it up to avoid circular dependency or complex logic
-        # Let's create branch first.
+        # 4. Create Default Branch (main) pointing at the shared commit
         new_branch = Branch(
             name="main",
             project_id=new_project.internal_id,
-            head_commit_id=None
+            head_commit_id=target_commit_id,
         )
         db.add(new_branch)
-        await db.flush()
 
-        # 5. Create Initial Commit with state from source
-        if target_commit:
-            from app.services.commit_service import CommitService
-            # We use CommitService to create the commit properly
-            await CommitService.create_commit(
-                db=db,
-                project_id=new_project.internal_id,
-                author_id=user_id,
-                message=f"Fork from {source_project.name} at {target_commit.id[:7]}",
-                video_assets=video_assets,
-                branch_name="main",
-                parent_hash=None # Start fresh history
-            )
-        
         await db.commit()
         return await ProjectService.get_project(db, new_project.internal_id)
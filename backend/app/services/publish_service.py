@@ -1,5 +1,5 @@
 import json
-from typing import Any, Optional
+from typing import Any, Dict, Iterable, Optional
 
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
@@ -11,6 +11,7 @@ from app.models.publish import PublishAccount, PublishJob
 from app.models.project import Project
 from app.models.branch import Branch
 from app.models.commit import Commit
+from app.services.snapshot_service import SnapshotService
 
 
 class PublishService:
@@ -146,6 +147,22 @@ class PublishService:
         row = res.first()
         return str(row[0]) if row else None
 
+    @staticmethod
+    async def resolve_branch_names(db: AsyncSession, branch_ids: Iterable[int | None]) -> Dict[int, str]:
+        ids = {int(b) for b in branch_ids if b}
+        if not ids:
+            return {}
+        res = await db.execute(select(Branch.internal_id, Branch.name).where(Branch.internal_id.in_(ids)))
+        return {int(bid): str(name) for bid, name in res.all()}
+
+    @staticmethod
+    async def resolve_project_public_ids(db: AsyncSession, project_internal_ids: Iterable[int | None]) -> Dict[int, str]:
+        ids = {int(p) for p in project_internal_ids if p}
+        if not ids:
+            return {}
+        res = await db.execute(select(Project.internal_id, Project.public_id).where(Project.internal_id.in_(ids)))
+        return {int(pid): str(public_id) for pid, public_id in res.all()}
+
     @staticmethod
     async def resolve_project_public_id(db: AsyncSession, project_internal_id: int | None) -> Optional[str]:
         if not project_internal_id:
@@ -154,30 +171,6 @@ class PublishService:
         row = res.first()
         return str(row[0]) if row else None
 
-    @staticmethod
-    def _find_video_url(value: Any) -> Optional[str]:
-        if isinstance(value, str):
-            s = value.strip()
-            if s.startswith("http://") or s.startswith("https://") or s.startswith("file://"):
-                if ".mp4" in s.lower() or ".mov" in s.lower() or ".m4v" in s.lower():
-                    return s
-            return None
-        if isinstance(value, dict):
-            for k, v in value.items():
-                if k in {"video_url", "url", "video"} and isinstance(v, str):
-                    hit = PublishService._find_video_url(v)
-                    if hit:
-                        return hit
-                hit = PublishService._find_video_url(v)
-                if hit:
-                    return hit
-        if isinstance(value, list):
-            for item in value:
-                hit = PublishService._find_video_url(item)
-                if hit:
-                    return hit
-        return None
-
     @staticmethod
     def collect_video_urls(value: Any) -> list[str]:
         urls: list[str] = []
@@ -212,6 +205,13 @@ class PublishService:
             uniq.append(u)
         return uniq
 
+    @staticmethod
+    async def commit_video_urls(db: AsyncSession, commit: Commit) -> list[str]:
+        """Video URLs of a commit in timeline order, from the manifest stored at commit time when present."""
+        if commit.video_urls is not None:
+            return list(commit.video_urls)
+        return PublishService.collect_video_urls(await SnapshotService.load(db, commit))
+
     @staticmethod
     async def resolve_publish_video_source(db: AsyncSession, project_internal_id: int, branch_name: str) -> str:
         res = await db.execute(select(Branch).where(Branch.project_id == project_internal_id, Branch.name == branch_name))
@@ -227,7 +227,7 @@ class PublishService:
         if isinstance(commit.video_url, str) and commit.video_url.strip():
             return commit.video_url.strip()
 
-        urls = PublishService.collect_video_urls(commit.video_assets)
+        urls = await PublishService.commit_video_urls(db, commit)
         if len(urls) == 1:
             return urls[0]
         if len(urls) > 1:
@@ -250,9 +250,9 @@ class PublishService:
         if isinstance(commit.video_url, str) and commit.video_url.strip():
             return commit.video_url.strip()
 
-        hit = PublishService._find_video_url(commit.video_assets)
-        if hit:
-            return hit
+        urls = await PublishService.commit_video_urls(db, commit)
+        if urls:
+            return urls[0]
 
         raise HTTPException(status_code=400, detail="No exportable video URL found in HEAD commit")
 
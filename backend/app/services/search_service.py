@@ -0,0 +1,119 @@
+import re
+from typing import Any, List, Tuple
+
+from sqlalchemy import Text, and_, case, cast, func, literal, literal_column, or_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.project import Project
+from app.models.user import User
+
+# Identifiers shorter than this are too ambiguous to match by substring.
+MIN_ID_FRAGMENT = 8
+
+
+def _dialect(db: AsyncSession) -> str:
+    try:
+        bind = db.get_bind()
+        return bind.dialect.name if bind is not None else ""
+    except Exception:
+        return ""
+
+
+def _terms(text: str) -> List[str]:
+    return re.findall(r"\w+", text.lower())
+
+
+def _escape_like(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def _contains(column: Any, text: str) -> Any:
+    return column.ilike(f"%{_escape_like(text)}%", escape="\\")
+
+
+def project_search_vector() -> Any:
+    """
+    Weighted document of a project (name > description > tags). The migration
+    indexes this exact expression with GIN; it is built from literal SQL only
+    (no bind parameters) so the planner can match it against the index.
+    """
+    simple = literal_column("'simple'::regconfig")
+    empty = literal_column("''")
+
+    def part(column: Any, weight: str) -> Any:
+        return func.setweight(func.to_tsvector(simple, func.coalesce(column, empty)), literal_column(f"'{weight}'"))
+
+    return part(Project.name, "A").op("||")(part(Project.description, "B")).op("||")(part(cast(Project.tags, Text), "C"))
+
+
+class SearchService:
+    """
+    Search predicates plus a relevance expression for projects and users.
+
+    On PostgreSQL projects match a prefix tsquery against a GIN-indexed weighted
+    tsvector of name/description/tags (ranked by ts_rank_cd), and users match by
+    pg_trgm similarity with trigram GIN indexes behind every ILIKE, so neither
+    needs a table scan. Other databases (SQLite in tests) fall back to per-term
+    ILIKE with a field-weighted score. Callers order by the relevance expression
+    (it is computed from the row, so it can also key cursor pagination).
+    """
+
+    @staticmethod
+    def projects(db: AsyncSession, text: str) -> Tuple[Any, Any]:
+        """(WHERE clause, relevance expression) for a project search."""
+        text = text.strip()
+        terms = _terms(text)
+        exact = []
+        if text.isdigit():
+            exact.append(Project.internal_id == int(text))
+        if len(text) >= MIN_ID_FRAGMENT:
+            exact.append(_contains(Project.public_id, text))
+
+        if _dialect(db) == "postgresql":
+            vector = project_search_vector()
+            matches = list(exact)
+            rank: Any = literal(0.0)
+            if terms:
+                query = func.to_tsquery(literal_column("'simple'::regconfig"), " & ".join(f"{t}:*" for t in terms))
+                matches.append(vector.op("@@")(query))
+                rank = func.ts_rank_cd(vector, query)
+            matches.append(_contains(Project.name, text))
+            return or_(*matches), rank + func.similarity(Project.name, text)
+
+        tags = cast(Project.tags, Text)
+        per_term = [or_(_contains(Project.name, t), _contains(Project.description, t), _contains(tags, t)) for t in terms]
+        matches = exact + [and_(*per_term)] if per_term else exact + [_contains(Project.name, text)]
+        rank = literal(0)
+        for t in terms:
+            rank = rank + case((_contains(Project.name, t), 2), else_=0) + case((_contains(Project.description, t), 1), else_=0)
+        rank = rank + case((Project.name.ilike(_escape_like(text), escape="\\"), 4), else_=0)
+        return or_(*matches), rank
+
+    @staticmethod
+    def users(db: AsyncSession, text: str) -> Tuple[Any, Any]:
+        """(WHERE clause, relevance expression) for a user lookup by email, name or id."""
+        text = text.strip()
+        matches = [_contains(User.email, text), _contains(User.full_name, text)]
+        if text.isdigit():
+            matches.append(User.internal_id == int(text))
+        if len(text) >= MIN_ID_FRAGMENT:
+            matches.append(_contains(User.public_id, text))
+
+        if _dialect(db) == "postgresql":
+            # Fuzzy: tolerate typos in names through the trigram similarity operator
+            matches.append(User.full_name.op("%")(text))
+            rank = func.greatest(
+                func.similarity(func.coalesce(User.full_name, ""), text), func.similarity(User.email, text)
+            )
+            return or_(*matches), rank
+
+        prefix = _escape_like(text) + "%"
+        rank = (
+            case((User.email.ilike(prefix, escape="\\"), 2), else_=0)
+            + case((User.full_name.ilike(prefix, escape="\\"), 2), else_=0)
+            + case((_contains(User.full_name, text), 1), else_=0)
+        )
+        return or_(*matches), rank
+
+
+search_service = SearchService()
@@ -0,0 +1,232 @@
+import hashlib
+import json
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.cache import LocalLRUCache
+from app.core.config import settings
+from app.models.commit import Commit
+from app.models.snapshot import SnapshotObject
+
+# Containers whose encoded form is smaller than this are stored inline in their parent.
+INLINE_MAX_BYTES = 128
+# Lists longer than this are split into fixed-size chunks so one changed item rewrites one chunk.
+LIST_CHUNK = 32
+_REF_BYTES = 48
+
+# hash -> (kind, data, entries)
+Objects = Dict[str, Tuple[str, Any, int]]
+
+
+def _dumps(value: Any) -> str:
+    return json.dumps(value, separators=(",", ":"), ensure_ascii=False)
+
+
+class _Splitter:
+    def __init__(self) -> None:
+        self.objects: Objects = {}
+
+    def _store(self, kind: str, data: Any, entries: int) -> str:
+        digest = hashlib.sha1(_dumps([kind, data]).encode("utf-8")).hexdigest()
+        self.objects.setdefault(digest, (kind, data, entries))
+        return digest
+
+    def _encode_items(self, items: Iterable[Any]) -> Tuple[List[list], int, bool]:
+        encoded: List[list] = []
+        size = 2
+        has_refs = False
+        for item in items:
+            ref, inline, item_size = self.encode(item)
+            if ref is None:
+                encoded.append([0, inline])
+                size += item_size + 5
+            else:
+                encoded.append([1, ref])
+                size += _REF_BYTES
+                has_refs = True
+        return encoded, size, has_refs
+
+    def encode(self, value: Any, root: bool = False) -> Tuple[Optional[str], Any, int]:
+        """(object hash, None, 0) when value became an object, else (None, value, encoded size)."""
+        if isinstance(value, dict):
+            keys = list(value.keys())
+            encoded, size, has_refs = self._encode_items(value[k] for k in keys)
+            size += sum(len(str(k)) + 4 for k in keys)
+            if not root and not has_refs and size < INLINE_MAX_BYTES:
+                return None, value, size
+            data = [[k, *e] for k, e in zip(keys, encoded)]
+            return self._store("dict", data, len(keys)), None, 0
+        if isinstance(value, list):
+            if len(value) > LIST_CHUNK:
+                chunks = [
+                    self._store("list", self._encode_items(value[i : i + LIST_CHUNK])[0], len(value[i : i + LIST_CHUNK]))
+                    for i in range(0, len(value), LIST_CHUNK)
+                ]
+                return self._store("chunks", chunks, len(value)), None, 0
+            encoded, size, has_refs = self._encode_items(value)
+            if not root and not has_refs and size < INLINE_MAX_BYTES:
+                return None, value, size
+            return self._store("list", encoded, len(value)), None, 0
+        if root:
+            return self._store("value", value, 0), None, 0
+        return None, value, len(_dumps(value))
+
+
+def split_snapshot(value: Any) -> Tuple[str, Objects]:
+    """Split a snapshot into content-addressed objects; returns (root hash, objects)."""
+    splitter = _Splitter()
+    root, _, _ = splitter.encode(value, root=True)
+    return root, splitter.objects
+
+
+def build_snapshot(root: str, objects: Dict[str, Tuple[str, Any]]) -> Any:
+    """Inverse of split_snapshot given every object reachable from root."""
+    kind, data = objects[root][0], objects[root][1]
+    if kind == "value":
+        return data
+    if kind == "chunks":
+        out: List[Any] = []
+        for chunk in data:
+            out.extend(build_snapshot(chunk, objects))
+        return out
+
+    def item(flag: int, payload: Any) -> Any:
+        return build_snapshot(payload, objects) if flag else payload
+
+    if kind == "dict":
+        return {k: item(flag, payload) for k, flag, payload in data}
+    return [item(flag, payload) for flag, payload in data]
+
+
+def _child_refs(kind: str, data: Any) -> List[str]:
+    if kind == "chunks":
+        return list(data)
+    if kind == "dict":
+        return [payload for _k, flag, payload in data if flag]
+    if kind == "list":
+        return [payload for flag, payload in data if flag]
+    return []
+
+
+class SnapshotService:
+    """
+    Git-like object store for commit snapshots (Commit.video_assets).
+
+    A snapshot is split into dict/list nodes keyed by the hash of their content;
+    small containers stay inline in their parent and long lists are chunked. A
+    commit that changes one clip writes only the changed clip, the chunk and the
+    nodes above it; every other node is shared with the parent commit (and with
+    forks/imports of the same state). Objects are immutable, so objects and
+    rebuilt snapshots read from the database are cached in-process by hash for
+    SNAPSHOT_CACHE_TTL_SECONDS. Writes do not fill the cache: the caller's
+    transaction may still roll back.
+    """
+
+    FETCH_BATCH = 500
+    _cache = LocalLRUCache(
+        max_entries=settings.SNAPSHOT_CACHE_MAX_ENTRIES,
+        max_bytes=settings.SNAPSHOT_CACHE_MAX_BYTES,
+        ttl=settings.SNAPSHOT_CACHE_TTL_SECONDS,
+    )
+
+    @staticmethod
+    async def put(db: AsyncSession, value: Any) -> str:
+        """Store a snapshot and return its root hash. Only objects not yet stored are written."""
+        return (await SnapshotService.put_many(db, [value]))[0]
+
+    @staticmethod
+    async def put_many(db: AsyncSession, values: List[Any]) -> List[str]:
+        """Store several snapshots with one existence check and one insert; returns their root hashes."""
+        roots: List[str] = []
+        objects: Objects = {}
+        for value in values:
+            root, value_objects = split_snapshot(value)
+            roots.append(root)
+            objects.update(value_objects)
+        hashes = list(objects.keys())
+        existing = set()
+        for i in range(0, len(hashes), SnapshotService.FETCH_BATCH):
+            batch = hashes[i : i + SnapshotService.FETCH_BATCH]
+            res = await db.execute(select(SnapshotObject.hash).where(SnapshotObject.hash.in_(batch)))
+            existing.update(row[0] for row in res.all())
+
+        rows = [
+            {"hash": h, "kind": kind, "data": data, "entries": entries}
+            for h, (kind, data, entries) in objects.items()
+            if h not in existing
+        ]
+        if rows:
+            await db.execute(SnapshotService._insert_ignore(db), rows)
+        return roots
+
+    @staticmethod
+    def _insert_ignore(db: AsyncSession):
+        # Concurrent writers may store the same object; identical content makes the conflict harmless.
+        dialect = db.get_bind().dialect.name
+        if dialect == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+            return pg_insert(SnapshotObject).on_conflict_do_nothing(index_elements=["hash"])
+        if dialect == "sqlite":
+            from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+            return sqlite_insert(SnapshotObject).on_conflict_do_nothing(index_elements=["hash"])
+        return insert(SnapshotObject)
+
+    @staticmethod
+    async def _fetch(db: AsyncSession, hashes: Iterable[str]) -> Dict[str, Tuple[str, Any]]:
+        found: Dict[str, Tuple[str, Any]] = {}
+        missing: List[str] = []
+        for h in hashes:
+            cached = SnapshotService._cache.get(f"obj:{h}")
+            if cached is None:
+                missing.append(h)
+            else:
+                kind, data = json.loads(cached)
+                found[h] = (kind, data)
+        for i in range(0, len(missing), SnapshotService.FETCH_BATCH):
+            batch = missing[i : i + SnapshotService.FETCH_BATCH]
+            res = await db.execute(
+                select(SnapshotObject.hash, SnapshotObject.kind, SnapshotObject.data).where(SnapshotObject.hash.in_(batch))
+            )
+            for h, kind, data in res.all():
+                found[h] = (kind, data)
+                SnapshotService._cache.set(f"obj:{h}", _dumps([kind, data]))
+        return found
+
+    @staticmethod
+    async def get(db: AsyncSession, root: str) -> Any:
+        """Rebuild the snapshot stored under root, one query per tree level on a cold cache."""
+        cached = SnapshotService._cache.get(f"snap:{root}")
+        if cached is not None:
+            return json.loads(cached)
+
+        objects: Dict[str, Tuple[str, Any]] = {}
+        frontier = [root]
+        while frontier:
+            fetched = await SnapshotService._fetch(db, frontier)
+            missing = set(frontier) - set(fetched)
+            if missing:
+                raise LookupError(f"Snapshot objects missing: {sorted(missing)[:3]}")
+            objects.update(fetched)
+            frontier = list(
+                {ref for kind, data in fetched.values() for ref in _child_refs(kind, data) if ref not in objects}
+            )
+
+        value = build_snapshot(root, objects)
+        SnapshotService._cache.set(f"snap:{root}", _dumps(value))
+        return value
+
+    @staticmethod
+    async def load(db: AsyncSession, commit: Commit) -> Any:
+        """The snapshot (video_assets document) of a commit."""
+        if commit.tree_hash:
+            return await SnapshotService.get(db, commit.tree_hash)
+        # Legacy inline snapshot; the column is deferred so fetch it explicitly.
+        res = await db.execute(select(Commit.video_assets).where(Commit.id == commit.id))
+        return res.scalar()
+
+
+snapshot_service = SnapshotService()
@@ -1,5 +1,6 @@
 import boto3
 from botocore.client import Config
+from app.core import tracing
 from app.core.config import settings
 
 class StorageService:
@@ -34,11 +35,12 @@ class StorageService:
 
     def upload_file(self, file_content, object_name: str) -> bool:
         try:
-            self.s3_client.put_object(
-                Bucket=self.bucket_name,
-                Key=object_name,
-                Body=file_content
-            )
+            with tracing.span("s3.put_object", tracing.CLIENT, bucket=self.bucket_name, key=object_name):
+                self.s3_client.put_object(
+                    Bucket=self.bucket_name,
+                    Key=object_name,
+                    Body=file_content
+                )
         except Exception as e:
             print(e)
             return False
@@ -46,7 +48,8 @@ class StorageService:
 
     def upload_file_path(self, file_path: str, object_name: str) -> bool:
         try:
-            self.s3_client.upload_file(file_path, self.bucket_name, object_name)
+            with tracing.span("s3.upload_file", tracing.CLIENT, bucket=self.bucket_name, key=object_name):
+                self.s3_client.upload_file(file_path, self.bucket_name, object_name)
         except Exception as e:
             print(e)
             return False
@@ -0,0 +1,78 @@
+from typing import Iterable, List, Optional
+
+from sqlalchemy import delete, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.db import read_only
+from app.models.tag import ProjectTag, TagCount
+
+
+def normalize_tags(tags: Optional[Iterable[str]]) -> List[str]:
+    """Stripped, non-empty, de-duplicated tags in their original order."""
+    out: List[str] = []
+    for t in tags or []:
+        if isinstance(t, str) and t.strip() and t.strip() not in out:
+            out.append(t.strip())
+    return out
+
+
+class TagService:
+    """
+    Keeps project_tags (one row per project/tag) and tag_counts (public projects
+    per tag) in step with Project.tags, so tag filters are index lookups and tag
+    clouds read precomputed counts. Call sync in the same transaction as the
+    project write.
+    """
+
+    @staticmethod
+    async def sync(
+        db: AsyncSession,
+        project_id: int,
+        old_tags: Optional[Iterable[str]],
+        old_public: bool,
+        new_tags: Optional[Iterable[str]],
+        new_public: bool,
+    ) -> None:
+        old, new = normalize_tags(old_tags), normalize_tags(new_tags)
+        removed = [t for t in old if t not in new]
+        added = [t for t in new if t not in old]
+        if removed:
+            await db.execute(delete(ProjectTag).where(ProjectTag.project_id == project_id, ProjectTag.tag.in_(removed)))
+        if added:
+            await db.execute(insert(ProjectTag), [{"project_id": project_id, "tag": t} for t in added])
+
+        deltas = {}
+        for t in set(old) | set(new):
+            delta = int(bool(new_public) and t in new) - int(bool(old_public) and t in old)
+            if delta:
+                deltas[t] = delta
+        if deltas:
+            await TagService._bump(db, deltas)
+
+    @staticmethod
+    async def _bump(db: AsyncSession, deltas: dict) -> None:
+        dialect = db.get_bind().dialect.name
+        if dialect == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert as upsert
+        else:
+            from sqlalchemy.dialects.sqlite import insert as upsert
+        stmt = upsert(TagCount)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["tag"], set_={"project_count": TagCount.project_count + stmt.excluded.project_count}
+        )
+        await db.execute(stmt, [{"tag": t, "project_count": d} for t, d in sorted(deltas.items())])
+
+    @staticmethod
+    @read_only
+    async def trending(db: AsyncSession, limit: int = 50) -> List[dict]:
+        """Most used tags across public projects."""
+        res = await db.execute(
+            select(TagCount.tag, TagCount.project_count)
+            .where(TagCount.project_count > 0)
+            .order_by(TagCount.project_count.desc(), TagCount.tag)
+            .limit(limit)
+        )
+        return [{"tag": tag, "count": count} for tag, count in res.all()]
+
+
+tag_service = TagService()
@@ -0,0 +1,98 @@
+import math
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Optional
+
+from sqlalchemy import Integer, cast, delete, func, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.cache import FEED_TAG, cache
+from app.core.config import settings
+from app.core.db import read_only
+from app.models.commit import Commit
+from app.models.like import Like
+from app.models.project import Project
+from app.models.trending import ProjectTrending
+
+
+class TrendingService:
+    """
+    Time-decayed trending ranking. Every like, fork and commit in the window
+    contributes its weight halved every TRENDING_HALF_LIFE_HOURS, so a burst of
+    recent activity outranks a larger but older total. The scores are
+    materialized into project_trending, which feeds page through by rank.
+
+    A refresh replaces the whole ranking: a trending cursor whose anchor project
+    dropped out of it yields an empty page, and the client starts over from the
+    first page.
+    """
+
+    LIKE_WEIGHT = 1.0
+    FORK_WEIGHT = 3.0
+    COMMIT_WEIGHT = 0.5
+    BATCH = 1000
+
+    @staticmethod
+    def _hour_bucket(db: AsyncSession, column):
+        # Whole hours since the epoch, so events can be counted per hour in SQL
+        if db.get_bind().dialect.name == "postgresql":
+            return cast(func.floor(func.extract("epoch", column) / 3600), Integer)
+        return cast(func.strftime("%s", column), Integer) / 3600
+
+    @staticmethod
+    @read_only
+    async def compute_scores(db: AsyncSession, now: Optional[datetime] = None) -> Dict[int, float]:
+        """
+        Trending score of every public project with activity in the window. Events
+        are counted per project and hour in SQL and each hour is decayed once (from
+        its midpoint), so a refresh reads at most projects x hours rows.
+        """
+        now = now or datetime.now(timezone.utc)
+        since = now - timedelta(days=settings.TRENDING_WINDOW_DAYS)
+        now_hours = now.timestamp() / 3600.0
+        scores: Dict[int, float] = defaultdict(float)
+
+        fork = Project.__table__.alias("fork")
+        events = [
+            (TrendingService.LIKE_WEIGHT, Like.project_id, Like.created_at, [Like.created_at >= since]),
+            (
+                TrendingService.FORK_WEIGHT,
+                fork.c.parent_project_id,
+                fork.c.created_at,
+                [fork.c.parent_project_id.isnot(None), fork.c.created_at >= since],
+            ),
+            (TrendingService.COMMIT_WEIGHT, Commit.project_id, Commit.created_at, [Commit.created_at >= since]),
+        ]
+        for weight, project_id, created_at, where in events:
+            bucket = TrendingService._hour_bucket(db, created_at).label("bucket")
+            query = (
+                select(project_id, bucket, func.count())
+                .join(Project, Project.internal_id == project_id)
+                .where(*where, Project.is_public == True)
+                .group_by(project_id, bucket)
+            )
+            res = await db.execute(query)
+            for pid, hour, count in res.all():
+                age_hours = max(now_hours - (int(hour) + 0.5), 0.0)
+                scores[pid] += weight * count * math.pow(0.5, age_hours / settings.TRENDING_HALF_LIFE_HOURS)
+        return {pid: score for pid, score in scores.items() if score > 0}
+
+    @staticmethod
+    async def refresh(db: AsyncSession, now: Optional[datetime] = None) -> int:
+        """Recompute and replace the materialized ranking in one transaction; returns the number of ranked projects."""
+        now = now or datetime.now(timezone.utc)
+        scores = await TrendingService.compute_scores(db, now)
+        ranked = sorted(scores.items(), key=lambda item: (-item[1], -item[0]))
+        rows = [
+            {"project_id": pid, "rank": rank, "score": score, "computed_at": now}
+            for rank, (pid, score) in enumerate(ranked, start=1)
+        ]
+        await db.execute(delete(ProjectTrending))
+        for i in range(0, len(rows), TrendingService.BATCH):
+            await db.execute(insert(ProjectTrending), rows[i : i + TrendingService.BATCH])
+        await db.commit()
+        await cache.invalidate_tags(FEED_TAG)
+        return len(rows)
+
+
+trending_service = TrendingService()
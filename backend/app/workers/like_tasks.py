@@ -0,0 +1,36 @@
+import asyncio
+
+from celery import shared_task
+
+from app.core.db import AsyncSessionLocal
+from app.services.like_counter_service import LikeCounterService
+
+
+# These tasks run every few seconds: keep one loop per worker process, since pooled
+# Redis and DB connections are bound to the loop that opened them.
+_loop: asyncio.AbstractEventLoop | None = None
+
+
+def run_with_session(fn):
+    global _loop
+    if _loop is None or _loop.is_closed():
+        _loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(_loop)
+
+    async def _with_session():
+        async with AsyncSessionLocal() as db:
+            return await fn(db)
+
+    return _loop.run_until_complete(_with_session())
+
+
+@shared_task(name="app.workers.like_tasks.flush_like_counts")
+def flush_like_counts() -> dict:
+    """Apply likes buffered in Redis to projects.likes_count."""
+    return {"projects": run_with_session(LikeCounterService.flush)}
+
+
+@shared_task(name="app.workers.like_tasks.reconcile_like_counts")
+def reconcile_like_counts() -> dict:
+    """Correct likes_count drift against the likes table."""
+    return {"corrected": len(run_with_session(LikeCounterService.reconcile))}
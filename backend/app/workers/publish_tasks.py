@@ -9,6 +9,7 @@ import asyncio
 from celery import shared_task
 from sqlalchemy import select
 
+from app.core import tracing
 from app.core.db import AsyncSessionLocal
 from app.models.publish import PublishJob, PublishAccount
 from app.services.publish_service import publish_service
@@ -70,7 +71,8 @@ def _ffmpeg_concat(input_paths: list[str], output_path: str) -> tuple[bool, str]
         _write_concat_list(input_paths, list_path)
 
         cmd_copy = [ffmpeg, "-y", "-f", "concat", "-safe", "0", "-i", list_path, "-c", "copy", output_path]
-        proc = subprocess_run(cmd_copy)
+        with tracing.span("ffmpeg.concat", mode="copy", parts=len(input_paths)):
+            proc = subprocess_run(cmd_copy)
         if proc["ok"]:
             return True, ""
 
@@ -91,7 +93,8 @@ def _ffmpeg_concat(input_paths: list[str], output_path: str) -> tuple[bool, str]
             "+faststart",
             output_path,
         ]
-        proc2 = subprocess_run(cmd_reencode)
+        with tracing.span("ffmpeg.concat", mode="reencode", parts=len(input_paths)):
+            proc2 = subprocess_run(cmd_reencode)
         if proc2["ok"]:
             return True, ""
         return False, (proc2["stderr"] or proc["stderr"] or "ffmpeg concat failed")[-2000:]
@@ -112,7 +115,7 @@ async def _export_from_head_commit(db, project_internal_id: int, branch_id: int)
     if not commit:
         raise Exception("HEAD commit not found")
 
-    urls = publish_service.collect_video_urls(commit.video_assets)
+    urls = await publish_service.commit_video_urls(db, commit)
     if len(urls) == 0:
         raise Exception("No clip video URLs found to export")
     out_fd, out_path = tempfile.mkstemp(prefix="evidverse-export-out-", suffix=".mp4")
@@ -156,7 +159,7 @@ async def _export_parts_from_head_commit(db, project_internal_id: int, branch_id
     if not commit:
         raise Exception("HEAD commit not found")
 
-    urls = publish_service.collect_video_urls(commit.video_assets)
+    urls = await publish_service.commit_video_urls(db, commit)
     if len(urls) == 0:
         raise Exception("No clip video URLs found to export")
 
@@ -278,15 +281,16 @@ def publish_job(job_internal_id: int) -> dict[str, Any]:
                 job.logs = logs[-200:]
                 await db.commit()
 
-                if job.platform == "bilibili":
-                    result = upload_with_biliup(local_videos, credential_json, meta)
-                elif job.platform == "douyin":
-                    if len(local_videos) > 1:
-                        result = {"status": "failed", "error": "Douyin provider does not support multi-part upload yet"}
+                with tracing.span("publish.upload", tracing.CLIENT, platform=job.platform, parts=len(local_videos)):
+                    if job.platform == "bilibili":
+                        result = upload_with_biliup(local_videos, credential_json, meta)
+                    elif job.platform == "douyin":
+                        if len(local_videos) > 1:
+                            result = {"status": "failed", "error": "Douyin provider does not support multi-part upload yet"}
+                        else:
+                            result = upload_to_douyin(local_videos[0], credential_json, meta)
                     else:
-                        result = upload_to_douyin(local_videos[0], credential_json, meta)
-                else:
-                    result = {"status": "failed", "error": f"Unsupported platform: {job.platform}"}
+                        result = {"status": "failed", "error": f"Unsupported platform: {job.platform}"}
                 if export_urls and isinstance(result, dict):
                     result["export_urls"] = export_urls
 
@@ -0,0 +1,10 @@
+from celery import shared_task
+
+from app.services.trending_service import TrendingService
+from app.workers.like_tasks import run_with_session
+
+
+@shared_task(name="app.workers.trending_tasks.refresh_trending")
+def refresh_trending() -> dict:
+    """Rebuild the materialized trending ranking."""
+    return {"ranked": run_with_session(TrendingService.refresh)}
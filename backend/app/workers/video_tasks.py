@@ -1,5 +1,6 @@
 import asyncio
 from app.core.celery_app import celery_app
+from app.core import tracing
 from app.core.config import settings
 from ai_engine.seedance.client import SeedanceClient
 
@@ -26,16 +27,19 @@ def generate_video_from_image(image_url: str, prompt: str) -> dict:
             
             # 2. Poll for completion
             max_retries = 60 # 60 * 2s = 2 mins timeout
-            for _ in range(max_retries):
-                await asyncio.sleep(2)
-                status_resp = await client.get_task_status(task_id)
-                status = status_resp.get("status")
-                
-                if status == "succeeded":
-                    return {"status": "succeeded", "video_url": status_resp.get("output", {}).get("url")}
-                elif status == "failed":
-                    return {"status": "failed", "error": status_resp.get("error")}
-            
+            with tracing.span("seedance.poll", **{"seedance.task_id": task_id}) as span:
+                for attempt in range(1, max_retries + 1):
+                    await asyncio.sleep(2)
+                    status_resp = await client.get_task_status(task_id)
+                    status = status_resp.get("status")
+                    if span:
+                        span.set(polls=attempt, status=status)
+
+                    if status == "succeeded":
+                        return {"status": "succeeded", "video_url": status_resp.get("output", {}).get("url")}
+                    elif status == "failed":
+                        return {"status": "failed", "error": status_resp.get("error")}
+
             return {"status": "timeout", "error": "Generation timed out"}
             
         except Exception as e:
@@ -1,4 +1,5 @@
 import asyncio
+from app.core import tracing
 from app.core.celery_app import celery_app
 from app.services.story_service import story_service
 from app.workers.image_tasks import generate_character_image
@@ -28,7 +29,8 @@ def generate_clip_workflow(topic: str, user_id: int) -> dict:
     asyncio.set_event_loop(loop)
     
     try:
-        storyboard = loop.run_until_complete(story_service.generate_storyboard(topic))
+        with tracing.span("workflow.storyboard"):
+            storyboard = loop.run_until_complete(story_service.generate_storyboard(topic))
     except Exception as e:
         return {"status": "failed", "error": str(e)}
     finally:
@@ -0,0 +1,106 @@
+"""
+Benchmark concurrent commits to one branch.
+
+N writers, each with its own session, commit to the same branch at once.
+"cas" is CommitService.create_commit (compare-and-swap HEAD; a writer
+that loses the race gets a 409 and retries on the new HEAD); "legacy" is the previous read-HEAD-then-overwrite update. Reports
+commits/sec and how many commits are still reachable from HEAD (lost
+updates). Run from backend/:
+
+    python tests/bench_commit_cas.py [--writers 8] [--commits 25] [--url postgresql+asyncpg://...]
+"""
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+import uuid
+from datetime import datetime
+from pathlib import Path
+
+backend_root = Path(__file__).resolve().parents[1]
+if str(backend_root) not in sys.path:
+    sys.path.insert(0, str(backend_root))
+
+from fastapi import HTTPException
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.models import Base, Branch, Commit, Project, User
+from app.services.ancestry_service import AncestryService
+from app.services.commit_service import CommitService
+
+
+async def legacy_commit(db, project_id, author_id, message, video_assets):
+    branch = (await db.execute(select(Branch).where(Branch.project_id == project_id, Branch.name == "main"))).scalar_one()
+    parent_hash = branch.head_commit_id
+    commit_id = CommitService.calculate_hash(message, parent_hash, video_assets, datetime.utcnow().isoformat())
+    generation, jump_hash = await AncestryService.index_entry(db, commit_id, parent_hash)
+    db.add(Commit(id=commit_id, project_id=project_id, author_id=author_id, message=message, parent_hash=parent_hash, generation=generation, jump_hash=jump_hash, video_assets=video_assets))
+    branch.head_commit_id = commit_id
+    await db.commit()
+
+
+async def run(url, mode, writers, per_writer):
+    connect_args = {"timeout": 60} if url.startswith("sqlite") else {}
+    engine = create_async_engine(url, connect_args=connect_args, pool_size=writers + 2) if not url.startswith("sqlite") else create_async_engine(url, connect_args=connect_args)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+    Session = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+    async with Session() as db:
+        user = User(email=f"bench-{uuid.uuid4().hex[:6]}@example.com", hashed_password="x", is_active=True)
+        db.add(user)
+        await db.flush()
+        project = Project(name="bench", owner_internal_id=user.internal_id)
+        db.add(project)
+        await db.flush()
+        db.add(Branch(name="main", project_id=project.internal_id))
+        await db.commit()
+        project_id, author_id = project.internal_id, user.internal_id
+
+    async def writer(w):
+        async with Session() as db:
+            for i in range(per_writer):
+                assets = {"clips": [{"id": i, "writer": w}]}
+                if mode == "cas":
+                    while True:
+                        try:
+                            await CommitService.create_commit(db, project_id, author_id, f"w{w}-{i}", assets, "main")
+                            break
+                        except HTTPException as e:
+                            if e.status_code != 409:
+                                raise
+                else:
+                    await legacy_commit(db, project_id, author_id, f"w{w}-{i}", assets)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(writer(w) for w in range(writers)))
+    elapsed = time.perf_counter() - started
+
+    async with Session() as db:
+        head = (await db.execute(select(Branch.head_commit_id).where(Branch.project_id == project_id))).scalar()
+        reachable = len(await AncestryService.ancestor_chain(db, head, writers * per_writer + 1)) if head else 0
+    await engine.dispose()
+    total = writers * per_writer
+    print(f"{mode:>6}: {total} commits by {writers} writers in {elapsed:.2f}s = {total / elapsed:7.1f} commits/s; reachable from HEAD {reachable}/{total}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--writers", type=int, default=8)
+    parser.add_argument("--commits", type=int, default=25, help="commits per writer")
+    parser.add_argument("--url", default=os.getenv("BENCH_DATABASE_URL"))
+    args = parser.parse_args()
+    url = args.url
+    if not url:
+        url = f"sqlite+aiosqlite:///{tempfile.mkdtemp()}/bench.db"
+    for mode in ("legacy", "cas"):
+        asyncio.run(run(url, mode, args.writers, args.commits))
+
+
+if __name__ == "__main__":
+    main()
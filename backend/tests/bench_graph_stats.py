@@ -0,0 +1,93 @@
+"""
+Benchmark branch statistics for the project graph.
+
+Compares the original per-branch BFS with BranchGraphStats on a synthetic
+history of fork branches. Run from backend/:
+
+    python tests/bench_graph_stats.py [--commits 10000] [--branches 500]
+"""
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+backend_root = Path(__file__).resolve().parents[1]
+if str(backend_root) not in sys.path:
+    sys.path.insert(0, str(backend_root))
+
+from app.services.graph_stats import BranchGraphStats
+
+
+def build_history(n_commits: int, n_branches: int, seed: int = 1):
+    rng = random.Random(seed)
+    commits = []
+    # A long mainline with fork branches growing off random points of it.
+    trunk = max(n_commits // 2, 1)
+    for i in range(n_commits):
+        if i == 0:
+            parent = None
+        elif i < trunk:
+            parent = commits[i - 1]["id"]
+        else:
+            parent = commits[rng.randrange(i)]["id"]
+        commits.append({"id": f"{i:040x}", "parent_hash": parent, "author_id": rng.randint(1, 50), "score": 1 + 0.5 * rng.randint(0, 6)})
+    heads = {f"fork/{j}": commits[rng.randrange(trunk, n_commits)]["id"] for j in range(n_branches - 1)}
+    heads["main"] = commits[trunk - 1]["id"]
+    return commits, heads
+
+
+def legacy(commits, heads):
+    commits_map = {c["id"]: c for c in commits}
+    out = {}
+    for key, head in heads.items():
+        count, total, contributors = 0, 0.0, {}
+        visited = set()
+        queue = [head] if head else []
+        while queue:
+            h = queue.pop(0)
+            if not h or h in visited or h not in commits_map:
+                continue
+            visited.add(h)
+            c = commits_map[h]
+            count += 1
+            total += c["score"]
+            contributors[c["author_id"]] = contributors.get(c["author_id"], 0) + c["score"]
+            if c["parent_hash"]:
+                queue.append(c["parent_hash"])
+        out[key] = (count, total, contributors)
+    return out
+
+
+def single_pass(commits, heads):
+    engine = BranchGraphStats()
+    for c in commits:
+        engine.add_commit(c["id"], c["parent_hash"], c["author_id"], c["score"])
+    for key, head in heads.items():
+        engine.set_head(key, head)
+    engine.compute()
+    return {key: engine.branch_summary(key, str) for key in heads}, engine
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--commits", type=int, default=10_000)
+    parser.add_argument("--branches", type=int, default=500)
+    parser.add_argument("--skip-legacy", action="store_true")
+    args = parser.parse_args()
+
+    commits, heads = build_history(args.commits, args.branches)
+    print(f"history: {len(commits)} commits, {len(heads)} branches")
+
+    if not args.skip_legacy:
+        t0 = time.perf_counter()
+        legacy(commits, heads)
+        print(f"legacy per-branch BFS : {(time.perf_counter() - t0) * 1000:9.1f} ms")
+
+    t0 = time.perf_counter()
+    single_pass(commits, heads)
+    print(f"single-pass engine    : {(time.perf_counter() - t0) * 1000:9.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
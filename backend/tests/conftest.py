@@ -18,6 +18,8 @@ from httpx import AsyncClient, ASGITransport
 from app.models.user import User
 from app.core.security import get_password_hash, create_access_token
 
+pytest_plugins = ["tests.query_budget"]
+
 TEST_DATABASE_URL = os.getenv("TEST_DATABASE_URL", "sqlite+aiosqlite:///:memory:").strip()
 
 @pytest.fixture(scope="session")
@@ -40,6 +42,14 @@ def disable_vn_parse_job_celery_delay():
     yield
     vn_parse_job_task.delay = original_delay
 
+@pytest.fixture(autouse=True)
+def clear_local_cache():
+    # Rows are written straight through db_session in many tests, bypassing invalidation
+    from app.core.cache import cache
+
+    cache.local.clear()
+    yield
+
 @pytest.fixture(scope="session")
 async def db_engine():
     connect_args = {"check_same_thread": False} if TEST_DATABASE_URL.startswith("sqlite") else {}
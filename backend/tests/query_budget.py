@@ -0,0 +1,36 @@
+"""
+Pytest plugin: SQL query budgets, so an endpoint that starts issuing a query
+per row fails the suite instead of slowing down production.
+
+    async def test_list(client, query_budget):
+        with query_budget(6, max_repeats=2):
+            await client.get("/api/v1/...")
+"""
+from contextlib import contextmanager
+from typing import Iterator, Optional
+
+import pytest
+
+from app.core.query_stats import QueryStats, track_queries
+
+
+def _report(stats: QueryStats) -> str:
+    return "\n".join(f"  {n}x {shape}" for shape, n in stats.shapes.most_common(10))
+
+
+@pytest.fixture
+def query_budget():
+    """`with query_budget(n, max_repeats=k)`: at most n statements, none of the same shape more than k times."""
+
+    @contextmanager
+    def budget(max_queries: int, max_repeats: Optional[int] = None) -> Iterator[QueryStats]:
+        with track_queries() as stats:
+            yield stats
+        assert stats.count <= max_queries, (
+            f"{stats.count} SQL statements, budget is {max_queries}:\n{_report(stats)}"
+        )
+        if max_repeats is not None:
+            repeated = stats.repeated(max_repeats + 1)
+            assert not repeated, f"statement repeated more than {max_repeats} times (N+1?):\n{_report(stats)}"
+
+    return budget
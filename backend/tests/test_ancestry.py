@@ -0,0 +1,92 @@
+import uuid
+
+import pytest
+
+from app.models.commit import Commit
+from app.models.project import Project
+from app.services.ancestry_service import AncestryService
+from app.services.branch_service import BranchService
+from app.services.commit_service import CommitService
+
+
+async def _project(db_session, owner):
+    project = Project(name=f"ancestry-{uuid.uuid4().hex[:6]}", owner_internal_id=owner.internal_id)
+    db_session.add(project)
+    await db_session.commit()
+    return project
+
+
+async def _chain(db_session, project, owner, parent, n, prefix):
+    ids = []
+    for i in range(n):
+        cid = f"{prefix}-{i}-{uuid.uuid4().hex[:8]}"
+        generation, jump = await AncestryService.index_entry(db_session, cid, parent)
+        db_session.add(
+            Commit(
+                id=cid,
+                project_id=project.internal_id,
+                author_id=owner.internal_id,
+                message=cid,
+                parent_hash=parent,
+                generation=generation,
+                jump_hash=jump,
+            )
+        )
+        await db_session.flush()
+        ids.append(cid)
+        parent = cid
+    await db_session.commit()
+    return ids
+
+
+@pytest.mark.asyncio
+async def test_create_commit_writes_generation_and_jump(db_session, normal_user):
+    project = await _project(db_session, normal_user)
+    c1 = await CommitService.create_commit(db_session, project.internal_id, normal_user.internal_id, "one", {}, "main")
+    c2 = await CommitService.create_commit(db_session, project.internal_id, normal_user.internal_id, "two", {}, "main")
+    c3 = await CommitService.create_commit(db_session, project.internal_id, normal_user.internal_id, "three", {}, "main")
+    assert (c1.generation, c1.jump_hash) == (1, c1.id)
+    assert (c2.generation, c2.jump_hash) == (2, c1.id)
+    assert (c3.generation, c3.jump_hash) == (3, c2.id)
+    assert await AncestryService.is_ancestor(db_session, c1.id, c3.id)
+    assert not await AncestryService.is_ancestor(db_session, c3.id, c1.id)
+
+
+@pytest.mark.asyncio
+async def test_ancestry_queries_on_long_forked_history(db_session, normal_user):
+    project = await _project(db_session, normal_user)
+    trunk = await _chain(db_session, project, normal_user, None, 150, "trunk")
+    fork = await _chain(db_session, project, normal_user, trunk[99], 40, "fork")
+    other = await _chain(db_session, project, normal_user, None, 5, "other")
+
+    for gen in (1, 2, 37, 64, 100, 150):
+        assert await AncestryService.ancestor_at(db_session, trunk[-1], gen) == trunk[gen - 1]
+    assert await AncestryService.ancestor_at(db_session, fork[-1], 100) == trunk[99]
+    assert await AncestryService.ancestor_at(db_session, fork[-1], 101) == fork[0]
+
+    assert await AncestryService.is_ancestor(db_session, trunk[10], fork[-1])
+    assert not await AncestryService.is_ancestor(db_session, trunk[120], fork[-1])
+    assert not await AncestryService.is_ancestor(db_session, other[0], trunk[-1])
+
+    assert await AncestryService.merge_base(db_session, trunk[-1], fork[-1]) == trunk[99]
+    assert await AncestryService.merge_base(db_session, fork[5], trunk[99]) == trunk[99]
+    assert await AncestryService.merge_base(db_session, other[-1], trunk[-1]) is None
+
+    assert await AncestryService.commits_between(db_session, fork[-1], trunk[-1]) == list(reversed(fork))
+    assert await AncestryService.commits_between(db_session, trunk[4], None) == list(reversed(trunk[:5]))
+
+
+@pytest.mark.asyncio
+async def test_index_entry_backfills_unindexed_parents(db_session, normal_user):
+    project = await _project(db_session, normal_user)
+    legacy_ids = [f"legacy-{i}-{uuid.uuid4().hex[:6]}" for i in range(6)]
+    parent = None
+    for cid in legacy_ids:
+        db_session.add(Commit(id=cid, project_id=project.internal_id, author_id=normal_user.internal_id, message=cid, parent_hash=parent))
+        await db_session.flush()
+        parent = cid
+    await db_session.commit()
+
+    assert await AncestryService.index_entry(db_session, "new", legacy_ids[-1]) == (7, legacy_ids[3])
+    gens = await AncestryService.generations(db_session, legacy_ids)
+    assert [gens[c] for c in legacy_ids] == [1, 2, 3, 4, 5, 6]
@@ -18,23 +18,264 @@ async def test_get_project_graph_cache():
     mock_db.execute.return_value = mock_result
     
     # Mock Cache
-    with patch.object(cache, 'get', new_callable=AsyncMock) as mock_get, \
+    with patch.object(cache, '_lookup', new_callable=AsyncMock) as mock_lookup, \
+         patch.object(cache, '_acquire_lock', new_callable=AsyncMock) as mock_lock, \
          patch.object(cache, 'set', new_callable=AsyncMock) as mock_set:
-        
+        mock_lock.return_value = ""
+
         # Case 1: Cache Miss
-        mock_get.return_value = None
+        mock_lookup.return_value = (None, False)
         
         await BranchService.get_project_graph(mock_db, project_id=1)
         
-        mock_get.assert_called_with("project_graph:1")
+        mock_lookup.assert_called_with("project_graph:1", ["project:1"])
         mock_set.assert_called_once() # Should set cache
         
         # Case 2: Cache Hit
-        mock_get.return_value = {"branches": [], "commits": []}
+        mock_lookup.return_value = ({"v": {"branches": [], "commits": []}, "t": {}, "d": 0}, True)
         mock_set.reset_mock()
         
         result = await BranchService.get_project_graph(mock_db, project_id=1)
         
-        mock_get.assert_called_with("project_graph:1")
+        mock_lookup.assert_called_with("project_graph:1", ["project:1"])
         mock_set.assert_not_called() # Should NOT set cache again
         assert result == {"branches": [], "commits": []}
+
+
+def test_local_lru_bounds_entries_and_bytes():
+    from app.core.cache import LocalLRUCache
+
+    lru = LocalLRUCache(max_entries=2, max_bytes=10, ttl=60)
+    lru.set("a", "1111")
+    lru.set("b", "2222")
+    assert lru.get("a") == "1111"  # touch "a" so "b" is least recently used
+    lru.set("c", "3333")
+    assert lru.get("b") is None
+    assert lru.get("a") == "1111" and lru.get("c") == "3333"
+
+    lru.set("d", "44444")
+    assert lru.size_bytes <= 10
+    assert len(lru) == 2
+
+    lru.set("huge", "x" * 11)
+    assert lru.get("huge") is None
+
+
+def test_local_lru_expires_entries(monkeypatch):
+    from app.core import cache as cache_module
+
+    now = [1000.0]
+    monkeypatch.setattr(cache_module.time, "monotonic", lambda: now[0])
+    lru = cache_module.LocalLRUCache(max_entries=10, max_bytes=1000, ttl=30)
+    lru.set("short", "v", ttl=5)
+    lru.set("long", "v", ttl=600)
+    now[0] += 10
+    assert lru.get("short") is None
+    assert lru.get("long") == "v"
+    now[0] += 25
+    assert lru.get("long") is None
+    assert lru.size_bytes == 0
+
+
+@pytest.mark.asyncio
+async def test_two_tier_cache_serves_from_local_and_survives_redis_outage():
+    from app.core.cache import RedisCache
+
+    c = RedisCache()
+    c.redis = MagicMock()
+    c.redis.mget = AsyncMock(return_value=['{"v": {"n": 1}, "t": {}}'])
+    c.redis.set = AsyncMock()
+
+    assert await c.get("k") == {"n": 1}
+    assert await c.get("k") == {"n": 1}
+    assert c.redis.mget.await_count == 1
+    stats = c.get_stats()
+    assert stats["redis_hits"] == 1 and stats["local_hits"] == 1
+
+    c.redis.set = AsyncMock(side_effect=ConnectionError("down"))
+    c.redis.mget = AsyncMock(side_effect=ConnectionError("down"))
+    await c.set("other", {"n": 2})
+    assert await c.get("other") == {"n": 2}
+    assert await c.get("missing") is None
+    assert c.redis.mget.await_count == 0
+    assert c.get_stats()["redis_errors"] == 1
+
+
+class _FakeRedis:
+    def __init__(self):
+        self.data = {}
+
+    async def mget(self, keys):
+        return [self.data.get(k) for k in keys]
+
+    async def set(self, key, value, ex=None, nx=False, px=None):
+        if nx and key in self.data:
+            return None
+        self.data[key] = value
+        return True
+
+    async def eval(self, script, numkeys, key, token):
+        if self.data.get(key) == token:
+            self.data.pop(key)
+            return 1
+        return 0
+
+    async def delete(self, *keys):
+        for k in keys:
+            self.data.pop(k, None)
+
+    def pipeline(self, transaction=True):
+        fake = self
+
+        class _Pipe:
+            def __init__(self):
+                self.ops = []
+
+            def incr(self, key):
+                self.ops.append(key)
+
+            async def execute(self):
+                out = []
+                for k in self.ops:
+                    fake.data[k] = str(int(fake.data.get(k) or 0) + 1)
+                    out.append(int(fake.data[k]))
+                return out
+
+        return _Pipe()
+
+
+@pytest.mark.asyncio
+async def test_tag_invalidation_bumps_generation_without_key_scan():
+    from app.core.cache import RedisCache, project_tag
+
+    c = RedisCache()
+    c.redis = _FakeRedis()
+    tag = project_tag(7)
+
+    await c.set("project_graph:7", {"n": 1}, tags=[tag])
+    await c.set("project_stats:7", {"n": 2}, tags=[tag])
+    await c.set("project_graph:8", {"n": 3}, tags=[project_tag(8)])
+    assert await c.get("project_graph:7", tags=[tag]) == {"n": 1}
+
+    await c.invalidate_tags(tag)
+    assert c.redis.data["cache:tagver:project:7"] == "1"
+    assert await c.get("project_graph:7", tags=[tag]) is None
+    assert await c.get("project_stats:7") is None
+    assert await c.get("project_graph:8") == {"n": 3}
+
+    c.local.clear()
+    assert await c.get("project_stats:7") is None
+    assert c.get_stats()["redis_stale"] >= 1
+
+    versions = await c.tag_versions([tag])
+    await c.invalidate_tags(tag)  # concurrent write while the value was being rebuilt
+    await c.set("project_graph:7", {"n": 4}, tag_versions=versions)
+    c.local.clear()
+    assert await c.get("project_graph:7", tags=[tag]) is None
+
+
+@pytest.mark.asyncio
+async def test_local_hit_sees_invalidation_by_another_worker(monkeypatch):
+    from app.core.cache import RedisCache, project_tag
+
+    shared = _FakeRedis()
+    writer, reader = RedisCache(), RedisCache()
+    writer.redis = reader.redis = shared
+    tag = project_tag(9)
+
+    await writer.set("project_graph:9", {"rev": 1}, tags=[tag])
+    assert await reader.get("project_graph:9", tags=[tag]) == {"rev": 1}
+    assert len(reader.local) == 1
+
+    # L1 hits trust the generations read moments ago: no Redis round trip
+    calls = []
+    mget = shared.mget
+
+    async def counting_mget(keys):
+        calls.append(keys)
+        return await mget(keys)
+
+    monkeypatch.setattr(shared, "mget", counting_mget)
+    assert await reader.get("project_graph:9", tags=[tag]) == {"rev": 1}
+    assert calls == []
+
+    # Another worker's invalidation is seen once the trusted generation is re-read
+    await writer.invalidate_tags(tag)
+    reader._tag_generations.clear()  # the trust interval has passed
+    assert await reader.get("project_graph:9", tags=[tag]) is None
+    assert len(reader.local) == 0
+
+
+@pytest.mark.asyncio
+async def test_get_or_build_coalesces_concurrent_misses():
+    import asyncio
+    from app.core.cache import RedisCache
+
+    c = RedisCache()
+    c.redis = _FakeRedis()
+    calls = []
+
+    async def builder():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return {"graph": len(calls)}
+
+    results = await asyncio.gather(*[c.get_or_build("g", builder, expire=60, beta=0) for _ in range(20)])
+    assert len(calls) == 1
+    assert all(r == {"graph": 1} for r in results)
+    assert not any(k.startswith("cache:lock:") for k in c.redis.data)
+
+
+@pytest.mark.asyncio
+async def test_get_or_build_serves_stale_while_one_caller_rebuilds():
+    import asyncio
+    from app.core.cache import RedisCache, project_tag
+
+    c = RedisCache()
+    c.redis = _FakeRedis()
+    tag = project_tag(3)
+    await c.set("project_graph:3", {"rev": 1}, expire=60, tags=[tag], stale_ttl=60)
+    await c.invalidate_tags(tag)
+
+    calls = []
+
+    async def builder():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return {"rev": 2}
+
+    leader = asyncio.create_task(c.get_or_build("project_graph:3", builder, expire=60, tags=[tag], beta=0))
+    await asyncio.sleep(0)
+    followers = await asyncio.gather(
+        *[c.get_or_build("project_graph:3", builder, expire=60, tags=[tag], beta=0) for _ in range(5)]
+    )
+    assert followers == [{"rev": 1}] * 5
+    assert await leader == {"rev": 2}
+    assert len(calls) == 1
+    assert await c.get("project_graph:3", tags=[tag]) == {"rev": 2}
+
+    # Another node holds the build lock: a stale value is served without building.
+    await c.invalidate_tags(tag)
+    c.redis.data["cache:lock:project_graph:3"] = "other-node"
+    assert await c.get_or_build("project_graph:3", builder, expire=60, tags=[tag], beta=0) == {"rev": 2}
+    assert len(calls) == 1
+
+
+@pytest.mark.asyncio
+async def test_get_or_build_refreshes_early_near_expiry():
+    from app.core.cache import RedisCache
+
+    c = RedisCache()
+    c.redis = _FakeRedis()
+    await c.set("k", {"rev": 1}, expire=60, delta=10.0)
+    calls = []
+
+    async def builder():
+        calls.append(1)
+        return {"rev": 2}
+
+    assert await c.get_or_build("k", builder, expire=60, beta=0) == {"rev": 1}
+    assert calls == []
+    # A huge beta makes the early refresh certain while the entry is still fresh.
+    assert await c.get_or_build("k", builder, expire=60, beta=1e9) == {"rev": 2}
+    assert calls == [1]
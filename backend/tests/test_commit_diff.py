@@ -0,0 +1,99 @@
+import pytest
+
+from app.models.project import Project
+from app.services.commit_service import CommitService
+from app.services.diff_service import diff_snapshots, merge_snapshots
+
+
+def _clip(i, **extra):
+    return {"id": i, "video_url": f"https://cdn.example.com/{i}.mp4", **extra}
+
+
+def test_diff_snapshots_reports_clip_changes():
+    base = {"version": 1, "clips": [_clip(1), _clip(2), _clip(3), _clip(4), _clip(5)]}
+    head = {"version": 2, "clips": [_clip(1), _clip(4), _clip(2), _clip(3, duration=6), _clip(6)]}
+    diff = diff_snapshots(base, head)
+    clips = diff["clips"]
+    assert [c["key"] for c in clips["added"]] == ["id:6"]
+    assert [(c["key"], c["index"]) for c in clips["removed"]] == [("id:5", 4)]
+    assert clips["modified"] == [{"key": "id:3", "index": 3, "changes": {"duration": {"from": None, "to": 6}}}]
+    # one move explains the new order
+    assert clips["moved"] == [{"key": "id:4", "from_index": 3, "to_index": 1}]
+    assert diff["fields"] == {"version": {"from": 1, "to": 2}}
+    assert not diff["identical"]
+    assert diff_snapshots(base, base)["identical"]
+
+
+def test_diff_flat_asset_maps():
+    diff = diff_snapshots({"a.mp4": "u1", "b.mp4": "u2"}, {"b.mp4": "u3", "c.mp4": "u4"})
+    assert [c["key"] for c in diff["clips"]["added"]] == ["c.mp4"]
+    assert [c["key"] for c in diff["clips"]["removed"]] == ["a.mp4"]
+    assert diff["clips"]["modified"][0]["changes"] == {"": {"from": "u2", "to": "u3"}}
+    assert diff["clips"]["moved"] == []
+
+
+def test_merge_snapshots_combines_independent_changes():
+    base = {"version": 1, "clips": [_clip(1), _clip(2), _clip(3)]}
+    ours = {"version": 1, "clips": [_clip(3), _clip(1), _clip(2, duration=4)]}  # moved 3, edited 2
+    theirs = {"version": 2, "clips": [_clip(1), _clip(7), _clip(2), _clip(3)]}  # inserted 7 after 1
+    merged, conflicts = merge_snapshots(base, ours, theirs)
+    assert conflicts == []
+    assert merged == {"version": 2, "clips": [_clip(3), _clip(1), _clip(7), _clip(2, duration=4)]}
+
+    removed, conflicts = merge_snapshots(base, {"version": 1, "clips": [_clip(1), _clip(2)]}, theirs)
+    assert conflicts == [] and [c["id"] for c in removed["clips"]] == [1, 7, 2]
+
+    assert merge_snapshots({"a.mp4": "u1"}, {"a.mp4": "u1", "b.mp4": "u2"}, {"c.mp4": "u3"}) == (
+        {"b.mp4": "u2", "c.mp4": "u3"},
+        [],
+    )
+
+
+def test_merge_snapshots_reports_conflicts():
+    base = {"version": 1, "clips": [_clip(1), _clip(2)]}
+    _, conflicts = merge_snapshots(base, {"version": 2, "clips": [_clip(1, duration=1), _clip(2)]}, {"version": 3, "clips": [_clip(1, duration=2)]})
+    assert conflicts == ["id:1", "field:version"]
+    _, conflicts = merge_snapshots(base, {"clips": [_clip(2)], "version": 1}, {"version": 1, "clips": [_clip(1, duration=2), _clip(2)]})
+    assert conflicts == ["id:1"]  # deleted on one side, edited on the other
+    _, conflicts = merge_snapshots(base, {"version": 1, "clips": [_clip(2), _clip(1)]}, {"version": 1, "clips": [_clip(2), _clip(1)]})
+    assert conflicts == []
+    _, conflicts = merge_snapshots(
+        {"clips": [_clip(1), _clip(2), _clip(3)]}, {"clips": [_clip(3), _clip(1), _clip(2)]}, {"clips": [_clip(2), _clip(1), _clip(3)]}
+    )
+    assert conflicts == ["order"]
+    assert merge_snapshots(base, {"a.mp4": "u"}, base | {"version": 2})[1] == [""]
+
+
+@pytest.mark.asyncio
+async def test_commit_diff_endpoint_is_cached(client, db_session, normal_user, normal_user_token_headers, monkeypatch):
+    project = Project(name="Diff Project", owner_internal_id=normal_user.internal_id)
+    db_session.add(project)
+    await db_session.commit()
+    c1 = await CommitService.create_commit(db_session, project.internal_id, normal_user.internal_id, "one", {"clips": [_clip(1)]}, "main")
+    c2 = await CommitService.create_commit(db_session, project.internal_id, normal_user.internal_id, "two", {"clips": [_clip(1), _clip(2)]}, "main")
+    c1_id, c2_id = c1.id, c2.id
+
+    from app.core.cache import cache
+
+    stored = {}
+
+    async def fake_get_or_build(key, builder, expire=300, tags=None, stale_ttl=None, beta=None):
+        if key not in stored:
+            stored[key] = await builder()
+        return stored[key]
+
+    monkeypatch.setattr(cache, "get_or_build", fake_get_or_build)
+
+    res = await client.get("/api/v1/commits/diff", params={"base": c1_id, "head": c2_id}, headers=normal_user_token_headers)
+    assert res.status_code == 200
+    body = res.json()
+    assert (body["base"], body["head"]) == (c1_id, c2_id)
+    assert [c["key"] for c in body["clips"]["added"]] == ["id:2"]
+    assert f"commit_diff:{c1_id}:{c2_id}" in stored
+
+    # Default base is the parent commit
+    res = await client.get("/api/v1/commits/diff", params={"head": c2_id}, headers=normal_user_token_headers)
+    assert res.json()["base"] == c1_id
+
+    res = await client.get("/api/v1/commits/diff", params={"head": "missing"}, headers=normal_user_token_headers)
+    assert res.status_code == 404
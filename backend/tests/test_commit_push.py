@@ -0,0 +1,86 @@
+from datetime import datetime
+
+import pytest
+from sqlalchemy import select
+
+from app.models.branch import Branch
+from app.models.commit import Commit
+from app.models.project import Project
+from app.services.commit_service import CommitService
+from app.services.snapshot_service import SnapshotService
+
+
+async def _project(db_session, owner):
+    project = Project(name="Push Project", owner_internal_id=owner.internal_id)
+    db_session.add(project)
+    await db_session.flush()
+    db_session.add(Branch(name="main", project_id=project.internal_id))
+    await db_session.commit()
+    return project.internal_id, project.public_id
+
+
+@pytest.mark.asyncio
+async def test_push_commits_in_one_request(client, db_session, normal_user, normal_user_token_headers):
+    project_id, public_id = await _project(db_session, normal_user)
+    base = await CommitService.create_commit(db_session, project_id, normal_user.internal_id, "base", {"clips": []}, "main")
+    base_id = base.id
+
+    # Client-hashed history, as replayed from a local repository
+    commits, parent = [], base_id
+    for i in range(5):
+        ts = datetime(2026, 1, 1, 0, 0, i).isoformat()
+        assets = {"clips": [{"id": n} for n in range(i + 1)]}
+        cid = CommitService.calculate_hash(f"c{i}", parent, assets, ts)
+        commits.append({"id": cid, "parent_hash": parent, "timestamp": ts, "message": f"c{i}", "video_assets": assets})
+        parent = cid
+
+    payload = {"project_id": public_id, "branch_name": "main", "commits": commits}
+    res = await client.post("/api/v1/commits/batch", json=payload, headers=normal_user_token_headers)
+    assert res.status_code == 200
+    body = res.json()
+    assert body["head_commit_id"] == parent
+    assert body["created"] == [c["id"] for c in commits] and body["skipped"] == []
+
+    rows = (await db_session.execute(select(Commit.id, Commit.parent_hash, Commit.generation, Commit.clip_count).where(Commit.project_id == project_id))).all()
+    by_id = {r.id: r for r in rows}
+    assert [by_id[c["id"]].generation for c in commits] == [2, 3, 4, 5, 6]
+    assert by_id[parent].clip_count == 5
+    tip = await db_session.get(Commit, parent)
+    assert await SnapshotService.load(db_session, tip) == commits[-1]["video_assets"]
+
+    # Re-pushing is idempotent
+    res = await client.post("/api/v1/commits/batch", json=payload, headers=normal_user_token_headers)
+    assert res.status_code == 200
+    assert res.json()["created"] == [] and len(res.json()["skipped"]) == 5
+
+    # Offline work without hashes is appended on top of the current HEAD
+    res = await client.post(
+        "/api/v1/commits/batch",
+        json={"project_id": public_id, "commits": [{"message": "o1", "video_assets": {}}, {"message": "o2", "video_assets": {"a": 1}}]},
+        headers=normal_user_token_headers,
+    )
+    assert res.status_code == 200
+    o1, o2 = res.json()["created"]
+    rows = dict((await db_session.execute(select(Commit.id, Commit.parent_hash).where(Commit.id.in_([o1, o2])))).all())
+    assert rows == {o1: parent, o2: o1}
+
+
+@pytest.mark.asyncio
+async def test_push_rejects_bad_chains_and_stale_base(client, db_session, normal_user, normal_user_token_headers):
+    project_id, public_id = await _project(db_session, normal_user)
+    c1 = await CommitService.create_commit(db_session, project_id, normal_user.internal_id, "one", {}, "main")
+    c1_id = c1.id
+    await CommitService.create_commit(db_session, project_id, normal_user.internal_id, "two", {}, "main")
+
+    url = "/api/v1/commits/batch"
+    bad_hash = {"id": "0" * 40, "timestamp": "2026-01-01T00:00:00", "message": "m", "video_assets": {}}
+    res = await client.post(url, json={"project_id": public_id, "commits": [bad_hash]}, headers=normal_user_token_headers)
+    assert res.status_code == 400
+
+    broken = [{"message": "a", "video_assets": {}}, {"message": "b", "video_assets": {}, "parent_hash": c1_id}]
+    res = await client.post(url, json={"project_id": public_id, "commits": broken}, headers=normal_user_token_headers)
+    assert res.status_code == 400
+
+    stale = {"project_id": public_id, "parent_hash": c1_id, "commits": [{"message": "late", "video_assets": {}}]}
+    res = await client.post(url, json=stale, headers=normal_user_token_headers)
+    assert res.status_code == 409
@@ -57,3 +57,118 @@ async def test_create_commits(client: AsyncClient, db_session):
     res3 = await client.post("/api/v1/commits/", json=commit3_data, headers=headers)
     c3 = res3.json()
     assert c3["parent_hash"] == c2_id
+
+
+@pytest.mark.asyncio
+async def test_commit_summary_columns(db_session, normal_user):
+    from app.models.commit import Commit
+    from app.models.project import Project
+    from app.services.commit_service import CommitService
+    from sqlalchemy import select
+    from sqlalchemy.orm import attributes
+
+    project = Project(name="Summary Project", owner_internal_id=normal_user.internal_id)
+    db_session.add(project)
+    await db_session.commit()
+
+    assets = {
+        "clips": [
+            {"id": 1, "video_url": "https://cdn.example.com/a.mp4", "duration": 4},
+            {"id": 2, "video_url": "https://cdn.example.com/b.mp4", "duration": 2.5},
+            {"id": 3, "prompt": "pending"},
+        ],
+        "settings": {"fps": 24},
+    }
+    commit = await CommitService.create_commit(db_session, project.internal_id, normal_user.internal_id, "summary", assets, "main")
+    assert (commit.asset_count, commit.clip_count, commit.total_duration) == (2, 3, 6.5)
+    assert commit.video_urls == ["https://cdn.example.com/a.mp4", "https://cdn.example.com/b.mp4"]
+
+    db_session.expunge_all()
+    loaded = (await db_session.execute(select(Commit).where(Commit.id == commit.id))).scalar_one()
+    assert "video_assets" not in attributes.instance_state(loaded).dict
+
+
+@pytest.mark.asyncio
+async def test_commit_head_compare_and_swap(client: AsyncClient, db_session, normal_user, normal_user_token_headers, monkeypatch):
+    from app.models.branch import Branch
+    from app.models.commit import Commit
+    from app.models.project import Project
+    from app.services.commit_service import CommitService
+    from app.services.snapshot_service import SnapshotService
+    from fastapi import HTTPException
+    from sqlalchemy import select, update
+
+    project = Project(name="CAS Project", owner_internal_id=normal_user.internal_id)
+    db_session.add(project)
+    await db_session.commit()
+    c1 = await CommitService.create_commit(db_session, project.internal_id, normal_user.internal_id, "one", {}, "main")
+    c2 = await CommitService.create_commit(db_session, project.internal_id, normal_user.internal_id, "two", {}, "main")
+
+    # A client that built on a stale HEAD gets 409, or a rebased commit when it asks for one
+    c2_id, project_public_id, project_internal_id = c2.id, project.public_id, project.internal_id
+    payload = {"project_id": project_public_id, "message": "stale", "video_assets": {}, "branch_name": "main", "parent_hash": c1.id}
+    res = await client.post("/api/v1/commits/", json=payload, headers=normal_user_token_headers)
+    assert res.status_code == 409
+    assert res.json()["detail"]["current_head"] == c2_id
+    res = await client.post("/api/v1/commits/", json={**payload, "rebase_on_conflict": True}, headers=normal_user_token_headers)
+    assert res.status_code == 200
+    assert res.json()["parent_hash"] == c2_id
+
+    # Another writer moves HEAD between our read and our swap: 409 by default, a merge on request
+    author_id = (await db_session.execute(select(Commit.author_id).where(Commit.id == c2_id))).scalar()
+    original_swap = CommitService.swap_head
+    concurrent = []
+
+    async def swap_after_concurrent_write(db, branch, expected, new_head):
+        if concurrent:
+            other_id, assets = concurrent.pop()
+            parent = await db.get(Commit, expected)
+            db.add(Commit(id=other_id, project_id=project_internal_id, author_id=author_id, message="other", parent_hash=expected, generation=parent.generation + 1, jump_hash=expected, video_assets=assets))
+            await db.flush()
+            await db.execute(update(Branch).where(Branch.internal_id == branch.internal_id).values(head_commit_id=other_id))
+        return await original_swap(db, branch, expected, new_head)
+
+    monkeypatch.setattr(CommitService, "swap_head", staticmethod(swap_after_concurrent_write))
+    theirs = {"clips": [{"id": "theirs", "v": 1}]}
+    concurrent.append(("e" * 40, theirs))
+    with pytest.raises(HTTPException) as lost:
+        await CommitService.create_commit(db_session, project_internal_id, author_id, "four", {"clips": [{"id": "ours"}]}, "main")
+    assert lost.value.status_code == 409
+    assert lost.value.detail["current_head"] == "e" * 40
+
+    concurrent.append(("f" * 40, theirs))
+    c4 = await CommitService.create_commit(
+        db_session, project_internal_id, author_id, "four", {"clips": [{"id": "ours"}]}, "main", rebase_on_conflict=True
+    )
+    assert c4.parent_hash == "f" * 40
+    assert await SnapshotService.load(db_session, c4) == {"clips": [{"id": "ours"}, {"id": "theirs", "v": 1}]}
+    branch = (await db_session.execute(select(Branch).where(Branch.project_id == project_internal_id))).scalar_one()
+    assert await CommitService.current_head(db_session, branch) == c4.id
+
+    # Both sides changed the same clip: no silent overwrite even when merging
+    c4_id = c4.id
+    concurrent.append(("d" * 40, {"clips": [{"id": "ours"}, {"id": "theirs", "v": 2}]}))
+    with pytest.raises(HTTPException) as conflicted:
+        await CommitService.create_commit(
+            db_session, project_internal_id, author_id, "five", {"clips": [{"id": "ours"}, {"id": "theirs", "v": 3}]}, "main", rebase_on_conflict=True
+        )
+    assert conflicted.value.status_code == 409
+    assert conflicted.value.detail["conflicts"] == ["id:theirs"]
+    assert conflicted.value.detail["expected_head"] == c4_id
+
+    # Over the API, a rebased commit reports the merged snapshot it stores, not the one sent
+    base_clips = [{"id": "ours"}, {"id": "theirs", "v": 1}]
+    concurrent.append(("a" * 40, {"clips": base_clips + [{"id": "third"}]}))
+    payload = {
+        "project_id": project_public_id,
+        "message": "six",
+        "video_assets": {"clips": base_clips + [{"id": "mine"}]},
+        "branch_name": "main",
+        "rebase_on_conflict": True,
+    }
+    res = await client.post("/api/v1/commits/", json=payload, headers=normal_user_token_headers)
+    assert res.status_code == 200
+    body = res.json()
+    assert body["parent_hash"] == "a" * 40
+    assert sorted(c["id"] for c in body["video_assets"]["clips"]) == ["mine", "ours", "theirs", "third"]
+    assert body["video_assets"] == await SnapshotService.load(db_session, await db_session.get(Commit, body["id"]))
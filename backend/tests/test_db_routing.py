@@ -0,0 +1,80 @@
+import pytest
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import create_async_engine
+from starlette.requests import Request
+
+from app.core import db as db_module
+from app.models.base import Base
+from app.models.user import User
+
+
+def _request(method: str, token: str = "token-a") -> Request:
+    return Request({"type": "http", "method": method, "headers": [(b"authorization", f"Bearer {token}".encode())]})
+
+
+async def _count_users(session) -> int:
+    return (await session.execute(select(func.count(User.internal_id)))).scalar()
+
+
+@pytest.fixture
+async def routed(tmp_path):
+    primary = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'primary.db'}")
+    replica = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'replica.db'}")
+    for engine in (primary, replica):
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+    # The "replica" never receives writes, so where a read went shows in the row count
+    async with primary.begin() as conn:
+        await conn.execute(User.__table__.insert(), [{"email": "on-primary@example.com", "hashed_password": "x", "public_id": "p1"}])
+    yield db_module.routing_sessionmaker(primary, replica)
+    await primary.dispose()
+    await replica.dispose()
+
+
+@pytest.mark.asyncio
+async def test_get_requests_read_from_replica_until_the_session_writes(routed):
+    async with routed() as session:
+        await db_module.route_request(session, _request("GET"))
+        assert await _count_users(session) == 0
+
+        session.add(User(email="written@example.com", hashed_password="x"))
+        await session.commit()
+        # Read-your-writes within the session: the write made it primary-only
+        assert await _count_users(session) == 2
+
+    async with routed() as session:
+        await db_module.route_request(session, _request("POST", token="token-b"))
+        assert await _count_users(session) == 2
+
+
+@pytest.mark.asyncio
+async def test_writers_are_pinned_to_primary_and_lagging_replica_is_skipped(routed, monkeypatch):
+    async with routed() as session:
+        await db_module.route_request(session, _request("POST"))
+        session.add(User(email="sticky@example.com", hashed_password="x"))
+        await session.commit()
+
+    async with routed() as session:
+        await db_module.route_request(session, _request("GET"))
+        assert await _count_users(session) == 2
+    async with routed() as session:
+        await db_module.route_request(session, _request("GET", token="token-other"))
+        assert await _count_users(session) == 0
+
+    monkeypatch.setattr(db_module.settings, "DATABASE_REPLICA_MAX_LAG_SECONDS", -1.0)
+    async with routed() as session:
+        session.sync_session.monitor.checked_at = float("-inf")
+        await db_module.route_request(session, _request("GET", token="token-other"))
+        assert await _count_users(session) == 2
+
+
+@pytest.mark.asyncio
+async def test_read_only_methods_use_replica_outside_get_requests(routed):
+    @db_module.read_only
+    async def count(db):
+        return await _count_users(db)
+
+    async with routed() as session:
+        await db_module.route_request(session, _request("POST", token="token-c"))
+        assert await count(session) == 0
+        assert await _count_users(session) == 1
@@ -57,3 +57,317 @@ async def test_feed_and_like(client: AsyncClient, normal_user_token_headers, nor
     target = next((p for p in data if p["id"] == project_id), None)
     assert target["likes_count"] == 0
     assert target["is_liked"] == False
+
+
+@pytest.mark.asyncio
+async def test_feed_like_info_is_batched(db_engine, db_session, client: AsyncClient, normal_user_token_headers, normal_user):
+    from sqlalchemy import event
+
+    from app.models.user import User
+
+    other = User(email="feed-batch-liker@example.com", hashed_password="x", full_name="Liker")
+    db_session.add(other)
+    await db_session.flush()
+    projects = [
+        Project(name=f"Batched {i}", owner_internal_id=normal_user.internal_id, is_public=True) for i in range(5)
+    ]
+    db_session.add_all(projects)
+    await db_session.flush()
+    db_session.add_all(
+        [
+            Like(project_id=projects[0].internal_id, user_id=other.internal_id),
+            Like(project_id=projects[0].internal_id, user_id=normal_user.internal_id),
+            Like(project_id=projects[2].internal_id, user_id=other.internal_id),
+        ]
+    )
+    await db_session.commit()
+    ids = [p.id for p in projects]
+    user_id = normal_user.id
+
+    # Likes inserted behind the counter's back are drift; reconciliation corrects it.
+    from app.services.like_counter_service import LikeCounterService
+
+    assert await LikeCounterService.reconcile(db_session) == sorted([projects[0].internal_id, projects[2].internal_id])
+    db_session.expire_all()
+
+    like_queries = []
+
+    def count(conn, cursor, statement, parameters, context, executemany):
+        if "FROM likes" in statement:
+            like_queries.append(statement)
+
+    event.listen(db_engine.sync_engine, "before_cursor_execute", count)
+    try:
+        response = await client.get(
+            f"/api/v1/users/{user_id}/projects", headers=normal_user_token_headers
+        )
+    finally:
+        event.remove(db_engine.sync_engine, "before_cursor_execute", count)
+
+    assert response.status_code == 200
+    by_id = {p["id"]: p for p in response.json()}
+    assert [by_id[i]["likes_count"] for i in ids] == [2, 0, 1, 0, 0]
+    assert [by_id[i]["is_liked"] for i in ids] == [True, False, False, False, False]
+    # Counts come from projects.likes_count; one viewer lookup for the whole page
+    assert len(like_queries) == 1
+
+
+class _FakeRedisHash:
+    def __init__(self):
+        self.data = {}
+
+    async def hincrby(self, key, field, amount):
+        h = self.data.setdefault(key, {})
+        h[field] = str(int(h.get(field, 0)) + amount)
+
+    async def hmget(self, key, fields):
+        return [self.data.get(key, {}).get(f) for f in fields]
+
+    async def hgetall(self, key):
+        return dict(self.data.get(key, {}))
+
+    async def exists(self, key):
+        return int(key in self.data)
+
+    async def rename(self, src, dst):
+        if src not in self.data:
+            raise Exception("ERR no such key")
+        self.data[dst] = self.data.pop(src)
+
+    async def delete(self, key):
+        self.data.pop(key, None)
+
+    async def set(self, key, value, nx=False, ex=None):
+        if nx and key in self.data:
+            return None
+        self.data[key] = value
+        return True
+
+    async def eval(self, script, numkeys, *args):
+        # The release-lock (1 key) and finish-flush (batch, lock) scripts
+        keys, token = args[:numkeys], args[numkeys]
+        if self.data.get(keys[-1]) != token:
+            return 0
+        for key in keys:
+            self.data.pop(key, None)
+        return 1
+
+    def pipeline(self, transaction=True):
+        fake = self
+
+        class _Pipe:
+            def __init__(self):
+                self.ops = []
+
+            def hmget(self, key, fields):
+                self.ops.append((key, fields))
+
+            async def execute(self):
+                return [await fake.hmget(key, fields) for key, fields in self.ops]
+
+        return _Pipe()
+
+
+@pytest.mark.asyncio
+async def test_like_counter_buffers_and_flushes(db_session, client: AsyncClient, normal_user_token_headers, normal_user):
+    from unittest.mock import patch
+
+    from app.core.cache import cache
+    from app.services.like_counter_service import LikeCounterService
+
+    quiet = Project(name="Quiet", owner_internal_id=normal_user.internal_id, is_public=True)
+    popular = Project(name="Popular", owner_internal_id=normal_user.internal_id, is_public=True)
+    db_session.add_all([quiet, popular])
+    await db_session.commit()
+    popular_pk, popular_id, quiet_id = popular.internal_id, popular.id, quiet.id
+
+    fake = _FakeRedisHash()
+    with patch.object(cache, "redis", fake), patch.object(cache, "_redis_available", return_value=True):
+        response = await client.post(f"/api/v1/projects/{popular_id}/like", headers=normal_user_token_headers)
+        assert response.json() is True
+        # Buffered, not yet written to the row, but visible to readers
+        assert fake.data[LikeCounterService.PENDING_KEY] == {str(popular_pk): "1"}
+        await db_session.refresh(popular)
+        assert popular.likes_count == 0
+        feed = (await client.get("/api/v1/projects/feed?sort=hot", headers=normal_user_token_headers)).json()
+        ordered = [p["id"] for p in feed if p["id"] in (popular_id, quiet_id)]
+        target = next(p for p in feed if p["id"] == popular_id)
+        assert target["likes_count"] == 1 and target["is_liked"] is True
+
+        assert await LikeCounterService.flush(db_session) == 1
+        assert [k for k in fake.data if k.startswith("likes:")] == []
+        assert await LikeCounterService.flush(db_session) == 0
+        await db_session.refresh(popular)
+        assert popular.likes_count == 1
+
+        feed = (await client.get("/api/v1/projects/feed?sort=hot")).json()
+        ordered = [p["id"] for p in feed if p["id"] in (popular_id, quiet_id)]
+        assert ordered == [popular_id, quiet_id]
+        assert next(p for p in feed if p["id"] == popular_id)["likes_count"] == 1
+
+        # Unlike then re-like before a flush: the deltas net out
+        await client.post(f"/api/v1/projects/{popular_id}/like", headers=normal_user_token_headers)
+        await client.post(f"/api/v1/projects/{popular_id}/like", headers=normal_user_token_headers)
+        assert fake.data[LikeCounterService.PENDING_KEY] == {str(popular_pk): "0"}
+        assert await LikeCounterService.flush(db_session) == 0
+        assert await LikeCounterService.reconcile(db_session) == []
+        assert [k for k in fake.data if k.startswith("likes:")] == []
+
+        # While another flush (or reconcile) holds the lock, neither touches the batch
+        await client.post(f"/api/v1/projects/{popular_id}/like", headers=normal_user_token_headers)
+        fake.data[LikeCounterService.LOCK_KEY] = "other"
+        assert await LikeCounterService.flush(db_session) == 0
+        assert await LikeCounterService.reconcile(db_session) == []
+        assert fake.data[LikeCounterService.PENDING_KEY] == {str(popular_pk): "-1"}
+        del fake.data[LikeCounterService.LOCK_KEY]
+        assert await LikeCounterService.flush(db_session) == 1
+        assert [k for k in fake.data if k.startswith("likes:")] == []
+        await db_session.refresh(popular)
+        assert popular.likes_count == 0
+
+
+@pytest.mark.asyncio
+async def test_trending_ranks_recent_activity_over_old_totals(db_session, client: AsyncClient, normal_user):
+    import uuid
+    from datetime import datetime, timedelta, timezone
+
+    from app.models.commit import Commit
+    from app.models.trending import ProjectTrending
+    from app.models.user import User
+    from app.services.trending_service import TrendingService
+
+    now = datetime.now(timezone.utc)
+    fans = [User(email=f"trend-{uuid.uuid4().hex[:8]}@example.com", hashed_password="x") for _ in range(6)]
+    db_session.add_all(fans)
+    veteran = Project(name="Veteran", owner_internal_id=normal_user.internal_id, is_public=True)
+    rising = Project(name="Rising", owner_internal_id=normal_user.internal_id, is_public=True)
+    hidden = Project(name="Hidden", owner_internal_id=normal_user.internal_id, is_public=False)
+    db_session.add_all([veteran, rising, hidden])
+    await db_session.flush()
+    # Six likes a week ago vs. two likes, a fork and a commit today
+    db_session.add_all(
+        [Like(project_id=veteran.internal_id, user_id=f.internal_id, created_at=now - timedelta(days=7)) for f in fans]
+        + [Like(project_id=rising.internal_id, user_id=f.internal_id, created_at=now) for f in fans[:2]]
+        + [Like(project_id=hidden.internal_id, user_id=f.internal_id, created_at=now) for f in fans]
+    )
+    db_session.add(
+        Project(name="Rising fork", owner_internal_id=fans[0].internal_id, parent_project_internal_id=rising.internal_id)
+    )
+    db_session.add(
+        Commit(id=uuid.uuid4().hex, project_id=rising.internal_id, author_id=normal_user.internal_id, message="m", created_at=now)
+    )
+    await db_session.commit()
+    veteran_pk, rising_pk, hidden_pk = veteran.internal_id, rising.internal_id, hidden.internal_id
+    veteran_id, rising_id = veteran.id, rising.id
+
+    scores = await TrendingService.compute_scores(db_session, now)
+    assert scores[rising_pk] > scores[veteran_pk] > 0
+    # Counted per hour in SQL; decaying whole hours stays within a few percent
+    assert scores[rising_pk] == pytest.approx(2 * 1.0 + 3.0 + 0.5, rel=0.05)
+    assert scores[veteran_pk] == pytest.approx(6 * 0.5 ** 7, rel=0.05)
+    assert hidden_pk not in scores
+
+    assert await TrendingService.refresh(db_session, now) >= 2
+    ranks = dict((await db_session.execute(select(ProjectTrending.project_id, ProjectTrending.rank))).all())
+    assert ranks[rising_pk] < ranks[veteran_pk]
+
+    feed = (await client.get("/api/v1/projects/feed?sort=trending&limit=100")).json()
+    ids = [p["id"] for p in feed]
+    assert ids.index(rising_id) < ids.index(veteran_id)
+    assert len(feed) == len(ranks)
+
+
+@pytest.mark.asyncio
+async def test_feed_cursor_pagination(client: AsyncClient, normal_user_token_headers, normal_user):
+    names = [f"Keyset page {i}" for i in range(5)]
+    for name in names:
+        res = await client.post("/api/v1/projects/", json={"name": name, "is_public": True}, headers=normal_user_token_headers)
+        assert res.status_code == 200
+
+    for sort in ("new", "hot"):
+        seen, cursor = [], None
+        while True:
+            params = {"query": "Keyset page", "limit": 2, "sort": sort}
+            if cursor:
+                params["cursor"] = cursor
+            res = await client.get("/api/v1/projects/feed", params=params)
+            assert res.status_code == 200
+            seen.extend(p["name"] for p in res.json())
+            cursor = res.headers.get("x-next-cursor")
+            if not cursor:
+                break
+        assert seen == list(reversed(names))
+
+    first = await client.get(f"/api/v1/users/{normal_user.id}/projects", params={"limit": 2})
+    rest = await client.get(
+        f"/api/v1/users/{normal_user.id}/projects", params={"limit": 100, "cursor": first.headers["x-next-cursor"]}
+    )
+    first_ids = [p["id"] for p in first.json()]
+    rest_ids = [p["id"] for p in rest.json()]
+    assert len(first_ids) == 2 and not set(first_ids) & set(rest_ids)
+    assert "x-next-cursor" not in rest.headers
+
+    assert (await client.get("/api/v1/projects/feed", params={"cursor": "not-a-cursor"})).status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_feed_page_is_shared_with_per_viewer_likes(
+    db_engine, db_session, client: AsyncClient, normal_user_token_headers, normal_user
+):
+    from sqlalchemy import event
+
+    res = await client.post(
+        "/api/v1/projects/",
+        json={"name": "Cached feed entry", "is_public": True},
+        headers=normal_user_token_headers,
+    )
+    project_id = res.json()["id"]
+    assert (await client.post(f"/api/v1/projects/{project_id}/like", headers=normal_user_token_headers)).json() is True
+
+    params = {"query": "Cached feed entry"}
+    anonymous = (await client.get("/api/v1/projects/feed", params=params)).json()
+    assert [(p["likes_count"], p["is_liked"]) for p in anonymous] == [(1, False)]
+
+    project_queries = []
+
+    def count(conn, cursor, statement, parameters, context, executemany):
+        if "FROM projects" in statement:
+            project_queries.append(statement)
+
+    event.listen(db_engine.sync_engine, "before_cursor_execute", count)
+    try:
+        mine = (await client.get("/api/v1/projects/feed", params=params, headers=normal_user_token_headers)).json()
+    finally:
+        event.remove(db_engine.sync_engine, "before_cursor_execute", count)
+    # Served from the shared page; counts and the viewer's likes in one query
+    assert len(project_queries) == 1
+    assert [(p["likes_count"], p["is_liked"]) for p in mine] == [(1, True)]
+
+    # A like does not drop the cached page, yet its count shows at once
+    assert (await client.post(f"/api/v1/projects/{project_id}/like", headers=normal_user_token_headers)).json() is False
+    project_queries.clear()
+    event.listen(db_engine.sync_engine, "before_cursor_execute", count)
+    try:
+        feed = (await client.get("/api/v1/projects/feed", params=params)).json()
+    finally:
+        event.remove(db_engine.sync_engine, "before_cursor_execute", count)
+    assert len(project_queries) == 1
+    assert [(p["likes_count"], p["is_liked"]) for p in feed] == [(0, False)]
+
+    res = await client.put(
+        f"/api/v1/projects/{project_id}", json={"description": "edited"}, headers=normal_user_token_headers
+    )
+    assert res.status_code == 200
+    feed = (await client.get("/api/v1/projects/feed", params=params)).json()
+    assert feed[0]["description"] == "edited"
+
+
+@pytest.mark.asyncio
+async def test_project_list_limits_are_clamped(client: AsyncClient, normal_user_token_headers, normal_user):
+    for i in range(2):
+        await client.post("/api/v1/projects/", json={"name": f"Clamped {i}", "is_public": True}, headers=normal_user_token_headers)
+    for url in ("/api/v1/projects/feed", "/api/v1/projects/", f"/api/v1/users/{normal_user.id}/projects"):
+        response = await client.get(url, params={"limit": 0}, headers=normal_user_token_headers)
+        assert response.status_code == 200
+        assert len(response.json()) == 1
+        assert "X-Next-Cursor" in response.headers
@@ -0,0 +1,69 @@
+import random
+
+from app.services.graph_stats import BranchGraphStats
+
+
+def _legacy_branch_stats(commits, heads, total_project_score):
+    # Reference: the original per-branch BFS from BranchService.get_project_graph
+    commits_map = {c["id"]: c for c in commits}
+    out = {}
+    for key, head in heads.items():
+        stats = {"commit_count": 0, "contributors": {}, "total_score": 0}
+        visited = set()
+        queue = [head] if head else []
+        while queue:
+            h = queue.pop(0)
+            if not h or h in visited or h not in commits_map:
+                continue
+            visited.add(h)
+            c = commits_map[h]
+            stats["commit_count"] += 1
+            stats["total_score"] += c["score"]
+            uid = c["author_id"]
+            if uid:
+                entry = stats["contributors"].setdefault(uid, {"name": f"User {uid}", "count": 0, "score": 0})
+                entry["count"] += 1
+                entry["score"] += c["score"]
+            if c["parent_hash"]:
+                queue.append(c["parent_hash"])
+        branch_total = stats["total_score"] or 1
+        contributors = [
+            {"name": d["name"], "count": d["count"], "score": d["score"], "percent": round((d["score"] / branch_total) * 100, 1)}
+            for d in stats["contributors"].values()
+        ]
+        contributors.sort(key=lambda x: x["score"], reverse=True)
+        out[key] = {
+            "contributors": contributors,
+            "project_percent": round((stats["total_score"] / total_project_score) * 100, 1),
+            "commit_count": stats["commit_count"],
+        }
+    return out
+
+
+def _random_history(rng, n_commits, n_branches, n_authors=5):
+    commits = []
+    for i in range(n_commits):
+        parent = commits[rng.randrange(len(commits))]["id"] if commits and rng.random() > 0.02 else None
+        commits.append(
+            {"id": f"c{i}", "parent_hash": parent, "author_id": rng.randint(1, n_authors), "score": 1 + 0.5 * rng.randint(0, 4)}
+        )
+    heads = {f"b{j}": rng.choice(commits)["id"] for j in range(n_branches)}
+    heads["empty"] = None
+    heads["dangling"] = "missing-commit"
+    return commits, heads
+
+
+def test_single_pass_matches_per_branch_walk():
+    rng = random.Random(7)
+    commits, heads = _random_history(rng, 400, 40)
+    engine = BranchGraphStats()
+    for c in reversed(commits):  # insertion order must not matter
+        engine.add_commit(c["id"], c["parent_hash"], c["author_id"], c["score"])
+    for key, head in heads.items():
+        engine.set_head(key, head)
+    engine.compute()
+
+    expected = _legacy_branch_stats(commits, heads, sum(c["score"] for c in commits))
+    for key in heads:
+        assert engine.branch_summary(key, lambda uid: f"User {uid}") == expected[key]
+
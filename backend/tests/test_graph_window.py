@@ -0,0 +1,81 @@
+import uuid
+
+import pytest
+
+from app.models.branch import Branch
+from app.models.commit import Commit
+from app.models.project import Project
+from app.services.ancestry_service import AncestryService
+
+
+async def _commit_chain(db_session, project, owner, parent, n, prefix):
+    ids = []
+    for i in range(n):
+        cid = f"{prefix}-{i:03d}-{uuid.uuid4().hex[:6]}"
+        generation, jump = await AncestryService.index_entry(db_session, cid, parent)
+        db_session.add(
+            Commit(
+                id=cid,
+                project_id=project.internal_id,
+                author_id=owner.internal_id,
+                message=cid,
+                parent_hash=parent,
+                video_assets={},
+                generation=generation,
+                jump_hash=jump,
+            )
+        )
+        await db_session.flush()
+        ids.append(cid)
+        parent = cid
+    return ids
+
+
+@pytest.mark.asyncio
+async def test_graph_window_pages_through_history(client, db_session, normal_user, normal_user_token_headers):
+    project = Project(name=f"window-{uuid.uuid4().hex[:6]}", owner_internal_id=normal_user.internal_id)
+    db_session.add(project)
+    await db_session.flush()
+    trunk = await _commit_chain(db_session, project, normal_user, None, 30, "trunk")
+    fork = await _commit_chain(db_session, project, normal_user, trunk[19], 15, "fork")
+    db_session.add(Branch(name="main", project_id=project.internal_id, head_commit_id=trunk[-1]))
+    db_session.add(Branch(name="dev", project_id=project.internal_id, head_commit_id=fork[-1]))
+    await db_session.commit()
+
+    url = f"/api/v1/projects/{project.public_id}/graph/window"
+    seen = []
+    cursor = None
+    pages = 0
+    while True:
+        params = {"depth": 4, "limit": 5}
+        if cursor:
+            params["cursor"] = cursor
+        res = await client.get(url, params=params, headers=normal_user_token_headers)
+        assert res.status_code == 200
+        data = res.json()
+        assert len(data["commits"]) <= 5
+        assert {b["name"] for b in data["branches"]} == {"main", "dev"}
+        window = {c["id"] for c in data["commits"]}
+        for stub in data["edge_stubs"]:
+            assert stub["commit_id"] in window and stub["parent_hash"] not in window
+        seen.extend(c["id"] for c in data["commits"])
+        pages += 1
+        cursor = data["next_cursor"]
+        if not data["has_more"]:
+            break
+    assert pages > 1
+    assert sorted(seen) == sorted(trunk + fork)
+    gens = [c.generation for c in [await db_session.get(Commit, cid) for cid in seen]]
+    assert gens == sorted(gens, reverse=True)
+
+    res = await client.get(url, params={"branch_name": "dev", "depth": 10}, headers=normal_user_token_headers)
+    data = res.json()
+    assert [c["id"] for c in data["commits"]] == list(reversed(fork))[:10]
+    res = await client.get(url, params={"branch_name": "dev", "depth": 10, "cursor": data["next_cursor"]}, headers=normal_user_token_headers)
+    data = res.json()
+    assert [c["id"] for c in data["commits"]] == list(reversed(fork))[10:] + list(reversed(trunk[:20]))[:5]
+
+    res = await client.get(url, params={"cursor": "bogus"}, headers=normal_user_token_headers)
+    assert res.status_code == 400
+    res = await client.get(url, params={"branch_name": "missing"}, headers=normal_user_token_headers)
+    assert res.status_code == 404
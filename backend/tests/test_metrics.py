@@ -0,0 +1,92 @@
+import pytest
+from httpx import AsyncClient
+
+from app.core import task_metrics
+from app.core.cache import cache
+from app.core.config import settings
+from app.core.metrics import registry
+
+
+class _FakeRedis:
+    """Just enough of the sync (worker) and asyncio (API) clients over one dict."""
+
+    def __init__(self, data=None, is_async=False):
+        self.data = {} if data is None else data
+        self.is_async = is_async
+        self.ops = []
+
+    def pipeline(self, transaction=False):
+        return _FakeRedis(self.data, self.is_async)
+
+    def sadd(self, key, member):
+        self.ops.append(lambda: self.data.setdefault(key, set()).add(member))
+
+    def hincrby(self, key, field, amount):
+        self.ops.append(lambda: self._incr(key, field, amount, int))
+
+    def hincrbyfloat(self, key, field, amount):
+        self.ops.append(lambda: self._incr(key, field, amount, float))
+
+    def _incr(self, key, field, amount, kind):
+        h = self.data.setdefault(key, {})
+        h[field] = str(kind(h.get(field, 0)) + amount)
+
+    def hgetall(self, key):
+        self.ops.append(lambda: dict(self.data.get(key, {})))
+
+    def execute(self):
+        results = [op() for op in self.ops]
+        if not self.is_async:
+            return results
+
+        async def done():
+            return results
+
+        return done()
+
+    async def smembers(self, key):
+        return set(self.data.get(key, set()))
+
+
+@pytest.mark.asyncio
+async def test_metrics_endpoint_exposes_routes_cache_and_tasks(client: AsyncClient, normal_user, monkeypatch):
+    monkeypatch.setattr(settings, "METRICS_CELERY_QUEUES", [])
+    # Earlier tests in the session were counted too
+    for metric in registry.metrics:
+        metric.values.clear()
+    store = {}
+    monkeypatch.setattr(task_metrics, "_client", lambda: _FakeRedis(store))
+    monkeypatch.setattr(cache, "redis", _FakeRedis(store, is_async=True))
+    monkeypatch.setattr(cache, "_redis_available", lambda: True)
+
+    task_metrics.record_task_run("app.workers.publish_tasks.publish_job", 0.3, "SUCCESS")
+    task_metrics.record_task_run("app.workers.publish_tasks.publish_job", 42.0, "FAILURE")
+
+    monkeypatch.setattr(cache, "_redis_available", lambda: False)
+    assert (await client.get("/api/v1/projects/feed")).status_code == 200
+    assert (await client.get("/api/v1/projects/feed")).status_code == 200
+    await client.get(f"/api/v1/users/{normal_user.id}/projects")
+    monkeypatch.setattr(cache, "_redis_available", lambda: True)
+
+    res = await client.get("/metrics")
+    assert res.status_code == 200
+    assert res.headers["content-type"].startswith("text/plain")
+    body = res.text
+    assert 'http_requests_total{method="GET",route="/api/v1/projects/feed",status="200"} 2' in body
+    assert 'http_request_duration_seconds_count{method="GET",route="/api/v1/projects/feed"} 2' in body
+    assert 'http_requests_total{method="GET",route="/api/v1/users/{user_id}/projects",status="200"} 1' in body
+    assert 'cache_lookups_total{prefix="feed",result="miss"} 1' in body
+    assert 'cache_lookups_total{prefix="feed",result="local_hit"} 1' in body
+    task = 'task="app.workers.publish_tasks.publish_job"'
+    assert f'celery_task_runtime_seconds_bucket{{{task},le="0.5"}} 1' in body
+    assert f'celery_task_runtime_seconds_bucket{{{task},le="+Inf"}} 2' in body
+    assert f'celery_tasks_total{{{task},state="FAILURE"}} 1' in body
+
+
+@pytest.mark.asyncio
+async def test_metrics_token(client: AsyncClient, monkeypatch):
+    monkeypatch.setattr(settings, "METRICS_CELERY_QUEUES", [])
+    monkeypatch.setattr(settings, "METRICS_TOKEN", "scrape-secret")
+    assert (await client.get("/metrics")).status_code == 401
+    ok = await client.get("/metrics", headers={"Authorization": "Bearer scrape-secret"})
+    assert ok.status_code == 200 and "# TYPE http_requests_total counter" in ok.text
@@ -21,3 +21,103 @@ async def test_fork_sets_parent_project_id(client: AsyncClient, normal_user_toke
     fork_data = fork_res.json()
     assert fork_data["parent_project_id"] == source_id
 
+
+
+@pytest.mark.asyncio
+async def test_fork_shares_history_without_copying(client: AsyncClient, db_session, normal_user, normal_user_token_headers):
+    from sqlalchemy import func, select
+
+    from app.models.commit import Commit
+    from app.models.project import Project
+    from app.services.ancestry_service import AncestryService
+    from app.services.commit_service import CommitService
+
+    res = await client.post("/api/v1/projects/", json={"name": "Big Source"}, headers=normal_user_token_headers)
+    source_public_id = res.json()["id"]
+    source_id = (await db_session.execute(select(Project.internal_id).where(Project.public_id == source_public_id))).scalar()
+    ids = []
+    for i in range(5):
+        c = await CommitService.create_commit(db_session, source_id, normal_user.internal_id, f"c{i}", {"clips": [{"id": n} for n in range(i + 1)]}, "main")
+        ids.append(c.id)
+
+    async def commit_count():
+        return (await db_session.execute(select(func.count()).select_from(Commit))).scalar()
+
+    before = await commit_count()
+    res = await client.post(f"/api/v1/projects/{source_public_id}/fork", json={"commit_hash": ids[2]}, headers=normal_user_token_headers)
+    assert res.status_code == 200
+    fork = res.json()
+    assert fork["fork_commit_id"] == ids[2]
+    assert await commit_count() == before
+
+    res = await client.get(f"/api/v1/projects/{fork['id']}/head", headers=normal_user_token_headers)
+    assert res.json()["commit_id"] == ids[2]
+
+    # Work in the fork builds on the shared commit and is owned by the fork
+    fork_id = (await db_session.execute(select(Project.internal_id).where(Project.public_id == fork["id"]))).scalar()
+    own = await CommitService.create_commit(db_session, fork_id, normal_user.internal_id, "fork work", {"clips": []}, "main")
+    own_id = own.id
+    assert own.parent_hash == ids[2] and own.project_id == fork_id
+    assert await AncestryService.merge_base(db_session, own_id, ids[4]) == ids[2]
+
+    res = await client.get(f"/api/v1/projects/{fork['id']}/graph", headers=normal_user_token_headers)
+    assert {c["id"] for c in res.json()["commits"]} == {ids[0], ids[1], ids[2], own_id}
+    res = await client.get(f"/api/v1/projects/{fork['id']}/graph/window", params={"depth": 2}, headers=normal_user_token_headers)
+    assert [c["id"] for c in res.json()["commits"]] == [own_id, ids[2]]
+
+    res = await client.get(f"/api/v1/projects/{fork['id']}/lineage", headers=normal_user_token_headers)
+    assert res.json()["ancestors"] == [{"id": source_public_id, "name": "Big Source", "forked_at": ids[2]}]
+    res = await client.get(f"/api/v1/projects/{source_public_id}/lineage", headers=normal_user_token_headers)
+    assert [f["id"] for f in res.json()["forks"]] == [fork["id"]]
+
+    res = await client.post(f"/api/v1/projects/{source_public_id}/fork", json={"commit_hash": "0" * 40}, headers=normal_user_token_headers)
+    assert res.status_code == 404
+
+    # Deleting the source hands the shared history over to the fork
+    source = await db_session.get(Project, source_id)
+    from app.services.project_service import ProjectService
+
+    await ProjectService.delete_project(db_session, source)
+    owners = dict((await db_session.execute(select(Commit.id, Commit.project_id).where(Commit.id.in_(ids)))).all())
+    assert owners == {ids[0]: fork_id, ids[1]: fork_id, ids[2]: fork_id}
+    res = await client.get(f"/api/v1/projects/{fork['id']}/head", headers=normal_user_token_headers)
+    assert res.json()["commit_id"] == own_id
+
+
+@pytest.mark.asyncio
+async def test_deleting_source_then_first_fork_keeps_second_fork_history(db_session, normal_user):
+    from sqlalchemy import select
+
+    from app.models.branch import Branch
+    from app.models.commit import Commit
+    from app.models.project import Project
+    from app.services.commit_service import CommitService
+    from app.services.project_service import ProjectService
+
+    source = Project(name="Source", owner_internal_id=normal_user.internal_id)
+    db_session.add(source)
+    await db_session.flush()
+    db_session.add(Branch(name="main", project_id=source.internal_id))
+    await db_session.commit()
+    source_id = source.internal_id
+    ids = []
+    for i in range(3):
+        c = await CommitService.create_commit(db_session, source_id, normal_user.internal_id, f"c{i}", {"clips": [{"id": i}]}, "main")
+        ids.append(c.id)
+
+    first = await ProjectService.fork_project(db_session, source_id, normal_user.internal_id, ids[1])
+    second = await ProjectService.fork_project(db_session, source_id, normal_user.internal_id, ids[2])
+    first_id, second_id = first.internal_id, second.internal_id
+    own = await CommitService.create_commit(db_session, second_id, normal_user.internal_id, "second work", {"clips": []}, "main")
+    own_id = own.id
+
+    await ProjectService.delete_project(db_session, await db_session.get(Project, source_id))
+    await ProjectService.delete_project(db_session, await db_session.get(Project, first_id))
+
+    everything = ids + [own_id]
+    owners = dict((await db_session.execute(select(Commit.id, Commit.project_id).where(Commit.id.in_(everything)))).all())
+    assert owners == {cid: second_id for cid in everything}
+    head = (
+        await db_session.execute(select(Branch.head_commit_id).where(Branch.project_id == second_id, Branch.name == "main"))
+    ).scalar_one()
+    assert head == own_id
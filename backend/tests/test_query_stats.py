@@ -0,0 +1,91 @@
+import logging
+
+import pytest
+from httpx import AsyncClient
+
+from app.core.query_stats import statement_shape
+from app.models.branch import Branch
+from app.models.clip_segment import ClipSegment
+from app.models.merge_request import MergeRequest
+from app.models.project import Project
+
+
+async def _project_with_branches(db_session, owner, n_branches: int):
+    project = Project(name="Budgeted", owner_internal_id=owner.internal_id, is_public=True)
+    db_session.add(project)
+    await db_session.flush()
+    branches = [Branch(name=f"b{i}", project_id=project.internal_id) for i in range(n_branches)]
+    db_session.add_all(branches)
+    await db_session.flush()
+    return project, branches
+
+
+def test_statement_shape_ignores_placeholder_list_length():
+    a = statement_shape("SELECT x FROM t WHERE id IN (?, ?, ?)")
+    b = statement_shape("SELECT x\n  FROM t WHERE id IN ($1)")
+    assert a == b == "SELECT x FROM t WHERE id IN (?)"
+
+
+@pytest.mark.asyncio
+async def test_server_timing_header_and_n_plus_one_warning(client: AsyncClient, monkeypatch, caplog):
+    from app.core.config import settings
+
+    res = await client.get("/api/v1/projects/feed")
+    assert res.status_code == 200
+    timing = res.headers["server-timing"]
+    assert timing.startswith("db;dur=") and "queries" in timing
+
+    monkeypatch.setattr(settings, "DB_N_PLUS_ONE_THRESHOLD", 1)
+    with caplog.at_level(logging.WARNING, logger="app.db.n_plus_one"):
+        await client.get("/api/v1/projects/feed", params={"query": "no such project"})
+    assert any("possible N+1: GET /api/v1/projects/feed" in r.getMessage() for r in caplog.records)
+
+
+@pytest.mark.asyncio
+async def test_clip_and_merge_request_lists_stay_within_query_budget(
+    db_session, client: AsyncClient, normal_user, normal_user_token_headers, query_budget
+):
+    project, branches = await _project_with_branches(db_session, normal_user, 6)
+    db_session.add_all(
+        [
+            ClipSegment(owner_internal_id=normal_user.internal_id, project_internal_id=project.internal_id, branch_id=b.internal_id)
+            for b in branches
+        ]
+        + [
+            MergeRequest(
+                creator_internal_id=normal_user.internal_id,
+                project_internal_id=project.internal_id,
+                source_branch_id=b.internal_id,
+                target_branch_id=branches[0].internal_id,
+            )
+            for b in branches[1:]
+        ]
+    )
+    await db_session.commit()
+    project_id = project.public_id
+    db_session.expire_all()
+
+    # Cost does not grow with the number of clips / merge requests on the page
+    with query_budget(4, max_repeats=1):
+        res = await client.get("/api/v1/clips/", headers=normal_user_token_headers)
+    assert res.status_code == 200
+    assert sorted(c["branch_name"] for c in res.json()) == [f"b{i}" for i in range(6)]
+    assert {c["project_id"] for c in res.json()} == {project_id}
+
+    with query_budget(5, max_repeats=1):
+        res = await client.get(f"/api/v1/projects/{project_id}/merge-requests", headers=normal_user_token_headers)
+    assert res.status_code == 200
+    assert sorted(m["source_branch_name"] for m in res.json()) == [f"b{i}" for i in range(1, 6)]
+    assert {m["target_branch_name"] for m in res.json()} == {"b0"}
+
+
+@pytest.mark.asyncio
+async def test_query_budget_fails_on_per_row_queries(db_session, normal_user, query_budget):
+    from sqlalchemy import select
+
+    _project, branches = await _project_with_branches(db_session, normal_user, 3)
+    await db_session.commit()
+    with pytest.raises(AssertionError, match="N\\+1"):
+        with query_budget(10, max_repeats=1):
+            for b in branches:
+                await db_session.execute(select(Branch.name).where(Branch.internal_id == b.internal_id))
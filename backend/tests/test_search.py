@@ -0,0 +1,66 @@
+import importlib.util
+from pathlib import Path
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy.dialects import postgresql
+
+from app.models.project import Project
+from app.models.user import User
+from app.services.search_service import project_search_vector
+
+
+def test_search_vector_matches_migration_index():
+    path = next(Path(__file__).resolve().parents[1].glob("alembic/versions/*_add_search_indexes.py"))
+    spec = importlib.util.spec_from_file_location("search_migration", path)
+    migration = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(migration)
+
+    compiled = str(project_search_vector().compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}))
+    assert compiled.replace("projects.", "") == migration.PROJECT_SEARCH_VECTOR
+
+
+@pytest.mark.asyncio
+async def test_project_search_ranks_by_relevance(db_session, client: AsyncClient, normal_user):
+    owner = normal_user.internal_id
+    db_session.add_all(
+        [
+            Project(name="Harbor at dusk", description="zephyrine lighthouse study", owner_internal_id=owner, is_public=True),
+            Project(name="Zephyrine lighthouse", description="coastal short", owner_internal_id=owner, is_public=True),
+            Project(name="Zephyrine", description=None, tags=["lighthouse"], owner_internal_id=owner, is_public=True),
+            Project(name="Zephyrine draft", description="lighthouse", owner_internal_id=owner, is_public=False),
+            Project(name="Unrelated", description="lighthouse", owner_internal_id=owner, is_public=True),
+        ]
+    )
+    await db_session.commit()
+
+    res = await client.get("/api/v1/projects/feed", params={"query": "zephyrine lighthouse", "sort": "relevance"})
+    assert res.status_code == 200
+    assert [p["name"] for p in res.json()] == ["Zephyrine lighthouse", "Zephyrine", "Harbor at dusk"]
+
+    # Cursor pages follow the relevance order
+    first = await client.get("/api/v1/projects/feed", params={"query": "zephyrine lighthouse", "sort": "relevance", "limit": 2})
+    rest = await client.get(
+        "/api/v1/projects/feed",
+        params={"query": "zephyrine lighthouse", "sort": "relevance", "cursor": first.headers["x-next-cursor"]},
+    )
+    assert [p["name"] for p in rest.json()] == ["Harbor at dusk"]
+
+    # LIKE wildcards in the query are matched literally
+    res = await client.get("/api/v1/projects/feed", params={"query": "%"})
+    assert all("%" in p["name"] or "%" in (p["description"] or "") for p in res.json())
+
+
+@pytest.mark.asyncio
+async def test_user_search_prefers_prefix_matches(db_session, client: AsyncClient):
+    db_session.add_all(
+        [
+            User(email="someone.quillon@example.com", full_name="A. Person", hashed_password="x"),
+            User(email="quillon@example.com", full_name="Quillon Marsh", hashed_password="x"),
+        ]
+    )
+    await db_session.commit()
+
+    res = await client.get("/api/v1/users/search", params={"query": "quillon"})
+    assert res.status_code == 200
+    assert [u["email"] for u in res.json()] == ["quillon@example.com", "someone.quillon@example.com"]
@@ -0,0 +1,47 @@
+import logging
+
+import pytest
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.core import db as db_module
+from app.core.config import settings
+from app.core.slow_query import install_slow_query_log
+from app.models.base import Base
+from app.models.user import User
+
+
+@pytest.mark.asyncio
+async def test_slow_queries_are_logged_redacted_with_plan(tmp_path, monkeypatch, caplog):
+    monkeypatch.setattr(settings, "DB_SLOW_QUERY_MS", 0.0001)
+    monkeypatch.setattr(settings, "DB_SLOW_QUERY_EXPLAIN", True)
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'slow.db'}")
+    install_slow_query_log(engine.sync_engine)
+    try:
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        caplog.clear()
+        with caplog.at_level(logging.WARNING, logger="app.db.slow_query"):
+            async with engine.connect() as conn:
+                rows = await conn.execute(select(User.internal_id).where(User.email == "secret@example.com"))
+                assert rows.all() == []
+    finally:
+        await engine.dispose()
+
+    logged = [r.getMessage() for r in caplog.records if "FROM users" in r.getMessage()]
+    assert logged
+    assert "secret@example.com" not in logged[0]
+    assert "params=['str'" in logged[0]
+    assert "plan:" in logged[0] and "ix_users_email" in logged[0]
+
+
+def test_engine_options_follow_settings(monkeypatch):
+    monkeypatch.setattr(settings, "DB_STATEMENT_CACHE_SIZE", 0)
+    options = db_module.engine_options("postgresql+asyncpg://u:p@db/evidverse")
+    assert options["echo"] is False
+    assert options["pool_size"] == settings.DB_POOL_SIZE and options["pool_pre_ping"] is True
+    assert options["connect_args"] == {"prepared_statement_cache_size": 0, "statement_cache_size": 0}
+    assert options["json_serializer"]({"名": [1, 2]}) == '{"名":[1,2]}'
+
+    sqlite_options = db_module.engine_options("sqlite+aiosqlite:///:memory:")
+    assert "pool_size" not in sqlite_options and "connect_args" not in sqlite_options
@@ -0,0 +1,89 @@
+import uuid
+
+import pytest
+
+from app.models.commit import Commit
+from app.models.project import Project
+from app.models.snapshot import SnapshotObject
+from app.services.commit_service import CommitService
+from app.services.snapshot_service import SnapshotService, build_snapshot, split_snapshot
+from sqlalchemy import func, select
+
+
+def _timeline(n, changed=None):
+    clips = [
+        {"id": i, "video_url": f"https://cdn.example.com/clips/{i}.mp4", "prompt": f"shot {i} " * 8, "duration": 4.0}
+        for i in range(n)
+    ]
+    if changed is not None:
+        clips[changed]["duration"] = 6.5
+    return {"version": 3, "clips": clips, "settings": {"fps": 24, "resolution": [1920, 1080]}}
+
+
+def test_split_round_trip_preserves_document():
+    for value in [{}, {"a": None}, _timeline(0), _timeline(5), _timeline(200), [1, [2, [3]]], "x"]:
+        root, objects = split_snapshot(value)
+        rebuilt = build_snapshot(root, {h: (k, d) for h, (k, d, _e) in objects.items()})
+        assert rebuilt == value
+        if isinstance(value, dict):
+            assert list(rebuilt.keys()) == list(value.keys())
+
+
+def test_one_changed_clip_shares_everything_else():
+    base_root, base = split_snapshot(_timeline(200))
+    new_root, new = split_snapshot(_timeline(200, changed=150))
+    assert base_root != new_root
+    added = set(new) - set(base)
+    # the clip, its chunk, the chunk list and the root
+    assert len(added) == 4
+    import json
+
+    full = len(json.dumps(_timeline(200)))
+    written = sum(len(json.dumps([new[h][0], new[h][1]])) for h in added)
+    assert written * 10 < full
+
+
+@pytest.mark.asyncio
+async def test_commits_store_snapshot_objects_once(db_session, normal_user):
+    project = Project(name=f"snap-{uuid.uuid4().hex[:6]}", owner_internal_id=normal_user.internal_id)
+    db_session.add(project)
+    await db_session.commit()
+
+    async def object_count():
+        return (await db_session.execute(select(func.count()).select_from(SnapshotObject))).scalar()
+
+    c1 = await CommitService.create_commit(db_session, project.internal_id, normal_user.internal_id, "one", _timeline(200), "main")
+    after_first = await object_count()
+    c2 = await CommitService.create_commit(
+        db_session, project.internal_id, normal_user.internal_id, "two", _timeline(200, changed=7), "main"
+    )
+    assert await object_count() - after_first == 4
+    c3 = await CommitService.create_commit(db_session, project.internal_id, normal_user.internal_id, "three", _timeline(200), "main")
+    assert await object_count() - after_first == 4
+    assert c3.tree_hash == c1.tree_hash
+    inline = await db_session.execute(select(Commit.video_assets).where(Commit.id == c1.id))
+    assert inline.scalar() is None
+
+    SnapshotService._cache.clear()
+    assert await SnapshotService.load(db_session, c2) == _timeline(200, changed=7)
+    assert await SnapshotService.load(db_session, c1) == _timeline(200)
+
+    legacy = Commit(
+        id=uuid.uuid4().hex,
+        project_id=project.internal_id,
+        author_id=normal_user.internal_id,
+        message="legacy",
+        video_assets={"clips": [1]},
+    )
+    db_session.add(legacy)
+    await db_session.commit()
+    assert await SnapshotService.load(db_session, legacy) == {"clips": [1]}
+
+
+@pytest.mark.asyncio
+async def test_rolled_back_objects_are_not_served_from_cache(db_session):
+    value = {"clips": [{"id": uuid.uuid4().hex, "duration": 2.0, "prompt": "rolled back " * 20}]}
+    root = await SnapshotService.put(db_session, value)
+    await db_session.rollback()
+    with pytest.raises(LookupError):
+        await SnapshotService.get(db_session, root)
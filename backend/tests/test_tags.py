@@ -0,0 +1,41 @@
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import select
+
+from app.models.tag import ProjectTag
+
+
+async def _count(client: AsyncClient, tag: str) -> int:
+    res = await client.get("/api/v1/tags/trending", params={"limit": 200})
+    assert res.status_code == 200
+    return next((t["count"] for t in res.json() if t["tag"] == tag), 0)
+
+
+@pytest.mark.asyncio
+async def test_tag_index_follows_project_writes(db_session, client: AsyncClient, normal_user_token_headers):
+    headers = normal_user_token_headers
+    a = (await client.post("/api/v1/projects/", json={"name": "Tagged A", "is_public": True, "tags": ["noir", " rain ", "noir"]}, headers=headers)).json()
+    b = (await client.post("/api/v1/projects/", json={"name": "Tagged B", "is_public": True, "tags": ["noir"]}, headers=headers)).json()
+    c = (await client.post("/api/v1/projects/", json={"name": "Tagged C", "is_public": False, "tags": ["noir"]}, headers=headers)).json()
+    assert a["tags"] == ["noir", "rain"]
+    assert await _count(client, "noir") == 2  # private projects are not counted
+    assert await _count(client, "rain") == 1
+
+    feed = (await client.get("/api/v1/projects/feed", params={"tag": "noir", "limit": 100})).json()
+    assert {p["id"] for p in feed} >= {a["id"], b["id"]} and c["id"] not in {p["id"] for p in feed}
+
+    await client.put(f"/api/v1/projects/{a['id']}", json={"tags": ["noir", "neon"]}, headers=headers)
+    await client.put(f"/api/v1/projects/{c['id']}", json={"is_public": True}, headers=headers)
+    await client.put(f"/api/v1/projects/{b['id']}", json={"is_public": False}, headers=headers)
+    assert await _count(client, "rain") == 0
+    assert await _count(client, "neon") == 1
+    assert await _count(client, "noir") == 2
+    assert [p["id"] for p in (await client.get("/api/v1/projects/feed", params={"tag": "rain"})).json()] == []
+
+    from app.services.project_service import ProjectService
+
+    await ProjectService.delete_project(db_session, await ProjectService.resolve_project(db_session, a["id"]))
+    assert await _count(client, "noir") == 1
+    assert await _count(client, "neon") == 0
+    rows = (await db_session.execute(select(ProjectTag.tag).where(ProjectTag.tag == "neon"))).all()
+    assert rows == []
@@ -0,0 +1,85 @@
+import pytest
+from httpx import AsyncClient
+
+from app.core import tracing
+from app.core.celery_app import celery_app
+from app.core.config import settings
+
+REMOTE_TRACE_ID = "4bf92f3577b34da6a3ce929d0e0e4736"
+REMOTE_PARENT = f"00-{REMOTE_TRACE_ID}-00f067aa0ba902b7-01"
+
+
+@celery_app.task(name="tests.test_tracing.traced_task")
+def traced_task() -> dict:
+    return tracing.inject({})
+
+
+@pytest.fixture
+def spans(monkeypatch):
+    finished = []
+    monkeypatch.setattr(settings, "TRACING_EXPORTER", "file")
+    monkeypatch.setattr(tracing.exporter, "export", finished.append)
+    return finished
+
+
+@pytest.mark.asyncio
+async def test_request_continues_trace_and_records_db_spans(client: AsyncClient, normal_user, spans):
+    response = await client.get(
+        f"/api/v1/users/{normal_user.id}/projects", headers={"traceparent": REMOTE_PARENT}
+    )
+    assert response.status_code == 200
+    assert response.headers["X-Trace-Id"] == REMOTE_TRACE_ID
+
+    server = next(s for s in spans if s.kind == tracing.SERVER)
+    assert server.name == "GET /api/v1/users/{user_id}/projects"
+    assert server.context.trace_id == REMOTE_TRACE_ID
+    assert server.parent_id == "00f067aa0ba902b7"
+    assert server.attributes["http.status_code"] == 200
+
+    queries = [s for s in spans if s.name == "db.query"]
+    assert queries
+    assert all(q.parent_id == server.context.span_id for q in queries)
+    assert all(q.context.trace_id == REMOTE_TRACE_ID for q in queries)
+
+
+def test_task_span_continues_publisher_context(spans):
+    with tracing.span("publisher") as publisher:
+        headers = {}
+        tracing._inject_task_headers(headers=headers)
+    assert tracing.parse_traceparent(headers["traceparent"]).span_id == publisher.context.span_id
+
+    outgoing = traced_task.apply(headers=headers).result
+
+    task = next(s for s in spans if s.name == "celery.task tests.test_tracing.traced_task")
+    assert task.parent_id == publisher.context.span_id
+    assert task.context.trace_id == publisher.context.trace_id
+    assert task.attributes["celery.state"] == "SUCCESS"
+    # Provider calls made by the task carry the task's span as their parent
+    assert tracing.parse_traceparent(outgoing["traceparent"]).span_id == task.context.span_id
+    assert tracing.current() is None
+
+
+def test_tracing_off_and_sampling(monkeypatch, spans):
+    monkeypatch.setattr(settings, "TRACING_SAMPLE_RATE", 0.0)
+    with tracing.span("unsampled") as root:
+        with tracing.span("child") as child:
+            assert tracing.inject({})["traceparent"].endswith("-00")
+    assert child.context.trace_id == root.context.trace_id
+    assert spans == []
+
+    monkeypatch.setattr(settings, "TRACING_EXPORTER", "")
+    with tracing.span("off") as off:
+        assert off is None
+        assert tracing.inject({}) == {}
+    assert tracing.parse_traceparent("00-" + "0" * 32 + "-00f067aa0ba902b7-01") is None
+
+
+def test_otlp_encoding(spans):
+    with pytest.raises(RuntimeError):
+        with tracing.span("s3.put_object", tracing.CLIENT, bucket="media", size=3):
+            raise RuntimeError("denied")
+    encoded = tracing.otlp_span(spans[0])
+    assert encoded["kind"] == tracing.CLIENT
+    assert "parentSpanId" not in encoded
+    assert encoded["status"] == {"code": 2, "message": "denied"}
+    assert {"key": "size", "value": {"intValue": "3"}} in encoded["attributes"]
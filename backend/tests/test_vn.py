@@ -68,3 +68,32 @@ async def test_vn_asset_and_parse_preview(client: AsyncClient):
     assert logs.status_code == 200
     logs_data = logs.json()
     assert isinstance(logs_data.get("items"), list)
+
+
+@pytest.mark.asyncio
+async def test_vn_assets_cursor_pagination(client: AsyncClient):
+    email = "vn_pages@example.com"
+    await client.post("/api/v1/auth/register", json={"email": email, "password": "password"})
+    login_res = await client.post("/api/v1/auth/login", data={"username": email, "password": "password"})
+    headers = {"Authorization": f"Bearer {login_res.json()['access_token']}"}
+    project_id = (await client.post("/api/v1/projects/", json={"name": "VN Pages"}, headers=headers)).json()["id"]
+
+    created = []
+    for i in range(5):
+        res = await client.post(
+            "/api/v1/vn/assets",
+            json={"project_id": project_id, "branch_name": "main", "type": "SCREENSHOT", "object_name": f"p{i}.png"},
+            headers=headers,
+        )
+        created.append(res.json()["id"])
+
+    seen, cursor = [], None
+    for _ in range(5):
+        params = {"project_id": project_id, "limit": 2, **({"cursor": cursor} if cursor else {})}
+        res = await client.get("/api/v1/vn/assets", params=params, headers=headers)
+        assert res.status_code == 200
+        seen.extend(a["id"] for a in res.json())
+        cursor = res.headers.get("x-next-cursor")
+        if not cursor:
+            break
+    assert seen == list(reversed(created))
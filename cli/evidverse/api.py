@@ -1,9 +1,24 @@
+import hashlib
+import json
 import requests
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional
 from evidverse.config import get_token
 
 API_BASE_URL = "http://127.0.0.1:8000/api/v1"
 
+def calculate_hash(message: str, parent_hash: Optional[str], video_assets: Dict[str, Any], timestamp: str) -> str:
+    """
+    Commit id as the server computes it (CommitService.calculate_hash).
+    """
+    content = {
+        "message": message,
+        "parent_hash": parent_hash,
+        "video_assets": video_assets,
+        "timestamp": timestamp
+    }
+    content_str = json.dumps(content, sort_keys=True)
+    return hashlib.sha1(content_str.encode("utf-8")).hexdigest()
+
 class APIClient:
     def __init__(self):
         self.base_url = API_BASE_URL
@@ -71,6 +86,18 @@ class APIClient:
         response.raise_for_status()
         return response.json()
     
+    def push_commits(self, project_id: int, commits: List[Dict[str, Any]], branch_name: str, parent_hash: Optional[str] = None) -> Dict[str, Any]:
+        url = f"{self.base_url}/commits/batch"
+        data = {
+            "project_id": project_id,
+            "branch_name": branch_name,
+            "parent_hash": parent_hash,
+            "commits": commits
+        }
+        response = requests.post(url, json=data, headers=self._get_headers())
+        response.raise_for_status()
+        return response.json()
+    
     def get_head(self, project_id: int, branch_name: str = "main") -> Dict[str, Any]:
         url = f"{self.base_url}/projects/{project_id}/head?branch_name={branch_name}"
         response = requests.get(url, headers=self._get_headers())
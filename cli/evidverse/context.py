@@ -1,11 +1,12 @@
 import os
 import json
 from pathlib import Path
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
 
 EVIDVERSE_DIR = ".evidverse"
 CONFIG_FILE = "config.json"
 STAGING_FILE = "staging.json"
+PENDING_FILE = "pending.json"
 
 class Context:
     def __init__(self):
@@ -77,4 +78,21 @@ class Context:
         with open(self.evidverse_path / STAGING_FILE, "w") as f:
             json.dump({}, f, indent=2)
 
+    def get_pending(self) -> List[Dict[str, Any]]:
+        if not self.evidverse_path or not (self.evidverse_path / PENDING_FILE).exists():
+            return []
+        with open(self.evidverse_path / PENDING_FILE, "r") as f:
+            return json.load(f)
+
+    def add_pending(self, commit: Dict[str, Any]):
+        if not self.evidverse_path:
+             raise FileNotFoundError("Not a evidverse repository")
+        self.set_pending(self.get_pending() + [commit])
+
+    def set_pending(self, pending: List[Dict[str, Any]]):
+        if not self.evidverse_path:
+             raise FileNotFoundError("Not a evidverse repository")
+        with open(self.evidverse_path / PENDING_FILE, "w") as f:
+            json.dump(pending, f, indent=2)
+
 context = Context()
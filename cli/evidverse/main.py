@@ -3,11 +3,12 @@ import sys
 import time
 import uuid
 import requests
+from datetime import datetime
 from pathlib import Path
 from rich.console import Console
 from rich.table import Table
 from typing import Optional, Dict, Any
-from evidverse.api import api_client, APIClient
+from evidverse.api import api_client, APIClient, calculate_hash
 from evidverse.config import save_token, get_token, clear_token
 from evidverse.context import context
 from evidverse import __version__
@@ -174,9 +175,28 @@ def generate(prompt: str = typer.Argument(..., help="Text prompt for video gener
     except Exception as e:
         console.print(f"[red]Error: {e}[/red]")
 
+def _remote_head(project_id: int, branch_name: str, config: Dict[str, Any]) -> Optional[str]:
+    """
+    Current HEAD of the branch on the server, or the last one seen when offline.
+    """
+    try:
+        head = APIClient().get_head(project_id, branch_name)
+    except Exception:
+        return config.get("heads", {}).get(branch_name)
+    head_commit = head.get("head_commit") if head else None
+    return head_commit.get("hash") if head_commit else None
+
+def _remember_head(branch_name: str, commit_id: str):
+    heads = context.get_config().get("heads", {})
+    heads[branch_name] = commit_id
+    context.update_config("heads", heads)
+
 @app.command(name="commit")
 @app.command(name="ci", hidden=True, help="Alias for commit")
-def commit(message: str = typer.Option(..., "-m", "--message", help="Commit message")):
+def commit(
+    message: str = typer.Option(..., "-m", "--message", help="Commit message"),
+    offline: bool = typer.Option(False, "--offline", help="Record the commit locally; upload it later with push"),
+):
     """
     Commit staged changes (generated assets).
     """
@@ -188,13 +208,35 @@ def commit(message: str = typer.Option(..., "-m", "--message", help="Commit mess
          console.print("[red]Not a Evidverse repository.[/red]")
          raise typer.Exit(code=1)
 
-    client = APIClient()
     staging = context.get_staging()
     
     if not staging:
         console.print("[yellow]Nothing to commit (staging is empty).[/yellow]")
         return
 
+    if offline:
+        # Chain onto the last pending commit of the branch, else the HEAD last seen,
+        # and hash like the server so a retried push is recognised
+        pending = [item for item in context.get_pending() if item.get("branch_name") == branch_name]
+        if pending:
+            parent_hash_val = pending[-1].get("id")
+        else:
+            parent_hash_val = _remote_head(project_id, branch_name, config)
+        timestamp = datetime.utcnow().isoformat()
+        context.add_pending({
+            "id": calculate_hash(message, parent_hash_val, staging, timestamp),
+            "parent_hash": parent_hash_val,
+            "timestamp": timestamp,
+            "message": message,
+            "video_assets": staging,
+            "branch_name": branch_name,
+        })
+        context.clear_staging()
+        console.print(f"[green]Committed locally ({len(context.get_pending())} pending). Run 'evidverse push' to upload.[/green]")
+        return
+
+    client = APIClient()
+
     try:
         # Get parent hash (HEAD)
         head = client.get_head(project_id, branch_name)
@@ -207,10 +249,50 @@ def commit(message: str = typer.Option(..., "-m", "--message", help="Commit mess
         
         console.print(f"[green]Committed successfully! Commit ID: {commit['id']}[/green]")
         context.clear_staging()
+        _remember_head(branch_name, commit["id"])
         
     except Exception as e:
          console.print(f"[red]Commit failed: {e}[/red]")
 
+@app.command(name="push")
+def push():
+    """
+    Upload commits recorded with --offline, in one request per branch.
+    """
+    try:
+        config = context.get_config()
+        project_id = config["project_id"]
+    except Exception:
+         console.print("[red]Not a Evidverse repository.[/red]")
+         raise typer.Exit(code=1)
+
+    pending = context.get_pending()
+    if not pending:
+        console.print("[yellow]Nothing to push.[/yellow]")
+        return
+
+    client = APIClient()
+    default_branch = config.get("current_branch", "main")
+    while pending:
+        branch_name = pending[0].get("branch_name") or default_branch
+        n = 1
+        while n < len(pending) and (pending[n].get("branch_name") or default_branch) == branch_name:
+            n += 1
+        run = [
+            {key: item[key] for key in ("id", "parent_hash", "timestamp", "message", "video_assets") if key in item}
+            for item in pending[:n]
+        ]
+        try:
+            result = client.push_commits(project_id, run, branch_name)
+        except Exception as e:
+            console.print(f"[red]Push failed: {e}[/red]")
+            return
+        # Drop what the server accepted so a failed later run can be pushed again
+        pending = pending[n:]
+        context.set_pending(pending)
+        _remember_head(branch_name, result["head_commit_id"])
+        console.print(f"[green]Pushed {len(result['created'])} commit(s) to '{branch_name}'. HEAD: {result['head_commit_id'][:7]}[/green]")
+
 @app.command(name="branch")
 @app.command(name="br", hidden=True, help="Alias for branch")
 def branch(name: Optional[str] = typer.Argument(None)):
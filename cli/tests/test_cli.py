@@ -2,6 +2,7 @@ import unittest
 from unittest.mock import MagicMock, patch
 from typer.testing import CliRunner
 from evidverse.main import app
+from evidverse.api import calculate_hash
 from evidverse.context import context
 import json
 from pathlib import Path
@@ -112,5 +113,67 @@ class TestEvidverseCLI(unittest.TestCase):
         output = strip_ansi(result.stdout)
         self.assertIn("Branch 'feature-x' does not exist", output)
 
+    def test_offline_commit_is_queued(self):
+        self.mock_context.get_config.return_value = {"project_id": 123, "current_branch": "main"}
+        self.mock_context.get_staging.return_value = {"shot.mp4": "http://example.com/shot.mp4"}
+        self.mock_context.get_pending.return_value = []
+        self.mock_api.get_head.return_value = {"head_commit": {"hash": "remotehead"}}
+
+        result = runner.invoke(app, ["commit", "-m", "offline work", "--offline"])
+
+        self.assertEqual(result.exit_code, 0)
+        queued = self.mock_context.add_pending.call_args.args[0]
+        self.assertEqual(queued["parent_hash"], "remotehead")
+        self.assertEqual(queued["branch_name"], "main")
+        self.assertEqual(
+            queued["id"],
+            calculate_hash("offline work", "remotehead", {"shot.mp4": "http://example.com/shot.mp4"}, queued["timestamp"]),
+        )
+        self.mock_api.create_commit.assert_not_called()
+
+    def test_offline_commit_chains_onto_pending(self):
+        self.mock_context.get_config.return_value = {"project_id": 123, "current_branch": "main"}
+        self.mock_context.get_staging.return_value = {"b": 1}
+        self.mock_context.get_pending.return_value = [
+            {"id": "first", "parent_hash": None, "message": "a", "video_assets": {"a": 1}, "branch_name": "main"},
+            {"id": "other", "parent_hash": None, "message": "c", "video_assets": {"c": 1}, "branch_name": "dev"},
+        ]
+
+        result = runner.invoke(app, ["commit", "-m", "b", "--offline"])
+
+        self.assertEqual(result.exit_code, 0)
+        self.assertEqual(self.mock_context.add_pending.call_args.args[0]["parent_hash"], "first")
+        self.mock_api.get_head.assert_not_called()
+
+    def test_offline_commit_without_server_uses_last_seen_head(self):
+        self.mock_context.get_config.return_value = {"project_id": 123, "current_branch": "main", "heads": {"main": "seen"}}
+        self.mock_context.get_staging.return_value = {"b": 1}
+        self.mock_context.get_pending.return_value = []
+        self.mock_api.get_head.side_effect = ConnectionError("offline")
+
+        result = runner.invoke(app, ["commit", "-m", "b", "--offline"])
+
+        self.assertEqual(result.exit_code, 0)
+        self.assertEqual(self.mock_context.add_pending.call_args.args[0]["parent_hash"], "seen")
+
+    def test_push_sends_one_request_per_branch(self):
+        self.mock_context.get_config.return_value = {"project_id": 123, "current_branch": "main"}
+        a = {"id": "ida", "parent_hash": None, "timestamp": "t1", "message": "a", "video_assets": {"a": 1}}
+        b = {"id": "idb", "parent_hash": "ida", "timestamp": "t2", "message": "b", "video_assets": {"b": 1}}
+        self.mock_context.get_pending.return_value = [
+            {**a, "branch_name": "main"},
+            {**b, "branch_name": "main"},
+            {"message": "c", "video_assets": {"c": 1}, "branch_name": "dev"},
+        ]
+        self.mock_api.push_commits.return_value = {"created": ["x"], "head_commit_id": "abcdef1234"}
+
+        result = runner.invoke(app, ["push"])
+
+        self.assertEqual(result.exit_code, 0)
+        self.assertEqual(self.mock_api.push_commits.call_count, 2)
+        first = self.mock_api.push_commits.call_args_list[0].args
+        self.assertEqual(first, (123, [a, b], "main"))
+        self.mock_context.set_pending.assert_called_with([])
+
 if __name__ == '__main__':
     unittest.main()
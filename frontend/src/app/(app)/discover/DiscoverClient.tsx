@@ -22,7 +22,7 @@ export default function DiscoverClient() {
   const [mode, setMode] = useState<"projects" | "users">("projects");
   const [query, setQuery] = useState("");
   const [tag, setTag] = useState<string | null>(null);
-  const [sort, setSort] = useState<"new" | "hot">("new");
+  const [sort, setSort] = useState<"new" | "hot" | "trending">("new");
   const { t } = useI18n();
   const meQuery = useMe();
 
@@ -102,6 +102,9 @@ export default function DiscoverClient() {
                 <Button variant={sort === "hot" ? "primary" : "secondary"} onClick={() => setSort("hot")}>
                   {t("discover.sort.hot")}
                 </Button>
+                <Button variant={sort === "trending" ? "primary" : "secondary"} onClick={() => setSort("trending")}>
+                  {t("discover.sort.trending")}
+                </Button>
               </div>
             ) : null}
           </div>
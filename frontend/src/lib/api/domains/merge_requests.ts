@@ -1,5 +1,5 @@
 import { get, post } from "@/lib/api/client";
-import type { MergeRequest } from "@/lib/api/types";
+import type { CommitDiff, MergeRequest } from "@/lib/api/types";
 
 export const mergeRequestsApi = {
   create: (
@@ -8,6 +8,7 @@ export const mergeRequestsApi = {
   ) => post<MergeRequest>(`/projects/${projectId}/merge-requests`, data),
   listByProject: (projectId: string) => get<MergeRequest[]>(`/projects/${projectId}/merge-requests`),
   get: (mrId: string) => get<MergeRequest>(`/merge-requests/${mrId}`),
+  diff: (mrId: string) => get<CommitDiff>(`/merge-requests/${mrId}/diff`),
   merge: (mrId: string) => post<MergeRequest>(`/merge-requests/${mrId}/merge`),
   close: (mrId: string) => post<MergeRequest>(`/merge-requests/${mrId}/close`),
 };
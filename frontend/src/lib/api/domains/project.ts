@@ -1,5 +1,5 @@
 import { get, post, put } from "@/lib/api/client";
-import type { Branch, ProjectDetail, ProjectExportPayload, ProjectFeedItem, ProjectGraph, ProjectSummary, TimelineWorkspace } from "@/lib/api/types";
+import type { Branch, CommitDiff, ProjectDetail, ProjectExportPayload, ProjectFeedItem, ProjectGraph, ProjectGraphWindow, ProjectLineage, ProjectSummary, TagCount, TimelineWorkspace } from "@/lib/api/types";
 
 export const projectApi = {
   create: (data: { name: string; description?: string; tags?: string[]; is_public?: boolean }) =>
@@ -12,11 +12,16 @@ export const projectApi = {
   delete: (id: string, confirm: { confirm_project_id: string; confirm_nickname: string }) =>
     post<ProjectSummary>(`/projects/${id}/delete`, confirm),
   getGraph: (id: string) => get<ProjectGraph>(`/projects/${id}/graph`),
+  getGraphWindow: (id: string, params?: { cursor?: string; depth?: number; limit?: number; branch_name?: string }) =>
+    get<ProjectGraphWindow>(`/projects/${id}/graph/window`, params),
+  diffCommits: (head: string, base?: string) => get<CommitDiff>("/commits/diff", { head, base }),
   getBranches: (id: string) => get<Branch[]>(`/projects/${id}/branches`),
-  getFeed: (params?: { query?: string; tag?: string; sort?: "new" | "hot"; skip?: number; limit?: number }) =>
+  getFeed: (params?: { query?: string; tag?: string; sort?: "new" | "hot" | "trending" | "relevance"; skip?: number; limit?: number }) =>
     get<ProjectFeedItem[]>("/projects/feed", params),
+  getTrendingTags: (params?: { limit?: number }) => get<TagCount[]>("/tags/trending", params),
   toggleLike: (id: string) => post<boolean>(`/projects/${id}/like`),
   fork: (id: string, commitHash?: string) => post<ProjectSummary>(`/projects/${id}/fork`, { commit_hash: commitHash }),
+  getLineage: (id: string) => get<ProjectLineage>(`/projects/${id}/lineage`),
   forkBranch: (id: string, data?: { source_branch_name?: string; from_commit_hash?: string; name?: string; description?: string; tags?: string[] }) =>
     post<Branch>(`/projects/${id}/fork-branch`, data || {}),
   getUserProjects: (userId: string) => get<ProjectFeedItem[]>(`/users/${userId}/projects`),
@@ -104,10 +104,23 @@ export type ProjectSummary = {
   description?: string | null;
   tags?: string[] | null;
   parent_project_id?: ID | null;
+  fork_commit_id?: string | null;
   created_at: ISODateTime;
   is_public?: boolean;
 };
 
+export type ProjectLineage = {
+  id: ID;
+  fork_commit_id: string | null;
+  ancestors: { id: ID | null; name: string | null; forked_at: string | null }[];
+  forks: { id: ID; name: string; forked_at: string | null }[];
+};
+
+export type TagCount = {
+  tag: string;
+  count: number;
+};
+
 export type ProjectFeedItem = ProjectSummary & {
   owner: UserPublic | null;
   likes_count: number;
@@ -169,6 +182,8 @@ export type Commit = {
   message: string;
   created_at: ISODateTime;
   parent_hash?: string | null;
+  clip_count?: number | null;
+  total_duration?: number | null;
 };
 
 export type ProjectGraph = {
@@ -176,6 +191,40 @@ export type ProjectGraph = {
   branches: Branch[];
 };
 
+export type GraphWindowCommit = Commit & {
+  author_id?: number | null;
+  generation?: number | null;
+};
+
+export type GraphEdgeStub = {
+  commit_id: string;
+  parent_hash: string;
+  parent_generation: number;
+};
+
+export type SnapshotFieldChange = { from: any; to: any };
+
+export type CommitDiff = {
+  base: string | null;
+  head: string;
+  identical: boolean;
+  clips: {
+    added: { key: string; index: number; clip: any }[];
+    removed: { key: string; index: number; clip: any }[];
+    modified: { key: string; index: number; changes: Record<string, SnapshotFieldChange> }[];
+    moved: { key: string; from_index: number; to_index: number }[];
+  };
+  fields: Record<string, SnapshotFieldChange>;
+};
+
+export type ProjectGraphWindow = {
+  commits: GraphWindowCommit[];
+  branches: Branch[];
+  edge_stubs: GraphEdgeStub[];
+  next_cursor: string | null;
+  has_more: boolean;
+};
+
 export type TimelineWorkspace = {
   editorData: TimelineRow[];
   effects: Record<string, TimelineEffect>;
@@ -61,6 +61,7 @@ const dict: Dict = {
   "discover.mode.users": { en: "Creators", zh: "作者", ja: "作者" },
   "discover.sort.new": { en: "Newest", zh: "最新", ja: "最新" },
   "discover.sort.hot": { en: "Hot", zh: "热门", ja: "人気" },
+  "discover.sort.trending": { en: "Trending", zh: "趋势", ja: "トレンド" },
   "discover.search.projects": { en: "Search by project ID / name", zh: "按项目 ID / 名称搜索", ja: "ID / 名前で検索" },
   "discover.search.users": { en: "Search by creator ID / name", zh: "按作者 ID / 名字搜索", ja: "ID / 名前で検索" },
   "discover.tag.all": { en: "All", zh: "全部", ja: "全部" },